@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparer la lecture de select avec pandas.read_sql et avec pyarrow.
+
+Chaque méthode est exécutée dans un processus séparé, pour mesurer
+la mémoire maximale utilisée (RSS) de manière indépendante.
+
+La lecture arrow nécessite pyarrow (pip install polygphys[arrow]).
+"""
+
+# Bibliothèque standard
+import time
+
+# Bibliothèque PIPy
+import numpy as np
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées
+from polygphys.outils.base_de_donnees.dtypes import column
+from polygphys.outils.base_de_donnees.lecture_arrow import disponible
+
+from commun import (base, remplir, rss, dossier_temporaire, sqlite, parseur,
+                    séparément)
+
+
+def essai(adresse: str, réinitialiser: bool = False) -> BaseDeDonnées:
+    """Retourne une base de données avec un tableau."""
+    return base(adresse,
+                column('a', float), column('b', int), column('c', str),
+                réinitialiser=réinitialiser)
+
+
+def mesurer(méthode: str, adresse: str):
+    """Lit le tableau selon une méthode et affiche les mesures."""
+    db = essai(adresse)
+    début = time.perf_counter()
+
+    df = db.select('essai', lecture=méthode)
+
+    durée = time.perf_counter() - début
+    print(f'{méthode:<7} {df.shape[0]} rangées en {durée:7.2f} s, '
+          f'RSS max {rss():8.1f} Mo')
+    db.fermer()
+
+
+if __name__ == '__main__':
+    analyseur = parseur(1_000_000, adresse=True)
+    analyseur.add_argument('--méthode', default=None)
+    arguments = analyseur.parse_args()
+
+    if arguments.méthode is not None:
+        mesurer(arguments.méthode, arguments.adresse)
+    else:
+        méthodes = ('pandas', 'arrow') if disponible() else ('pandas',)
+        if not disponible():
+            print('pyarrow n\'est pas installé: lecture arrow omise.')
+
+        with dossier_temporaire() as dossier:
+            adresse = sqlite(dossier)
+            db = essai(adresse, réinitialiser=True)
+            remplir(db, 'essai', arguments.n, lambda idx: {
+                'a': np.random.random(len(idx)),
+                'b': np.random.randint(0, 100, len(idx)),
+                'c': [f'texte {i % 1000}' for i in idx]})
+            db.fermer()
+
+            for méthode in méthodes:
+                séparément(__file__, méthode=méthode, adresse=adresse)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Outils communs aux scripts de mesure de performances.
+
+Chaque script ne garde que son scénario: la création des tableaux
+d'essai, leur remplissage, le chronométrage, les bases de données
+temporaires et l'exécution en processus séparé sont faits ici.
+
+Les scripts sont exécutés directement, par exemple
+python scripts/performances/tampon.py: ce dossier est alors le premier
+du chemin d'importation et ce module s'importe comme commun.
+"""
+
+# Bibliothèque standard
+import argparse
+import contextlib
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+from typing import Any, Callable, Iterator, Union
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+import pandas as pd
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées
+from polygphys.outils.base_de_donnees.modeles import col_index
+
+# Nombre de rangées écrites à la fois par remplir
+TAILLE_LOT: int = 100_000
+
+
+def base(adresse: str,
+         *colonnes: sqla.Column,
+         nom: str = 'essai',
+         réinitialiser: bool = True,
+         classe: type = BaseDeDonnées) -> BaseDeDonnées:
+    """
+    Retourne une base de données avec un seul tableau.
+
+    :param adresse: Adresse de la base de données.
+    :type adresse: str
+    :param colonnes: Colonnes du tableau, en plus de l'index.
+    :type colonnes: sqla.Column
+    :param nom: Nom du tableau, defaults to 'essai'
+    :type nom: str, optional
+    :param réinitialiser: Vider la base de données, defaults to True
+    :type réinitialiser: bool, optional
+    :param classe: Classe de la base de données, pour comparer une
+        version modifiée, defaults to BaseDeDonnées
+    :type classe: type, optional
+    :return: Base de données.
+    :rtype: BaseDeDonnées
+
+    """
+    md = sqla.MetaData()
+    sqla.Table(nom, md, col_index(), *colonnes)
+    db = classe(adresse, md)
+
+    if réinitialiser:
+        db.réinitialiser()
+
+    return db
+
+
+def remplir(db: BaseDeDonnées,
+            tableau: str,
+            n: int,
+            valeurs: Callable[[pd.RangeIndex], dict[str, Any]]):
+    """
+    Ajoute n rangées à un tableau, par lots de TAILLE_LOT.
+
+    :param db: Base de données.
+    :type db: BaseDeDonnées
+    :param tableau: Nom du tableau.
+    :type tableau: str
+    :param n: Nombre de rangées.
+    :type n: int
+    :param valeurs: Retourne les colonnes d'un lot à partir de son index.
+    :type valeurs: Callable[[pd.RangeIndex], dict[str, Any]]
+    :return: None
+    :rtype: NoneType
+
+    """
+    for début in range(0, n, TAILLE_LOT):
+        idx = pd.RangeIndex(début, min(début + TAILLE_LOT, n), name='index')
+        db.append(tableau, pd.DataFrame(valeurs(idx), idx))
+
+
+def vider(db: BaseDeDonnées, tableau: str = 'essai'):
+    """Efface toutes les rangées d'un tableau."""
+    with db.begin() as con:
+        con.execute(db.table(tableau).delete())
+
+
+def chronométrer(f: Callable, *args, répétitions: int = 1, **kargs) -> float:
+    """Retourne la durée moyenne d'un appel, en secondes."""
+    début = time.perf_counter()
+    for _ in range(répétitions):
+        f(*args, **kargs)
+    return (time.perf_counter() - début) / répétitions
+
+
+def rss() -> float:
+    """Mémoire maximale utilisée par le processus, en mégaoctets."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@contextlib.contextmanager
+def dossier_temporaire() -> Iterator[Path]:
+    """Dossier effacé à la fin du bloc."""
+    with tempfile.TemporaryDirectory() as dossier:
+        yield Path(dossier)
+
+
+def sqlite(dossier: Path, nom: str = 'essai') -> str:
+    """Adresse d'une base de données SQLite dans un dossier."""
+    return f'sqlite:///{dossier / nom}.sqlite'
+
+
+def parseur(n: Union[int, list[int]],
+            adresse: bool = False) -> argparse.ArgumentParser:
+    """
+    Retourne un analyseur d'arguments avec -n et, au besoin, --adresse.
+
+    :param n: Valeur par défaut de -n; une liste permet plusieurs valeurs.
+    :type n: Union[int, list[int]]
+    :param adresse: Ajouter --adresse, pour essayer une autre base de
+        données que SQLite, defaults to False
+    :type adresse: bool, optional
+    :return: Analyseur d'arguments.
+    :rtype: argparse.ArgumentParser
+
+    """
+    analyseur = argparse.ArgumentParser()
+
+    if isinstance(n, list):
+        analyseur.add_argument('-n', type=int, nargs='+', default=n)
+    else:
+        analyseur.add_argument('-n', type=int, default=n)
+
+    if adresse:
+        analyseur.add_argument('--adresse', default=None)
+
+    return analyseur
+
+
+def séparément(script: str, **arguments: Any):
+    """
+    Exécute un script dans un processus séparé.
+
+    Permet de mesurer la mémoire maximale de chaque méthode de manière
+    indépendante.
+
+    :param script: Chemin du script, habituellement __file__.
+    :type script: str
+    :param arguments: Arguments passés au script, comme --nom valeur.
+    :type arguments: Any
+    :return: None
+    :rtype: NoneType
+
+    """
+    commande = [sys.executable, script]
+    for nom, valeur in arguments.items():
+        commande += [f'--{nom}', str(valeur)]
+
+    subprocess.run(commande, check=True)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparer l'importation d'un fichier CSV d'un coup et par morceaux.
+
+Chaque méthode est exécutée dans un processus séparé, pour mesurer
+la mémoire maximale utilisée (RSS) de manière indépendante.
+"""
+
+# Bibliothèque standard
+import time
+
+from pathlib import Path
+
+# Bibliothèque PIPy
+import pandas as pd
+import numpy as np
+
+# Paquet local
+from polygphys.outils.base_de_donnees.dtypes import column
+
+from commun import base, rss, dossier_temporaire, sqlite, parseur, séparément
+
+
+def générer(chemin: Path, n: int):
+    """Écrit un fichier CSV de n rangées."""
+    idx = pd.RangeIndex(n, name='index')
+    pd.DataFrame({'a': np.random.random(n),
+                  'b': np.random.randint(0, 100, n),
+                  'c': np.random.random(n)}, idx).to_csv(chemin)
+
+
+def mesurer(méthode: str, fichier: Path, adresse: str):
+    """Importe le fichier selon une méthode et affiche les mesures."""
+    db = base(adresse,
+              column('a', float), column('b', int), column('c', float))
+    début = time.perf_counter()
+
+    if méthode == 'complet':
+        db.màj('essai', pd.read_csv(fichier, index_col='index'))
+    else:
+        db.read_file('essai', fichier, travailleurs=4)
+
+    durée = time.perf_counter() - début
+    n = db.count('essai')
+    print(f'{méthode:<10} {n} rangées en {durée:7.2f} s, '
+          f'{n / durée:10.0f} rangées/s, RSS max {rss():8.1f} Mo')
+    db.fermer()
+
+
+if __name__ == '__main__':
+    analyseur = parseur(1_000_000, adresse=True)
+    analyseur.add_argument('--méthode', default=None)
+    analyseur.add_argument('--fichier', type=Path, default=None)
+    arguments = analyseur.parse_args()
+
+    if arguments.méthode is not None:
+        mesurer(arguments.méthode, arguments.fichier, arguments.adresse)
+    else:
+        with dossier_temporaire() as dossier:
+            fichier = dossier / 'essai.csv'
+            générer(fichier, arguments.n)
+
+            for méthode in ('complet', 'morceaux'):
+                séparément(__file__,
+                           méthode=méthode,
+                           fichier=fichier,
+                           adresse=sqlite(dossier, méthode))
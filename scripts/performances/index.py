@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparer la recherche des appareils d'une étagère avec et sans index.
+
+Sans index, la base de données parcourt tout le tableau: la durée croît
+avec le nombre de rangées. Avec un index sur la colonne place, elle ne
+dépend presque que du nombre de rangées trouvées.
+"""
+
+# Bibliothèque standard
+import timeit
+
+# Bibliothèque PIPy
+import numpy as np
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées
+from polygphys.outils.base_de_donnees.dtypes import column
+
+from commun import base, remplir, dossier_temporaire, sqlite, parseur
+
+
+def préparer(adresse: str, n: int, index: bool) -> BaseDeDonnées:
+    """Crée un tableau de n appareils répartis sur 1000 étagères."""
+    db = base(adresse,
+              column('place', int, index=index), column('b', float),
+              nom='appareils')
+    remplir(db, 'appareils', n, lambda idx: {
+        'place': np.random.randint(0, 1000, len(idx)),
+        'b': np.random.random(len(idx))})
+
+    return db
+
+
+if __name__ == '__main__':
+    arguments = parseur([10_000, 100_000, 1_000_000]).parse_args()
+
+    with dossier_temporaire() as dossier:
+        for n in arguments.n:
+            durées = {}
+            for index in (False, True):
+                db = préparer(sqlite(dossier, f'{n}_{index}'), n, index)
+                place = db.table('appareils').c.place
+
+                durées[index] = min(timeit.repeat(
+                    lambda: db.select('appareils', where=[place == 500]),
+                    number=10,
+                    repeat=3)) / 10
+                db.fermer()
+
+            print(f'{n:>9} rangées: sans index {durées[False] * 1e3:8.2f} ms, '
+                  f'avec index {durées[True] * 1e3:8.2f} ms')
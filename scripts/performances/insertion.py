@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparer l'ajout d'une seule rangée avec et sans insert_one.
+
+L'ancien chemin calcule le prochain index avec MAX(index), construit un
+DataFrame d'une rangée et l'écrit avec BaseDeDonnées.append. Le nouveau
+passe les valeurs directement à BaseDeDonnées.insert_one, qui laisse la
+base de données attribuer l'index. La durée moyenne par rangée est
+rapportée.
+"""
+
+# Bibliothèque PIPy
+import pandas as pd
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées
+from polygphys.outils.base_de_donnees.dtypes import column
+
+from commun import (base, vider, chronométrer, dossier_temporaire, sqlite,
+                    parseur)
+
+
+def ancien(db: BaseDeDonnées, valeurs: dict):
+    """Ancien comportement de BaseTableau.append."""
+    dernier = db.max('essai', 'index')
+    idx = 0 if dernier is None else dernier + 1
+    db.append('essai', pd.DataFrame([valeurs], index=[idx]))
+
+
+def ajouts(db: BaseDeDonnées, f, n: int):
+    """Ajoute n rangées, une à la fois."""
+    for i in range(n):
+        f(db, {'a': i, 'b': f'rangée {i}'})
+
+
+if __name__ == '__main__':
+    arguments = parseur(1000, adresse=True).parse_args()
+    n = arguments.n
+
+    with dossier_temporaire() as dossier:
+        db = base(arguments.adresse or sqlite(dossier),
+                  column('a', int), column('b', str))
+
+        durées = []
+        for f in (ancien, lambda db, v: db.insert_one('essai', v)):
+            vider(db)
+            durées.append(chronométrer(ajouts, db, f, n) / n * 1000)
+
+        print(f'{n} rangées: ancien {durées[0]:.3f} ms/rangée, '
+              f'insert_one {durées[1]:.3f} ms/rangée')
+
+        db.fermer()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparer l'espace mémoire d'un tableau lu avec et sans types de lecture.
+
+Un tableau semblable à celui des heures est rempli, puis lu une fois
+directement avec pandas.read_sql, comme le faisait select, et une fois
+avec BaseDeDonnées.select, qui applique les types déclarés dans le
+schéma. L'espace occupé par chaque DataFrame est rapporté.
+"""
+
+# Bibliothèque standard
+import datetime
+
+# Bibliothèque PIPy
+import pandas as pd
+import numpy as np
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées
+from polygphys.outils.base_de_donnees.dtypes import column
+
+from commun import base, dossier_temporaire, sqlite, parseur
+
+
+def préparer(adresse: str, n: int) -> BaseDeDonnées:
+    """Crée et remplit un tableau d'heures."""
+    db = base(adresse,
+              column('Technicien', str, catégorie=True),
+              column('Payeur', str, catégorie=True),
+              column('Date', datetime.datetime),
+              column('Heures', float),
+              column('Atelier', bool),
+              column('Demandeur', int),
+              nom='heures')
+
+    aléatoire = np.random.default_rng(0)
+    techniciens = [f'Technicien {i}' for i in range(5)]
+    payeurs = [f'Payeur {i}' for i in range(40)]
+    début = datetime.datetime(2020, 1, 1)
+    db.append('heures',
+              pd.DataFrame({'Technicien': aléatoire.choice(techniciens, n),
+                            'Payeur': aléatoire.choice(payeurs, n),
+                            'Date': [début + datetime.timedelta(hours=i)
+                                     for i in range(n)],
+                            'Heures': aléatoire.random(n) * 8,
+                            'Atelier': aléatoire.random(n) > .5,
+                            'Demandeur': aléatoire.integers(0, 100, n)},
+                           index=pd.RangeIndex(n, name='index')))
+
+    return db
+
+
+def taille(df: pd.DataFrame) -> float:
+    """Espace mémoire d'un DataFrame, en mégaoctets."""
+    return df.memory_usage(index=True, deep=True).sum() / 2**20
+
+
+if __name__ == '__main__':
+    arguments = parseur(200_000).parse_args()
+
+    with dossier_temporaire() as dossier:
+        db = préparer(sqlite(dossier), arguments.n)
+
+        with db.begin() as con:
+            avant = pd.read_sql(db.requête_select('heures'),
+                                con,
+                                index_col='index')
+        après = db.select('heures')
+
+        print(f'{arguments.n} rangées: read_sql {taille(avant):.1f} Mo, '
+              f'select {taille(après):.1f} Mo')
+        print(après.dtypes.to_string())
+
+        db.fermer()
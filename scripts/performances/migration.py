@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparer une migration d'un coup et par morceaux avec gestion.migrer.
+
+Chaque méthode est exécutée dans un processus séparé, pour mesurer
+la mémoire maximale utilisée (RSS) de manière indépendante.
+"""
+
+# Bibliothèque standard
+import time
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+import pandas as pd
+import numpy as np
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées
+from polygphys.outils.base_de_donnees.dtypes import column
+from polygphys.outils.base_de_donnees.gestion import migrer
+from polygphys.outils.base_de_donnees.modeles import col_index
+
+from commun import (remplir, rss, dossier_temporaire, sqlite, parseur,
+                    séparément)
+
+
+def schéma(adresse: str) -> BaseDeDonnées:
+    """Retourne une base de données avec deux tableaux liés."""
+    md = sqla.MetaData()
+    sqla.Table('parent', md, col_index(), column('a', float))
+    sqla.Table('essai', md, col_index(),
+               column('a', float), column('b', int),
+               column('p', int, sqla.ForeignKey('parent.index')))
+    return BaseDeDonnées(adresse, md)
+
+
+def mesurer(méthode: str, source: str, destination: str):
+    """Migre la source selon une méthode et affiche les mesures."""
+    a, b = schéma(source), schéma(destination)
+    début = time.perf_counter()
+
+    if méthode == 'complet':
+        b.initialiser()
+        for tableau in ('parent', 'essai'):
+            b.màj(tableau, a.select(tableau))
+    else:
+        migrer(a, b, conv={'a': lambda x: x * 2})
+
+    durée = time.perf_counter() - début
+    n = b.count('essai')
+    print(f'{méthode:<10} {n} rangées en {durée:7.2f} s, '
+          f'{n / durée:10.0f} rangées/s, RSS max {rss():8.1f} Mo')
+    a.fermer()
+    b.fermer()
+
+
+if __name__ == '__main__':
+    analyseur = parseur(1_000_000)
+    analyseur.add_argument('--méthode', default=None)
+    analyseur.add_argument('--source', default=None)
+    analyseur.add_argument('--destination', default=None)
+    arguments = analyseur.parse_args()
+
+    if arguments.méthode is not None:
+        mesurer(arguments.méthode, arguments.source, arguments.destination)
+    else:
+        with dossier_temporaire() as dossier:
+            source = sqlite(dossier, 'source')
+            db = schéma(source)
+            db.réinitialiser()
+            db.append('parent', pd.DataFrame({'a': np.random.random(100)}))
+            remplir(db, 'essai', arguments.n, lambda idx: {
+                'a': np.random.random(len(idx)),
+                'b': np.random.randint(0, 100, len(idx)),
+                'p': np.random.randint(0, 100, len(idx))})
+            db.fermer()
+
+            for méthode in ('complet', 'morceaux'):
+                séparément(__file__,
+                           méthode=méthode,
+                           source=source,
+                           destination=sqlite(dossier, méthode))
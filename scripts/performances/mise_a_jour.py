@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparer le remplacement complet d'un tableau à la mise à jour par clé.
+
+Avant, BaseDeDonnées.update remplaçait tout le tableau avec to_sql: le
+coût dépendait de la taille du tableau. La mise à jour par clé ne dépend
+que du nombre de rangées modifiées.
+"""
+
+# Bibliothèque PIPy
+import pandas as pd
+import numpy as np
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées
+from polygphys.outils.base_de_donnees.dtypes import column
+
+from commun import base, chronométrer, dossier_temporaire, sqlite, parseur
+
+
+def préparer(adresse: str, n: int) -> BaseDeDonnées:
+    """Crée un tableau de n rangées."""
+    db = base(adresse, column('a', float), column('b', int))
+
+    idx = pd.RangeIndex(n, name='index')
+    df = pd.DataFrame({'a': np.random.random(n), 'b': np.arange(n)}, idx)
+    with db.begin() as con:
+        df.to_sql('essai', con, if_exists='append')
+
+    return db
+
+
+def remplacer(db: BaseDeDonnées, modifs: pd.DataFrame):
+    """Ancien comportement: réécrire le tableau complet."""
+    df = db.select('essai')
+    df.loc[modifs.index, modifs.columns] = modifs
+    with db.begin() as con:
+        df.to_sql('essai', con, if_exists='replace')
+
+
+if __name__ == '__main__':
+    arguments = parseur(100_000).parse_args()
+
+    with dossier_temporaire() as dossier:
+        db = préparer(sqlite(dossier), arguments.n)
+
+        for m in (10, 100, 1000, 10_000):
+            idx = pd.Index(np.random.choice(arguments.n, m, replace=False),
+                           name='index')
+            modifs = pd.DataFrame({'a': np.random.random(m)}, idx)
+
+            t_avant = chronométrer(remplacer, db, modifs)
+            t_après = chronométrer(db.update, 'essai', modifs)
+            t_diff = chronométrer(db.update, 'essai', modifs, True)
+
+            print(f'{arguments.n} rangées, {m:>6} modifiées: '
+                  f'remplacement {t_avant:8.3f} s, '
+                  f'par clé {t_après:8.3f} s, '
+                  f'différences seulement {t_diff:8.3f} s')
+
+        db.fermer()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparer la pagination par OFFSET et par clés avec select_page.
+
+Pour plusieurs positions dans un grand tableau, la durée d'obtention
+d'une page est mesurée avec iloc (LIMIT et OFFSET) et avec select_page,
+à partir du jeton de la page précédente.
+"""
+
+# Bibliothèque PIPy
+import numpy as np
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées
+from polygphys.outils.base_de_donnees.dtypes import column
+from polygphys.outils.base_de_donnees.pagination import encoder_jeton
+
+from commun import (base, remplir, chronométrer, dossier_temporaire, sqlite,
+                    parseur)
+
+
+def préparer(adresse: str, n: int) -> BaseDeDonnées:
+    """Crée et remplit un tableau."""
+    db = base(adresse, column('a', float))
+    remplir(db, 'essai', n, lambda idx: {'a': np.random.random(len(idx))})
+
+    return db
+
+
+if __name__ == '__main__':
+    analyseur = parseur(1_000_000)
+    analyseur.add_argument('--page', type=int, default=100)
+    arguments = analyseur.parse_args()
+
+    with dossier_temporaire() as dossier:
+        db = préparer(sqlite(dossier), arguments.n)
+
+        for position in (0, 10_000, 100_000, arguments.n - arguments.page):
+            # Jeton tel que retourné avec la page précédente
+            jeton = encoder_jeton(['index'], [position - 1]) \
+                if position else None
+            fin = position + arguments.page
+
+            offset = chronométrer(lambda: db.iloc('essai')[position:fin],
+                                  répétitions=5) * 1000
+            clés = chronométrer(lambda: db.select_page('essai',
+                                                       after=jeton,
+                                                       limit=arguments.page),
+                                répétitions=5) * 1000
+
+            print(f'position {position:>9}: OFFSET {offset:8.2f} ms, '
+                  f'select_page {clés:8.2f} ms')
+
+        db.fermer()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparer la résolution des références rangée par rangée et par jointure.
+
+Le nom du responsable de chaque appareil est obtenu avec une requête par
+rangée, comme le faisait la grille, puis avec select_résolu, en une seule
+requête. Le nombre de requêtes exécutées est compté dans les deux cas.
+"""
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+import pandas as pd
+import numpy as np
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées
+from polygphys.outils.base_de_donnees.dtypes import column
+from polygphys.outils.base_de_donnees.modeles import col_index
+
+from commun import chronométrer, dossier_temporaire, sqlite, parseur
+
+
+def préparer(adresse: str, n: int, personnes: int) -> BaseDeDonnées:
+    """Crée et remplit un tableau de personnes et un tableau d'appareils."""
+    md = sqla.MetaData()
+    p = sqla.Table('personnes',
+                   md,
+                   col_index(),
+                   column('nom', str, étiquette=True))
+    sqla.Table('appareils',
+               md,
+               col_index(),
+               column('responsable', int, sqla.ForeignKey(p.columns['index'])),
+               column('nom', str))
+    db = BaseDeDonnées(adresse, md)
+    db.réinitialiser()
+
+    noms = [f'personne {i}' for i in range(personnes)]
+    db.append('personnes', pd.DataFrame({'nom': noms}))
+    db.append('appareils',
+              pd.DataFrame({'responsable': np.random.randint(0, personnes, n),
+                            'nom': [f'appareil {i}' for i in range(n)]}))
+
+    return db
+
+
+def rangée_par_rangée(db: BaseDeDonnées) -> pd.Series:
+    """Résout chaque référence avec sa propre requête."""
+    appareils = db.select('appareils')
+    return appareils.responsable.map(
+        lambda i: db.select('personnes',
+                            where=[db.table('personnes').columns['index'] == i]
+                            ).nom.iloc[0])
+
+
+if __name__ == '__main__':
+    analyseur = parseur(2_000)
+    analyseur.add_argument('--personnes', type=int, default=50)
+    arguments = analyseur.parse_args()
+
+    with dossier_temporaire() as dossier:
+        db = préparer(sqlite(dossier), arguments.n, arguments.personnes)
+
+        requêtes = []
+        sqla.event.listen(db.create_engine(),
+                          'before_cursor_execute',
+                          lambda *args: requêtes.append(args[2]))
+
+        for nom, f in (('rangée par rangée', lambda: rangée_par_rangée(db)),
+                       ('select_résolu', lambda: db.select_résolu(
+                           'appareils')['responsable.nom'])):
+            requêtes.clear()
+            durée = chronométrer(f) * 1000
+            print(f'{nom:>20}: {durée:10.1f} ms, {len(requêtes):>6} requêtes')
+
+        db.fermer()
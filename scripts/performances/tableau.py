@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mesurer le coût des accès aux attributs de BaseTableau.
+
+Compare la transmission précalculée à l'ancienne méthode __getattr__,
+qui inspectait la signature de chaque méthode à chaque accès. Les
+résultats peuvent être ajoutés à un fichier CSV pour suivre leur
+évolution dans le temps.
+"""
+
+# Bibliothèque standard
+import datetime
+import timeit
+
+from functools import partial
+from inspect import signature
+from pathlib import Path
+from typing import Callable
+
+# Bibliothèque PIPy
+import pandas as pd
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées, BaseTableau
+from polygphys.outils.base_de_donnees.dtypes import column
+
+from commun import base, parseur
+
+
+class AncienBaseTableau:
+    """Transmission des attributs telle qu'elle était faite avant."""
+
+    def __init__(self, db, table):
+        self.table = table
+        self.db = db
+
+    def __getattr__(self, attr):
+        if hasattr(BaseDeDonnées, attr):
+            obj = getattr(self.db, attr)
+
+            if isinstance(obj, Callable):
+                sig = signature(obj)
+
+                if len(sig.parameters) == 1 and 'table' in sig.parameters:
+                    return partial(obj, self.table)()
+                elif 'table' in sig.parameters:
+                    return partial(obj, self.table)
+                else:
+                    return obj
+            else:
+                return obj
+        elif hasattr(pd.DataFrame, attr):
+            return getattr(self.db.select(self.table), attr)
+        raise AttributeError(attr)
+
+
+ESSAIS = {'tab.columns': lambda tab: tab.columns,
+          'tab.index': lambda tab: tab.index,
+          "tab.dtype('a')": lambda tab: tab.dtype('a'),
+          'tab.select': lambda tab: tab.select}
+
+
+if __name__ == '__main__':
+    analyseur = parseur(2000)
+    analyseur.add_argument('--csv', type=Path, default=None,
+                           help='fichier CSV où ajouter les résultats')
+    arguments = analyseur.parse_args()
+
+    db = base('sqlite:///', column('a', int), column('b', float))
+    db.append('essai', pd.DataFrame({'a': range(10), 'b': 0.}))
+
+    résultats = []
+    for classe in (AncienBaseTableau, BaseTableau):
+        tab = classe(db, 'essai')
+        for nom, essai in ESSAIS.items():
+            durée = timeit.timeit(partial(essai, tab), number=arguments.n)
+            µs = 1e6 * durée / arguments.n
+            résultats.append({'date': datetime.datetime.now(),
+                              'classe': classe.__name__,
+                              'essai': nom,
+                              'µs': µs})
+            print(f'{classe.__name__:<18} {nom:<16} {µs:10.2f} µs')
+
+    if arguments.csv is not None:
+        pd.DataFrame(résultats).to_csv(arguments.csv,
+                                       mode='a',
+                                       header=not arguments.csv.exists(),
+                                       index=False)
+
+    db.fermer()
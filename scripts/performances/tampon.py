@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparer des ajouts d'une rangée à la fois, avec et sans tampon.
+
+Simule un journal: chaque entrée est ajoutée avec BaseTableau.append,
+comme le fait Journal.emit. Le débit est rapporté en entrées par seconde.
+"""
+
+# Bibliothèque standard
+import time
+
+# Bibliothèque PIPy
+import pandas as pd
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées, BaseTableau
+from polygphys.outils.base_de_donnees.dtypes import column
+
+from commun import (base, vider, chronométrer, dossier_temporaire, sqlite,
+                    parseur)
+
+
+def journaliser(db: BaseDeDonnées, n: int, tampon: bool):
+    """Ajoute n entrées de journal, une à la fois."""
+    tableau = BaseTableau(db, 'journal')
+
+    for i in range(n):
+        tableau.append(pd.Series({'créé': time.time(),
+                                  'niveau': 20,
+                                  'msg': f'entrée {i}'}),
+                       tampon=tampon)
+    tableau.vider_tampons()
+
+
+def débit(db: BaseDeDonnées, n: int, tampon: bool) -> float:
+    """Retourne le débit de n ajouts, en entrées par seconde."""
+    vider(db, 'journal')
+    durée = chronométrer(journaliser, db, n, tampon)
+
+    assert db.count('journal') == n
+    return n / durée
+
+
+if __name__ == '__main__':
+    arguments = parseur(2000, adresse=True).parse_args()
+
+    with dossier_temporaire() as dossier:
+        db = base(arguments.adresse or sqlite(dossier),
+                  column('créé', float),
+                  column('niveau', int),
+                  column('msg', str),
+                  nom='journal')
+
+        direct = débit(db, arguments.n, False)
+        tamponné = débit(db, arguments.n, True)
+
+        print(f'{arguments.n} entrées: directes {direct:.0f} entrées/s, '
+              f'tampon {tamponné:.0f} entrées/s')
+
+        db.fermer()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparer des petites écritures séparées à une seule transaction.
+
+Chaque écriture ajoute une rangée. Sans transaction, chacune ouvre sa
+propre connexion et est enregistrée séparément; avec
+BaseDeDonnées.transaction, une seule connexion est utilisée et tout est
+enregistré une fois.
+"""
+
+# Bibliothèque PIPy
+import pandas as pd
+
+# Paquet local
+from polygphys.outils.base_de_donnees import BaseDeDonnées
+from polygphys.outils.base_de_donnees.dtypes import column
+
+from commun import (base, vider, chronométrer, dossier_temporaire, sqlite,
+                    parseur)
+
+
+def écrire(db: BaseDeDonnées, n: int):
+    """Ajoute n rangées, une à la fois."""
+    for i in range(n):
+        db.append('essai', pd.DataFrame({'a': [i]}, index=[i]))
+
+
+def regrouper(db: BaseDeDonnées, n: int):
+    """Ajoute n rangées dans une seule transaction."""
+    with db.transaction():
+        écrire(db, n)
+
+
+if __name__ == '__main__':
+    arguments = parseur(1000, adresse=True).parse_args()
+
+    with dossier_temporaire() as dossier:
+        db = base(arguments.adresse or sqlite(dossier), column('a', int))
+
+        durées = []
+        for f in (écrire, regrouper):
+            vider(db)
+            durées.append(chronométrer(f, db, arguments.n))
+
+        print(f'{arguments.n} écritures: séparées {durées[0]:.3f} s, '
+              f'une transaction {durées[1]:.3f} s')
+
+        db.fermer()
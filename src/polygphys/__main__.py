@@ -41,7 +41,9 @@ try:
 
     try:
         # Se connecter à la base de données
-        base = BaseDeDonnées(f'{protocole}:///{fichier_db}', md)
+        base = BaseDeDonnées(f'{protocole}:///{fichier_db}',
+                             md,
+                             config=config)
         base.réinitialiser()  # Réinitialiser la structure
 
         # Démo: Obtenir une table de données
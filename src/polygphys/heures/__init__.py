@@ -31,7 +31,7 @@ class FeuilleDeTemps:
     def __init__(self, config: FichierConfig, handler: InterfaceHandler):
         self.config = config
 
-        db = BaseDeDonnées(self.adresse, md)
+        db = BaseDeDonnées(self.adresse, md, config=config)
         formulaire = Formulaire(handler, db, self.table)
         self.journal = Journal(logging.INFO, self.dossier, formulaire)
 
@@ -13,17 +13,18 @@ import datetime
 from sqlalchemy import MetaData, Table
 
 from ..outils.base_de_donnees.dtypes import column
+from ..outils.base_de_donnees.modeles import col_index
 
 metadata = MetaData()
 
 
 def colonnes_communes():
     """Colonnes communes à toutes les bases de données."""
-    return (column('index', int, primary_key=True),)
+    return (col_index(),)
 
 
-cols = colonnes_communes() + (column('Technicien', str),
-                              column('Payeur', str),
+cols = colonnes_communes() + (column('Technicien', str, catégorie=True),
+                              column('Payeur', str, catégorie=True),
                               column('Date', datetime.datetime),
                               column('Description des travaux effectués', str),
                               column('Demandeur', str),
@@ -45,7 +45,7 @@ adresse = f'mysql+pymysql://{utilisateur}:{mdp}@{nom}'
 config.set('bd', 'adresse', adresse.replace('%', '%%'))
 
 # On se connecte et on initialise la base de données
-base_de_données = BaseDeDonnées(adresse, metadata)
+base_de_données = BaseDeDonnées(adresse, metadata, config=config)
 base_de_données.initialiser()
 
 # Configuration de l'interface graphique
@@ -13,7 +13,7 @@ from sqlalchemy import MetaData, Table, ForeignKey
 from ..outils.base_de_donnees.dtypes import column
 from ..outils.base_de_donnees import modeles  # Structures déjà prêtes
 # Index standard du paquet
-from ..outils.base_de_donnees.modeles import col_index
+from ..outils.base_de_donnees.modeles import col_index, index
 
 # TODO Utiliser le ORM pour définir les tables.
 
@@ -48,18 +48,19 @@ def appareils(metadata: MetaData) -> Table:
             column('responsable',
                    int,
                    ForeignKey(matricule),
-                   default=1),  # Personne responsable
+                   default=1,
+                   index=True),  # Personne responsable
             column('place', int, ForeignKey(
-                designation), default=1),  # Rangement
+                designation), default=1, index=True),  # Rangement
 
             # Description de l'appareil
             column('numéro de série', str),
             column('numéro de modèle', str),
-            column('fournisseur', str),
-            column('fabricant', str),
+            column('fournisseur', str, catégorie=True),
+            column('fabricant', str, catégorie=True),
             column('fonctionnel', bool),  # Pour trouver ceux à réparer
             column('informations supplémentaires', str),
-            column('nom', str),
+            column('nom', str, étiquette=True),
             column('description', str)
             ]
 
@@ -70,12 +71,20 @@ def consommables(metadata: MetaData) -> Table:
     matricule = metadata.tables['personnes'].columns['index']
     designation = metadata.tables['etageres'].columns['index']
     cols = [col_index(),
-            column('responsable', int, ForeignKey(matricule), default=1),
-            column('place', int, ForeignKey(designation), default=1),
+            column('responsable',
+                   int,
+                   ForeignKey(matricule),
+                   default=1,
+                   index=True),
+            column('place',
+                   int,
+                   ForeignKey(designation),
+                   default=1,
+                   index=True),
             column('numéro de fabricant', str),
             column('numéro de fournisseur', str),
-            column('fournisseur', str),
-            column('fabricant', str),
+            column('fournisseur', str, catégorie=True),
+            column('fabricant', str, catégorie=True),
             column('commander', bool),
             column('informations supplémentaires', str),
             column('nom', str),
@@ -103,8 +112,16 @@ def boites(metadata: MetaData) -> Table:
     matricule = metadata.tables['personnes'].columns['index']
     designation = metadata.tables['etageres'].columns['index']
     cols = [col_index(),
-            column('responsable', int, ForeignKey(matricule), default=1),
-            column('place', int, ForeignKey(designation), default=1),
+            column('responsable',
+                   int,
+                   ForeignKey(matricule),
+                   default=1,
+                   index=True),
+            column('place',
+                   int,
+                   ForeignKey(designation),
+                   default=1,
+                   index=True),
             column('description', str),
             column('dimensions', str)
             ]
@@ -130,13 +147,24 @@ def emprunts(metadata: MetaData) -> Table:
     appareil = metadata.tables['appareils'].columns['index']
     personnes = metadata.tables['personnes'].columns['index']
     cols = [col_index(),
-            column('appareil', int, ForeignKey(appareil), default=1),
-            column('responsable', int, ForeignKey(personnes), default=1),
+            column('appareil',
+                   int,
+                   ForeignKey(appareil),
+                   default=1,
+                   index=True),
+            column('responsable',
+                   int,
+                   ForeignKey(personnes),
+                   default=1,
+                   index=True),
+            # Indexé avec retourné, plus bas
             column('emprunteur', int, ForeignKey(personnes), default=1),
             column('date emprunt', date),
             column('date retour', date),
             column('retourné', bool),
-            column('détails', str)
+            column('détails', str),
+            # Emprunts en cours d'une personne
+            index('emprunts', 'emprunteur', 'retourné')
             ]
 
     return Table('emprunts', metadata, *cols)
@@ -160,9 +188,17 @@ def utilisation_boites(metadata: MetaData) -> Table:
     boite = metadata.tables['appareils'].columns['index']
     personnes = metadata.tables['personnes'].columns['index']
     cols = [col_index(),
-            column('boite', int, ForeignKey(boite), default=1),
-            column('responsable', int, ForeignKey(personnes), default=1),
-            column('emprunteur', int, ForeignKey(personnes), default=1),
+            column('boite', int, ForeignKey(boite), default=1, index=True),
+            column('responsable',
+                   int,
+                   ForeignKey(personnes),
+                   default=1,
+                   index=True),
+            column('emprunteur',
+                   int,
+                   ForeignKey(personnes),
+                   default=1,
+                   index=True),
             column('date emprunt', date),
             column('date retour', date),
             column('retourné', bool),
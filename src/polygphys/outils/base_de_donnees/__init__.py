@@ -3,11 +3,14 @@
 
 # Bibliothèques standards
 import pathlib  # Manipulation de chemins
+import threading  # Connexions propres à chaque fil d'exécution
 
 # Description de signatures de fonctions
-from typing import Union, Callable, Any
-from functools import partial  # Manipuler des fonctions
+from typing import Union, Callable, Any, Iterator, Mapping, Optional
+from functools import lru_cache  # Garder en mémoire des résultats
 from inspect import signature  # Utiliser les signatures de fonctions
+from contextlib import contextmanager, nullcontext  # Transactions
+from configparser import ConfigParser  # Réglages optionnels
 
 # Bibliothèques via PIPy
 import sqlalchemy as sqla  # Fonctions et objets de bases de données
@@ -16,7 +19,23 @@ import pandas as pd  # Manipulations de données en Python
 # Imports relatifs
 # Conversion en types internes de différents modules
 from ..config import FichierConfig
-from .dtypes import get_type, default
+from .dtypes import appliquer_types
+from .codages import encoder, encoder_rangée, décoder, brute
+from .descripteurs import DescripteurTableau, DescripteursTableaux
+from .moteurs import ParamètresPool, obtenir_moteur, fermer_moteur
+from .cache import CacheRequêtes, forme
+from .profilage import Profileur
+from .conseiller import conseiller
+from .requetes import Requête, IndexeurLoc, IndexeurILoc, Groupement
+from .importation import importer_fichier, LECTEURS, TAILLE_MORCEAU
+from .ecriture import mettre_à_jour, upsert, effacer, insérer_en_bloc
+from .ecriture import insérer_un, valeur_native, index_automatique
+from .ecriture import index_suivant
+from .tampon import TamponAjouts, TAILLE_TAMPON, ÂGE_TAMPON
+from .lecture_arrow import lire_arrow, vérifier, lecture_depuis_config
+from .pagination import colonnes_tri, encoder_jeton, décoder_jeton
+from .pagination import condition_suite
+from .references import CacheÉtiquettes, requête_résolue
 
 # Certains types de fichiers, pour deviner quelle fonction de lecture
 # utiliser quand on importe un fichier dans une base de données.
@@ -44,18 +63,48 @@ class BaseDeDonnéesConfig(FichierConfig):
 class BaseDeDonnées:
     """Lien avec une base de données spécifique."""
 
-    def __init__(self, adresse: str, metadata: sqla.MetaData):
+    def __init__(self,
+                 adresse: str,
+                 metadata: sqla.MetaData,
+                 pool: ParamètresPool = None,
+                 cache: CacheRequêtes = None,
+                 profileur: Profileur = None,
+                 lecture: str = None,
+                 config: ConfigParser = None):
         """
         Lien avec la base de donnée se trouvant à adresse.
 
         Utilise le schema metadata.
 
+        Les réglages non donnés en argument sont lus dans les sections
+        [pool], [cache], [profilage] et [lecture] de config, s'il est donné.
+        Voir default.cfg.
+
         :param adresse: Adresse vers la base de données.
             Voir https://docs.sqlalchemy.org/en/14/core/engines.html#database-urls
         :type adresse: str
         :param metadata: Structure de la base de données.
             Voir https://docs.sqlalchemy.org/en/14/core/schema.html
         :type metadata: sqla.MetaData
+        :param pool: Paramètres du bassin de connexions, utilisés seulement
+            si aucun moteur n'existe encore pour cette adresse,
+            defaults to None
+        :type pool: ParamètresPool, optional
+        :param cache: Cache des résultats de select, désactivé par défaut,
+            defaults to None
+        :type cache: CacheRequêtes, optional
+        :param profileur: Registre des requêtes exécutées, désactivé par
+            défaut. Comme le moteur est partagé, les requêtes des autres
+            instances utilisant la même adresse sont aussi notées,
+            defaults to None
+        :type profileur: Profileur, optional
+        :param lecture: Méthode de lecture par défaut de select, 'pandas' ou
+            'arrow'. Par défaut, celle de config, sinon 'pandas',
+            defaults to None
+        :type lecture: str, optional
+        :param config: Configuration où lire les réglages non donnés en
+            argument, par exemple un BaseDeDonnéesConfig, defaults to None
+        :type config: ConfigParser, optional
         :return: DESCRIPTION
         :rtype: TYPE
 
@@ -68,6 +117,47 @@ class BaseDeDonnées:
         # https://docs.sqlalchemy.org/en/14/core/schema.html
         self.metadata = metadata
 
+        # Réglages optionnels, d'après la configuration
+        if config is not None:
+            if pool is None:
+                pool = ParamètresPool.depuis_config(config)
+            if cache is None:
+                cache = CacheRequêtes.depuis_config(config)
+            if profileur is None:
+                profileur = Profileur.depuis_config(config)
+            if lecture is None:
+                lecture = lecture_depuis_config(config)
+        if lecture is None:
+            lecture = 'pandas'
+
+        # Descriptions des tableaux, construites au besoin
+        self.descripteurs = DescripteursTableaux(metadata)
+
+        # Paramètres du bassin de connexions
+        self.pool = pool
+
+        # Cache optionnel des résultats de requêtes
+        self.cache = cache
+
+        # Mesure optionnelle des requêtes
+        self.profileur = profileur
+
+        # Méthode de lecture des résultats
+        vérifier(lecture)
+        self.lecture = lecture
+
+        # Connexion réservée par transaction, pour chaque fil d'exécution
+        self._local = threading.local()
+
+        # Rangées en attente d'être ajoutées, par tableau
+        self._tampons: dict[str, TamponAjouts] = {}
+
+        # Étiquettes des références externes, partagées
+        self.étiquettes = CacheÉtiquettes(self)
+
+        # Index attribué ou non par la base de données, par tableau
+        self._index_automatique: dict[str, bool] = {}
+
     # Interface de sqlalchemy
 
     @property
@@ -81,17 +171,47 @@ class BaseDeDonnées:
         res = self.tables[table]
         return res
 
+    def descripteur(self, table: str) -> DescripteurTableau:
+        """Retourne la description d'un tableau."""
+        return self.descripteurs[table]
+
+    def schéma_modifié(self, table: str = None):
+        """
+        Signale que la structure d'un tableau a changé.
+
+        La description du tableau sera reconstruite au prochain accès, et
+        les résultats gardés en cache sont invalidés.
+
+        :param table: Tableau modifié. Si None, tous les tableaux sont
+            considérés modifiés, defaults to None
+        :type table: str, optional
+        :return: None
+        :rtype: NoneType
+
+        """
+        self.descripteurs.invalider(table)
+        if table is None:
+            self._index_automatique.clear()
+        else:
+            self._index_automatique.pop(table, None)
+        self.modifié(table)
+
     def execute(self, requête, *args, **kargs):
         """Exécute la requête SQL donnée et retourne le résultat."""
         with self.begin() as con:
             res = con.execute(requête, *args, **kargs)
-            return res
+
+        # On ne sait pas quels tableaux ont pu être modifiés
+        self.modifié()
+
+        return res
 
     def select(self,
                table: str,
                columns: tuple[str] = tuple(),
                where: tuple = tuple(),
-               errors: str = 'ignore') -> pd.DataFrame:
+               errors: str = 'ignore',
+               lecture: str = None) -> pd.DataFrame:
         """
         Sélectionne des colonnes et items de la base de données.
 
@@ -108,10 +228,278 @@ class BaseDeDonnées:
         :type where: tuple, optional
         :param errors: Comportement des erreurs., defaults to 'ignore'
         :type errors: str, optional
+        :param lecture: Méthode de lecture, 'pandas' ou 'arrow'. Par défaut,
+            celle de l'instance, defaults to None
+        :type lecture: str, optional
         :return: Retourne un DataFrame contenant les items et colonnes
         sélectionnées.
         :rtype: pandas.DataFrame
 
+        """
+        requête = self.requête_select(table, columns, where)
+
+        return self.lire(table, requête, lecture)
+
+    def lire(self,
+             table: str,
+             requête: sqla.sql.Select,
+             lecture: str = None,
+             en_cache: bool = True) -> pd.DataFrame:
+        """
+        Exécute une requête SELECT sur un tableau et retourne le résultat.
+
+        Les colonnes reçoivent le type déclaré dans le schéma (voir
+        dtypes.type_lecture): entiers et booléens acceptant les valeurs
+        manquantes, dates et catégories. Le résultat est pris du cache,
+        s'il est activé.
+
+        :param table: Tableau interrogé.
+        :type table: str
+        :param requête: Requête incluant la colonne index.
+        :type requête: sqlalchemy.sql.Select
+        :param lecture: Méthode de lecture, 'pandas' ou 'arrow'. Par défaut,
+            celle de l'instance, defaults to None
+        :type lecture: str, optional
+        :param en_cache: Utiliser le cache. À désactiver pour une requête
+            dont le résultat dépend d'autres tableaux, defaults to True
+        :type en_cache: bool, optional
+        :return: Résultat de la requête, indexé par la colonne index.
+        :rtype: pandas.DataFrame
+
+        """
+        if lecture is None:
+            lecture = self.lecture
+        else:
+            vérifier(lecture)
+
+        self.vider_tampons(table)
+        en_cache = en_cache and self.cache is not None
+
+        if en_cache:
+            # Le résultat dépend aussi de la méthode de lecture
+            clé = (forme(requête), lecture)
+            # Version lue avant la requête, pour ne pas garder un résultat
+            # antérieur à une écriture faite pendant la lecture
+            version = self.cache.version(table)
+            df = self.cache.obtenir(table, clé)
+            if df is not None:
+                return df
+
+        with self.begin() as con:
+            if lecture == 'arrow':
+                df = lire_arrow(con, requête, 'index')
+            else:
+                df = pd.read_sql(requête, con, index_col='index')
+
+        descripteur = self.descripteur(table)
+        df = décoder(descripteur.codecs, df)
+        df = appliquer_types(df, descripteur.lecture)
+
+        if self.profileur is not None:
+            self.profileur.compléter(df.shape[0])
+
+        if en_cache:
+            self.cache.garder(table, clé, df, version)
+
+        return df
+
+    def select_résolu(self,
+                      table: str,
+                      columns: tuple[str] = tuple(),
+                      where: tuple = tuple()) -> pd.DataFrame:
+        """
+        Sélectionne des rangées, avec l'étiquette de leurs références.
+
+        Pour chaque colonne référençant un autre tableau, une colonne
+        «colonne.étiquette» est ajoutée, eg «responsable.nom». Les
+        étiquettes sont obtenues par jointure, dans la même requête. Voir
+        references.colonne_étiquette.
+
+        :param table: Tableau d'où extraire les données.
+        :type table: str
+        :param columns: Colonnes à extraire. Un tuple vide sélectionne
+            toutes les colonnes, defaults to tuple()
+        :type columns: tuple[str], optional
+        :param where: Critères supplémentaires, defaults to tuple()
+        :type where: tuple, optional
+        :return: Rangées sélectionnées, avec les étiquettes.
+        :rtype: pandas.DataFrame
+
+        """
+        requête = self.requête_select(table, columns, where)
+        requête = requête_résolue(self.table(table),
+                                  list(requête.selected_columns))
+        for clause in where:
+            requête = requête.where(clause)
+
+        for référencé, _ in self.descripteur(table).références.values():
+            self.vider_tampons(référencé)
+
+        # Le résultat dépend aussi des tableaux référencés
+        return self.lire(table, requête, en_cache=False)
+
+    def valeurs_référencées(self, table: str, colonne: str) -> dict[Any, str]:
+        """
+        Retourne les étiquettes des valeurs possibles d'une référence.
+
+        Les étiquettes de chaque tableau référencé sont lues une fois, puis
+        partagées jusqu'à ce que ce tableau soit modifié.
+
+        :param table: Tableau contenant la référence.
+        :type table: str
+        :param colonne: Colonne référençant un autre tableau.
+        :type colonne: str
+        :raises KeyError: Si la colonne n'est pas une référence.
+        :return: Étiquettes, par index du tableau référencé.
+        :rtype: dict[Any, str]
+
+        """
+        référencé, _ = self.descripteur(table).références[colonne]
+        return self.étiquettes[référencé]
+
+    def select_iter(self,
+                    table: str,
+                    columns: tuple[str] = tuple(),
+                    where: tuple = tuple(),
+                    chunksize: int = 10000) -> Iterator[pd.DataFrame]:
+        """
+        Sélectionne des colonnes et items de la base de données, par morceaux.
+
+        Les rangées sont lues avec un curseur côté serveur quand le pilote
+        le permet, de sorte que seul un morceau à la fois est en mémoire.
+
+        :param table: Tableau d'où extraire les données.
+        :type table: str
+        :param columns: Colonnes à extraire. Un tuple vide sélectionne
+            toutes les colonnes, defaults to tuple()
+        :type columns: tuple[str], optional
+        :param where: Critères supplémentaires, defaults to tuple()
+        :type where: tuple, optional
+        :param chunksize: Nombre maximal de rangées par morceau,
+            defaults to 10000
+        :type chunksize: int, optional
+        :return: Itérateur de DataFrame contenant les items et colonnes
+            sélectionnées.
+        :rtype: Iterator[pandas.DataFrame]
+
+        """
+        self.vider_tampons(table)
+        requête = self.requête_select(table, columns, where)
+        descripteur = self.descripteur(table)
+
+        with self.begin() as con:
+            con = con.execution_options(stream_results=True,
+                                        max_row_buffer=chunksize)
+            résultat = con.execute(requête)
+            colonnes = list(résultat.keys())
+
+            for morceau in résultat.partitions(chunksize):
+                morceau = pd.DataFrame.from_records(morceau,
+                                                    columns=colonnes,
+                                                    index='index')
+                morceau = décoder(descripteur.codecs, morceau)
+                yield appliquer_types(morceau, descripteur.lecture)
+
+    def select_page(self,
+                    table: str,
+                    columns: tuple[str] = tuple(),
+                    where: tuple = tuple(),
+                    order_by: Union[str, list[str]] = 'index',
+                    after: str = None,
+                    limit: int = 100,
+                    décroissant: bool = False) -> tuple[pd.DataFrame,
+                                                        Optional[str]]:
+        """
+        Sélectionne une page de rangées, à la suite de la page précédente.
+
+        La page commence après les valeurs de tri de la page précédente
+        (pagination par clés), plutôt qu'avec OFFSET: avec un index sur les
+        colonnes de tri, le coût d'une page ne dépend pas de sa position.
+        Les colonnes de tri ne doivent pas contenir de valeurs nulles.
+
+        Eg:
+            page, jeton = db.select_page('appareils', limit=100)
+            while jeton is not None:
+                page, jeton = db.select_page('appareils', after=jeton)
+
+        :param table: Tableau d'où extraire les données.
+        :type table: str
+        :param columns: Colonnes à extraire. Un tuple vide sélectionne
+            toutes les colonnes, defaults to tuple()
+        :type columns: tuple[str], optional
+        :param where: Critères supplémentaires, defaults to tuple()
+        :type where: tuple, optional
+        :param order_by: Colonne ou colonnes de tri, complétées par index,
+            defaults to 'index'
+        :type order_by: Union[str, list[str]], optional
+        :param after: Jeton de continuation retourné avec la page
+            précédente. Si None, la première page est retournée,
+            defaults to None
+        :type after: str, optional
+        :param limit: Nombre maximal de rangées de la page, defaults to 100
+        :type limit: int, optional
+        :param décroissant: Trier en ordre décroissant, defaults to False
+        :type décroissant: bool, optional
+        :return: La page, et le jeton de la page suivante, ou None s'il
+            n'y a plus de rangées.
+        :rtype: tuple[pandas.DataFrame, Optional[str]]
+
+        """
+        tri = colonnes_tri(order_by)
+        table_sqla = self.table(table)
+
+        # Les valeurs de tri sont nécessaires pour construire le jeton
+        if len(columns):
+            manquantes = [c for c in tri if c not in columns and c != 'index']
+            columns = tuple(columns) + tuple(manquantes)
+        else:
+            manquantes = []
+
+        where = tuple(where)
+        if after is not None:
+            valeurs = décoder_jeton(after, table_sqla, tri)
+            where += (condition_suite(table_sqla, tri, valeurs, décroissant),)
+
+        ordre = [table_sqla.columns[c] for c in tri]
+        if décroissant:
+            ordre = [c.desc() for c in ordre]
+
+        # Une rangée de plus indique s'il reste une page
+        requête = self.requête_select(table, columns, where)
+        requête = requête.order_by(*ordre).limit(limit + 1)
+        page = self.lire(table, requête)
+
+        jeton = None
+        if page.shape[0] > limit:
+            page = page.iloc[:limit]
+            dernière = page.iloc[-1]
+            jeton = encoder_jeton(tri,
+                                  [page.index[-1] if c == 'index'
+                                   else dernière[c] for c in tri],
+                                  table_sqla)
+
+        return page.drop(columns=manquantes), jeton
+
+    def requête_select(self,
+                       table: str,
+                       columns: tuple[str] = tuple(),
+                       where: tuple = tuple()) -> sqla.sql.Select:
+        """
+        Construit la requête SELECT utilisée par select et select_iter.
+
+        Les colonnes encodées sont sélectionnées sans décodage: elles sont
+        décodées par colonne entière une fois lues.
+
+        :param table: Tableau d'où extraire les données.
+        :type table: str
+        :param columns: Colonnes à extraire. Un tuple vide sélectionne
+            toutes les colonnes, defaults to tuple()
+        :type columns: tuple[str], optional
+        :param where: Critères supplémentaires, defaults to tuple()
+        :type where: tuple, optional
+        :return: Requête SELECT, incluant toujours la colonne index.
+        :rtype: sqlalchemy.sql.Select
+
         """
         # Si aucune colonne n'est spécifiée, on les prends toutes.
         if not len(columns):
@@ -120,97 +508,207 @@ class BaseDeDonnées:
         # Si une liste de colonnes est fournie, on vérifie qu'elles sont
         # toutes présentes dans le tableau.
         # On utilise aussi les objets Column du tableau
-        columns = [self.table(table).columns['index']] + list(
-            filter(lambda x: x.name in columns, self.table(table).columns))
+        columns = [self.table(table).columns['index']] + [
+            brute(c) for c in self.table(table).columns if c.name in columns]
 
-        requête = sqla.select(columns).select_from(self.table(table))
+        requête = sqla.select(*columns).select_from(self.table(table))
 
         for clause in where:
             requête = requête.where(clause)
 
-        with self.begin() as con:
-            df = pd.read_sql(requête, con, index_col='index')
+        return requête
 
-        return df
-
-    def update(self, table: str, values: pd.DataFrame):
+    def update(self,
+               table: str,
+               values: pd.DataFrame,
+               seulement_différences: bool = False) -> int:
         """
         Mets à jour des items déjà présents dans la base de données.
 
+        Seules les colonnes présentes dans values sont modifiées, rangée par
+        rangée, sans toucher au reste du tableau.
+
         :param table: Tableau où se trouvent les données.
         :type table: str
         :param values: DataFrame contenant les valeurs à modifier.
         L'index est le critère de sélection.
         :type values: pd.DataFrame
-        :return: None
-        :rtype: NoneType
+        :param seulement_différences: N'écrire que les cellules différentes
+            des valeurs déjà enregistrées, defaults to False
+        :type seulement_différences: bool, optional
+        :return: Nombre de rangées modifiées.
+        :rtype: int
 
         """
+        self.vider_tampons(table)
+        descripteur = self.descripteur(table)
         with self.begin() as con:
-            values.to_sql(table, con, if_exists='replace')
+            n = mettre_à_jour(con,
+                              descripteur.brute,
+                              encoder(descripteur.codecs, values),
+                              seulement_différences)
 
-    def insert(self, table: str, values: pd.DataFrame):
+        self.modifié(table)
+
+        return n
+
+    def insert(self, table: str, values: pd.DataFrame) -> int:
         """
-        Insère un nouvel élément dans la base de données.
+        Insère de nouveaux éléments dans la base de données.
+
+        Les index de values ne doivent pas déjà exister.
 
         :param table: Tableau utilisé.
         :type table: str
         :param values: Valeurs à insérer.
         :type values: pd.DataFrame
-        :return: None
-        :rtype: NoneType
+        :return: Nombre de rangées insérées.
+        :rtype: int
 
         """
+        self.vider_tampons(table)
+        descripteur = self.descripteur(table)
         with self.begin() as con:
-            values.to_sql(table, con, if_exists='fail')
+            n = insérer_en_bloc(con,
+                                descripteur.brute,
+                                encoder(descripteur.codecs, values))
 
-    def append(self, table: str, values: pd.DataFrame):
+        self.modifié(table)
+
+        return n
+
+    def index_automatique(self, table: str) -> bool:
         """
-        Ajoute un item à la fin de la base de données.
+        Vérifie si la base de données attribue l'index d'un tableau.
 
-        :param table: Table où ajouter les données.
+        Le résultat est gardé jusqu'à ce que la structure du tableau change.
+        Voir ecriture.index_automatique.
+
+        :param table: Tableau à vérifier.
         :type table: str
-        :param values: Valuers à ajouter.
-        :type values: pd.DataFrame
-        :return: None
-        :rtype: NoneType
+        :return: Vrai si un index omis est attribué par la base de données.
+        :rtype: bool
+
+        """
+        if table not in self._index_automatique:
+            with self.begin() as con:
+                self._index_automatique[table] = \
+                    index_automatique(con, self.table(table))
+
+        return self._index_automatique[table]
+
+    def insert_one(self, table: str, values: Mapping[str, Any]) -> Any:
+        """
+        Insère une seule rangée et retourne son index.
+
+        L'index est attribué par la base de données, à moins d'être donné
+        dans values. Pour un tableau créé avant que la colonne index soit
+        autoincrémentée, l'index suit le plus grand index, lu dans la même
+        transaction. La requête d'insertion est gardée par le descripteur
+        du tableau: aucun DataFrame n'est construit et le tableau n'est pas
+        relu.
+
+        :param table: Tableau utilisé.
+        :type table: str
+        :param values: Valeurs de la rangée, par colonne.
+        :type values: Mapping[str, Any]
+        :return: Index de la rangée insérée.
+        :rtype: Any
 
         """
+        self.vider_tampons(table)
+        descripteur = self.descripteur(table)
+        rangée = {c: valeur_native(v) for c, v in values.items()}
+        automatique = self.index_automatique(table)
         with self.begin() as con:
-            values.to_sql(table, con, if_exists='append')
+            index = insérer_un(con,
+                               descripteur.insertion,
+                               encoder_rangée(descripteur.codecs, rangée),
+                               automatique)
 
-    def delete(self, table: str, values: pd.DataFrame):
+        self.modifié(table)
+
+        return index
+
+    def append(self,
+               table: str,
+               values: pd.DataFrame,
+               index: bool = True) -> int:
         """
-        Retire une entrée de la base de données.
+        Ajoute des items à la fin de la base de données.
 
-        :param table: Tableau d'où retirer l'entrée.
+        :param table: Table où ajouter les données.
         :type table: str
-        :param values: Valeurs à retirer.
+        :param values: Valeurs à ajouter.
         :type values: pd.DataFrame
-        :return: None
-        :rtype: NoneType
+        :param index: Écrire l'index de values. Sinon, les index sont
+            attribués par la base de données, ou suivent le plus grand index
+            si elle ne le fait pas (voir index_automatique),
+            defaults to True
+        :type index: bool, optional
+        :return: Nombre de rangées ajoutées.
+        :rtype: int
+
+        """
+        self.vider_tampons(table)
+        descripteur = self.descripteur(table)
+        automatique = index or self.index_automatique(table)
+        with self.begin() as con:
+            if not automatique:
+                suivant = index_suivant(con, descripteur.brute)
+                values = values.set_axis(
+                    pd.RangeIndex(suivant, suivant + values.shape[0]))
+                index = True
+
+            n = insérer_en_bloc(con,
+                                descripteur.brute,
+                                encoder(descripteur.codecs, values),
+                                index)
 
+        self.modifié(table)
+
+        return n
+
+    def delete(self,
+               table: str,
+               values: Union[pd.DataFrame, pd.Index, list, int]) -> int:
         """
-        requête = self.table(table).delete()
+        Retire des entrées de la base de données.
 
-        # Réparation temporaire
+        :param table: Tableau d'où retirer les entrées.
+        :type table: str
+        :param values: Entrées à retirer. Pour un DataFrame, son index
+            désigne les entrées. Un index, une liste ou une valeur unique
+            sont aussi acceptés.
+        :type values: Union[pd.DataFrame, pd.Index, list, int]
+        :return: Nombre d'entrées retirées.
+        :rtype: int
+
+        """
         if isinstance(values, pd.DataFrame):
-            index = values.index.name
+            colonne = values.index.name or 'index'
             idx = values.index
+        elif isinstance(values, (pd.Index, pd.Series, list, tuple, set)):
+            colonne = 'index'
+            idx = values
         else:
-            index = 'index'
-            idx = pd.Index([values], name='index')
-        for i in idx:
-            clause = self.table(table).columns[index] == 1
-            r = requête.where(clause)
-            self.execute(r)
+            colonne = 'index'
+            idx = [values]
+
+        self.vider_tampons(table)
+        with self.begin() as con:
+            n = effacer(con, self.table(table), idx, colonne)
+
+        self.modifié(table)
+
+        return n
 
     def màj(self, table: str, values: pd.DataFrame):
         """
         Met à jour des entrées de la base de données.
 
-        Utilise update ou insert selon la préexistence de l'élément.
-        L'index de values est utilisé comme critère.
+        Les entrées existantes sont mises à jour, les autres insérées,
+        en une seule transaction. L'index de values est utilisé comme critère.
 
         :param table: Tableau à mettre à jour.
         :type table: str
@@ -220,29 +718,135 @@ class BaseDeDonnées:
         :rtype: NoneType
 
         """
-        index = self.index(table)
-        existe = values.index.isin(index)
-
-        if existe.any():
-            self.update(table, values.loc[existe, :])
+        self.vider_tampons(table)
+        descripteur = self.descripteur(table)
+        with self.begin() as con:
+            upsert(con, descripteur.brute, encoder(descripteur.codecs, values))
 
-        if not existe.all():
-            self.insert(table, values.loc[~existe, :])
+        self.modifié(table)
 
     def create_engine(self) -> sqla.engine:
         """
-        Créer le moteur de base de données.
+        Retourne le moteur de base de données.
+
+        Le moteur et son bassin de connexions sont partagés par toutes les
+        instances utilisant la même adresse, et ne sont créés qu'une fois.
 
         :return: Moteur de base de données.
         :rtype: sqlalchemy.engine
 
         """
-        return sqla.create_engine(str(self.adresse), future=True)
+        moteur = obtenir_moteur(self.adresse, self.pool)
+
+        if self.profileur is not None:
+            self.profileur.attacher(moteur)
+
+        return moteur
+
+    def modifié(self, table: str = None):
+        """
+        Signale qu'un tableau a été modifié.
+
+        Les résultats et étiquettes gardés en cache pour ce tableau sont
+        invalidés.
+
+        :param table: Tableau modifié. Si None, tous les tableaux sont
+            considérés modifiés, defaults to None
+        :type table: str, optional
+        :return: None
+        :rtype: NoneType
+
+        """
+        if self.cache is not None:
+            self.cache.invalider(table)
+
+        self.étiquettes.invalider(table)
+
+    def tampon(self,
+               table: str,
+               taille: int = TAILLE_TAMPON,
+               âge: float = ÂGE_TAMPON) -> TamponAjouts:
+        """
+        Retourne le tampon d'ajouts d'un tableau, créé au besoin.
+
+        Les paramètres ne servent qu'à la création du tampon.
+
+        :param table: Tableau où ajouter les rangées.
+        :type table: str
+        :param taille: Nombre de rangées déclenchant l'écriture,
+            defaults to TAILLE_TAMPON
+        :type taille: int, optional
+        :param âge: Âge, en secondes, de la plus ancienne rangée déclenchant
+            l'écriture, defaults to ÂGE_TAMPON
+        :type âge: float, optional
+        :return: Tampon d'ajouts partagé par tous les BaseTableau de ce
+            tableau.
+        :rtype: TamponAjouts
+
+        """
+        tampon = self._tampons.get(table)
+        if tampon is None:
+            tampon = self._tampons.setdefault(table,
+                                              TamponAjouts(self,
+                                                           table,
+                                                           taille,
+                                                           âge))
+
+        return tampon
+
+    def vider_tampons(self, table: str = None) -> int:
+        """
+        Écrit les rangées en attente dans les tampons d'ajouts.
+
+        :param table: Tableau dont on vide le tampon. Si None, tous les
+            tampons sont vidés, defaults to None
+        :type table: str, optional
+        :return: Nombre de rangées écrites.
+        :rtype: int
+
+        """
+        if table is None:
+            return sum(t.vider() for t in list(self._tampons.values()))
+
+        tampon = self._tampons.get(table)
+        return 0 if tampon is None else tampon.vider()
+
+    def conseils_index(self) -> pd.DataFrame:
+        """
+        Suggère des index d'après les requêtes mesurées par le profileur.
+
+        Voir conseiller.conseiller.
+
+        :return: Suggestions, en ordre décroissant de gain estimé.
+        :rtype: pd.DataFrame
+
+        """
+        if self.profileur is None:
+            raise ValueError('Aucun profileur pour mesurer les requêtes.')
+
+        return conseiller(self.profileur, self.metadata, self)
+
+    def fermer(self):
+        """
+        Ferme les connexions ouvertes vers la base de données.
+
+        Le moteur est partagé par adresse: les autres instances utilisant
+        la même adresse en obtiendront un nouveau au besoin.
+
+        :return: None
+        :rtype: NoneType
+
+        """
+        self.vider_tampons()
+        fermer_moteur(self.adresse)
 
     def begin(self):
         """
         Retourne une connection active.
 
+        À l'intérieur d'un bloc transaction, la connexion de la transaction
+        est retournée, et rien n'est enregistré à la fin du bloc with.
+
         Eg:
             with instance_BdD.begin() as con:
                 ...
@@ -251,12 +855,59 @@ class BaseDeDonnées:
         :rtype: Connection SQLAlchemy
 
         """
+        con = getattr(self._local, 'connexion', None)
+        if con is not None:
+            return nullcontext(con)
+
         return self.create_engine().begin()
 
+    @contextmanager
+    def transaction(self):
+        """
+        Regroupe les opérations d'un bloc with dans une seule transaction.
+
+        Toutes les opérations faites par cette instance dans le même fil
+        d'exécution, directement ou par un BaseTableau, utilisent la même
+        connexion. Tout est enregistré à la fin du bloc, ou annulé si une
+        exception est levée. Un bloc transaction imbriqué utilise un point
+        de sauvegarde: seules ses opérations sont annulées en cas d'erreur.
+
+        Eg:
+            with instance_BdD.transaction():
+                instance_BdD.append(...)
+                instance_BdD.update(...)
+
+        :return: Connection active
+        :rtype: Connection SQLAlchemy
+
+        """
+        con = getattr(self._local, 'connexion', None)
+
+        try:
+            if con is None:
+                with self.create_engine().begin() as con:
+                    self._local.connexion = con
+                    try:
+                        yield con
+                    finally:
+                        self._local.connexion = None
+            else:
+                with con.begin_nested():
+                    yield con
+        except BaseException:
+            # Des résultats lus pendant la transaction ont pu être gardés
+            self.modifié()
+            raise
+
     def initialiser(self, checkfirst: bool = True):
         """
         Créer les tableaux d'une base de données.
 
+        Avec checkfirst, l'empreinte du schéma est comparée à celle notée
+        dans la base de données: si elle est la même, rien d'autre n'est
+        fait. Sinon, les tableaux, colonnes et index manquants sont ajoutés.
+        Voir gestion.synchroniser.
+
         :param checkfirst: Vérfier ou non l'existence des tableaux et champs,
             defaults to True
         :type checkfirst: bool, optional
@@ -264,8 +915,17 @@ class BaseDeDonnées:
         :rtype: NoneType
 
         """
-        with self.begin() as con:
-            self.metadata.create_all(con, checkfirst=checkfirst)
+        if checkfirst:
+            # Import local, gestion dépend de ce module
+            from .gestion import synchroniser
+
+            if not synchroniser(self):
+                return
+        else:
+            with self.begin() as con:
+                self.metadata.create_all(con, checkfirst=False)
+
+        self.schéma_modifié()
 
     def réinitialiser(self, checkfirst: bool = True):
         """
@@ -282,6 +942,8 @@ class BaseDeDonnées:
             self.metadata.drop_all(con, checkfirst=checkfirst)
             self.metadata.create_all(con)
 
+        self.schéma_modifié()
+
     # Interface de pandas.DataFrame
 
     def dtype(self, table: str, champ: str) -> str:
@@ -296,54 +958,33 @@ class BaseDeDonnées:
         :rtype: str
 
         """
-        type_champ = self.table(table).columns[champ].type
-        type_champ: str = get_type('sqlalchemy', type_champ, 'pandas')
-        return type_champ
+        return self.descripteur(table).types_pandas[champ]
 
     def dtypes(self, table: str) -> pd.Series:
         """
         Retourne les types des colonnes d'un tableau.
 
+        La Series retournée est partagée et ne doit pas être modifiée.
+
         :param table: Tableau dont on veut les types.
         :type table: str
         :return: Series avec les colonnes comme index, les types comme valeurs.
         :rtype: pandas.Series
 
         """
-        cols = self.columns(table)
-        dtypes = map(lambda x: self.dtype(table, x), self.columns(table))
-        dtypes = pd.Series(dtypes, index=cols)
-
-        return dtypes
+        return self.descripteur(table).dtypes
 
     def columns(self, table: str) -> pd.Index:
         """
-
-        :param table: Retourne un index des colonnes présentes dans le tableau.
-
-        :type table: str
-        :return: DESCRIPTION
-        :rtype: TYPE
-
-        """
-        """
         Retourne un index des colonnes présentes dans le tableau.
 
-        Parameters
-        ----------
-        table : str
-            Tableau dont on veut les colonnes.
-
-        Returns
-        -------
-        res: pandas.Index
-            Index des colonnes du tableau..
+        :param table: Tableau dont on veut les colonnes.
+        :type table: str
+        :return: Index des colonnes du tableau, sauf la colonne index.
+        :rtype: pandas.Index
 
         """
-        res = pd.Index(c.name for c in self.table(
-            table).columns if c.name != 'index')
-
-        return res
+        return self.descripteur(table).colonnes
 
     def index(self, table: str) -> pd.Index:
         """
@@ -355,6 +996,7 @@ class BaseDeDonnées:
         :rtype: pandas.Index
 
         """
+        self.vider_tampons(table)
         requête = sqla.select([self.table(
             table).columns['index']]).select_from(self.table(table))
 
@@ -363,13 +1005,158 @@ class BaseDeDonnées:
             res = pd.Index(r['index'] for r in résultat)
             return res
 
+    # Agrégats calculés par la base de données
+
+    def agréger(self,
+                table: str,
+                expression: sqla.sql.ColumnElement,
+                where: tuple = tuple()) -> Any:
+        """
+        Retourne la valeur d'une expression d'agrégation sur un tableau.
+
+        :param table: Tableau interrogé.
+        :type table: str
+        :param expression: Expression SQLAlchemy, eg sqla.func.count().
+        :type expression: sqla.sql.ColumnElement
+        :param where: Critères supplémentaires, defaults to tuple()
+        :type where: tuple, optional
+        :return: Valeur calculée.
+        :rtype: Any
+
+        """
+        self.vider_tampons(table)
+        requête = sqla.select(expression).select_from(self.table(table))
+
+        for clause in where:
+            requête = requête.where(clause)
+
+        with self.begin() as con:
+            return con.execute(requête).scalar()
+
+    def count(self, table: str, where: tuple = tuple()) -> int:
+        """
+        Retourne le nombre de rangées d'un tableau.
+
+        :param table: Tableau interrogé.
+        :type table: str
+        :param where: Critères supplémentaires, defaults to tuple()
+        :type where: tuple, optional
+        :return: Nombre de rangées.
+        :rtype: int
+
+        """
+        return self.agréger(table, sqla.func.count(), where)
+
+    def max(self, table: str, colonne: str, where: tuple = tuple()) -> Any:
+        """
+        Retourne la valeur maximale d'une colonne.
+
+        :param table: Tableau interrogé.
+        :type table: str
+        :param colonne: Colonne interrogée.
+        :type colonne: str
+        :param where: Critères supplémentaires, defaults to tuple()
+        :type where: tuple, optional
+        :return: Valeur maximale, ou None si le tableau est vide.
+        :rtype: Any
+
+        """
+        colonne = self.table(table).columns[colonne]
+        return self.agréger(table, sqla.func.max(colonne), where)
+
+    def min(self, table: str, colonne: str, where: tuple = tuple()) -> Any:
+        """
+        Retourne la valeur minimale d'une colonne.
+
+        :param table: Tableau interrogé.
+        :type table: str
+        :param colonne: Colonne interrogée.
+        :type colonne: str
+        :param where: Critères supplémentaires, defaults to tuple()
+        :type where: tuple, optional
+        :return: Valeur minimale, ou None si le tableau est vide.
+        :rtype: Any
+
+        """
+        colonne = self.table(table).columns[colonne]
+        return self.agréger(table, sqla.func.min(colonne), where)
+
+    def exists(self, table: str, where: tuple = tuple()) -> bool:
+        """
+        Vérifie si au moins une rangée correspond aux critères.
+
+        :param table: Tableau interrogé.
+        :type table: str
+        :param where: Critères supplémentaires, defaults to tuple()
+        :type where: tuple, optional
+        :return: Vrai si une rangée existe.
+        :rtype: bool
+
+        """
+        self.vider_tampons(table)
+        requête = sqla.select(self.table(table).columns['index'])
+
+        for clause in where:
+            requête = requête.where(clause)
+
+        with self.begin() as con:
+            return con.execute(sqla.select(requête.exists())).scalar()
+
+    def groupby(self,
+                table: str,
+                by: Union[str, list[str]],
+                where: tuple = tuple()) -> Groupement:
+        """
+        Regroupe les rangées d'un tableau, pour calculer des agrégats.
+
+        Eg:
+            db.groupby('heures', 'Payeur').agg({'Heures': 'sum'})
+
+        :param table: Tableau interrogé.
+        :type table: str
+        :param by: Colonne ou colonnes de regroupement.
+        :type by: Union[str, list[str]]
+        :param where: Critères supplémentaires, defaults to tuple()
+        :type where: tuple, optional
+        :return: Regroupement, compilé en GROUP BY.
+        :rtype: Groupement
+
+        """
+        return Groupement(self, table, by, where)
+
+    def requête(self,
+                table: str,
+                columns: tuple[str] = None,
+                where: tuple = tuple()) -> Requête:
+        """
+        Retourne une requête paresseuse sur un tableau.
+
+        Aucune donnée n'est lue avant d'en demander le résultat.
+
+        :param table: Tableau à interroger.
+        :type table: str
+        :param columns: Colonnes à sélectionner, defaults to None
+        :type columns: tuple[str], optional
+        :param where: Contraintes supplémentaires, defaults to tuple()
+        :type where: tuple, optional
+        :return: Requête paresseuse.
+        :rtype: Requête
+
+        """
+        if columns is not None and not len(columns):
+            columns = None
+
+        return Requête(self, table, columns, where)
+
     def loc(self,
             table: str,
             columns: tuple[str] = None,
             where: tuple = tuple(),
-            errors: str = 'ignore'):
+            errors: str = 'ignore') -> IndexeurLoc:
         """
-        Retourne un objet de sélection pandas.
+        Retourne un objet de sélection par étiquettes, comme pandas.
+
+        Les sélections sont traduites en critères SQL.
 
         :param table: Tableau à extraire.
         :type table: str
@@ -380,23 +1167,20 @@ class BaseDeDonnées:
         :param errors: Traitement des erreurs, defaults to 'ignore'
         :type errors: str, optional
         :return: Objet de sélection.
-        :rtype: pandas.DataFrame.loc
+        :rtype: IndexeurLoc
 
         """
-        if columns is None:
-            columns = self.columns(table)
-
-        res = self.select(table, columns, where, errors).loc
-
-        return res
+        return self.requête(table, columns, where).loc
 
     def iloc(self,
              table: str,
              columns: tuple[str] = tuple(),
              where: tuple = tuple(),
-             errors: str = 'ignore'):
+             errors: str = 'ignore') -> IndexeurILoc:
         """
-        Retourne un objet de sélection numérique pandas.
+        Retourne un objet de sélection numérique, comme pandas.
+
+        Les sélections sont traduites en LIMIT et OFFSET.
 
         :param table: Tableau à extraire.
         :type table: str
@@ -407,15 +1191,10 @@ class BaseDeDonnées:
         :param errors: Traitement des erreurs, defaults to 'ignore'
         :type errors: str, optional
         :return: Objet de sélection numérique.
-        :rtype: pandas.DataFrame.iloc
+        :rtype: IndexeurILoc
 
         """
-        if columns is None:
-            columns = self.columns(table)
-
-        res = self.select(table, columns, where, errors).iloc
-
-        return res
+        return self.requête(table, columns, where).iloc
 
     def deviner_type_fichier(self, chemin: pathlib.Path) -> Callable:
         """
@@ -432,10 +1211,17 @@ class BaseDeDonnées:
     def read_file(self,
                   table: str,
                   chemin: pathlib.Path,
-                  type_fichier: Union[str, Callable] = None):
+                  type_fichier: Union[str, Callable] = None,
+                  taille: int = TAILLE_MORCEAU,
+                  travailleurs: int = 2,
+                  progression: Callable[[int, float], None] = None,
+                  attendre: bool = True):
         """
         Importer un fichier dans la base de données.
 
+        Les fichiers CSV, texte et XLSX sont lus par morceaux; les morceaux
+        sont convertis en parallèle et écrits par un seul fil d'exécution.
+
         :param table: Tableau dans lequel importer les données.
         :type table: str
         :param chemin: Fichier à importer.
@@ -443,18 +1229,114 @@ class BaseDeDonnées:
         :param type_fichier: Type de fichier.
             Si non spécifié, on devine avec l'extension, defaults to None
         :type type_fichier: Union[str, Callable], optional
-        :return: None
-        :rtype: NoneType
+        :param taille: Nombre de rangées par morceau,
+            defaults to TAILLE_MORCEAU
+        :type taille: int, optional
+        :param travailleurs: Nombre de fils de conversion, defaults to 2
+        :type travailleurs: int, optional
+        :param progression: Fonction appelée après chaque morceau avec le
+            nombre de rangées importées et le débit en rangées par seconde,
+            defaults to None
+        :type progression: Callable[[int, float], None], optional
+        :param attendre: Attendre la fin de l'importation. Sinon, elle se
+            fait en arrière-plan et un Future est retourné, defaults to True
+        :type attendre: bool, optional
+        :return: Nombre de rangées importées, ou un Future donnant ce nombre.
+        :rtype: Union[int, concurrent.futures.Future]
 
         """
+        chemin = pathlib.Path(chemin)
+
         if type_fichier is None:
-            type_fichier = self.deviner_type_fichier(chemin)
-        elif isinstance(type_fichier, str):
+            type_fichier = chemin.suffix
+
+        if isinstance(type_fichier, str) and type_fichier not in LECTEURS:
             type_fichier = TYPES_FICHIERS[type_fichier]
 
-        df = type_fichier(chemin, index_col='index')
+        return importer_fichier(self,
+                                table,
+                                chemin,
+                                type_fichier,
+                                taille,
+                                travailleurs,
+                                progression,
+                                attendre)
+
 
-        self.màj(table, df)
+# Attributs de pandas.DataFrame transmis par BaseTableau
+ATTRIBUTS_DATAFRAME: frozenset[str] = frozenset(dir(pd.DataFrame))
+
+
+class Transmis:
+    """
+    Descripteur transmettant un attribut de BaseDeDonnées à BaseTableau.
+
+    Les méthodes dont le seul paramètre est table sont appelées
+    immédiatement, comme des propriétés. Les autres attributs sont
+    retournés tels quels.
+    """
+
+    __slots__ = ('nom', 'appel')
+
+    def __init__(self, nom: str, appel: bool):
+        """
+        Descripteur d'attribut transmis.
+
+        :param nom: Nom de l'attribut dans BaseDeDonnées.
+        :type nom: str
+        :param appel: Appeler la méthode avec le nom du tableau.
+        :type appel: bool
+        :return: None
+        :rtype: NoneType
+
+        """
+        self.nom = nom
+        self.appel = appel
+
+    def __get__(self, obj: Any, classe: type = None) -> Any:
+        """Retourne l'attribut de obj.db, ou son résultat pour obj.table."""
+        if obj is None:
+            return self
+
+        attr = getattr(obj.db, self.nom)
+        return attr(obj.table) if self.appel else attr
+
+
+@lru_cache(maxsize=None)
+def transmettre(classe: type, nom: str) -> Any:
+    """
+    Retourne l'attribut de BaseTableau transmettant classe.nom.
+
+    Le résultat est calculé une seule fois par classe et par nom:
+    les méthodes prenant un paramètre table, en plus d'autres, deviennent
+    des méthodes de BaseTableau recevant automatiquement self.table.
+
+    :param classe: BaseDeDonnées ou une de ses sous-classes.
+    :type classe: type
+    :param nom: Nom de l'attribut.
+    :type nom: str
+    :return: Un descripteur ou une fonction.
+    :rtype: Any
+
+    """
+    attr = getattr(classe, nom)
+
+    if isinstance(attr, property) or not isinstance(attr, Callable):
+        return Transmis(nom, False)
+
+    paramètres = list(signature(attr).parameters)[1:]
+
+    if paramètres == ['table']:
+        return Transmis(nom, True)
+    elif 'table' in paramètres:
+        def méthode(self, *args, **kargs):
+            return getattr(self.db, nom)(self.table, *args, **kargs)
+
+        méthode.__name__ = méthode.__qualname__ = nom
+        méthode.__doc__ = attr.__doc__
+        return méthode
+    else:
+        return Transmis(nom, False)
 
 
 class BaseTableau:
@@ -481,6 +1363,11 @@ class BaseTableau:
         """
         Obtiens un attribut de self.db ou self.df.
 
+        Les attributs de BaseDeDonnées sont transmis directement par des
+        descripteurs (voir transmettre); cette méthode ne sert qu'aux
+        attributs propres aux sous-classes de BaseDeDonnées et à ceux de
+        pandas.DataFrame.
+
         :param attr: Attribut à obtenir.
         :type attr: str
         :return: L'attribut demandé.
@@ -489,21 +1376,14 @@ class BaseTableau:
         :raises AttributeError: Si l'attribut ne peut pas être trouvé.
 
         """
-        if hasattr(BaseDeDonnées, attr):
-            obj = getattr(self.db, attr)
-
-            if isinstance(obj, Callable):
-                sig = signature(obj)
-
-                if len(sig.parameters) == 1 and 'table' in sig.parameters:
-                    return partial(obj, self.table)()
-                elif 'table' in sig.parameters:
-                    return partial(obj, self.table)
-                else:
-                    return obj
-            else:
-                return obj
-        elif hasattr(pd.DataFrame, attr):
+        if attr in ('db', 'table'):
+            # Pas encore initialisé, éviter une récursion infinie
+            raise AttributeError(attr)
+
+        classe = type(self.db)
+        if hasattr(classe, attr):
+            return transmettre(classe, attr).__get__(self, type(self))
+        elif attr in ATTRIBUTS_DATAFRAME:
             return getattr(self.df, attr)
         else:
             msg = f'{self!r} de type {type(self)} n\'a pas d\'attribut {attr}\
@@ -515,21 +1395,87 @@ class BaseTableau:
         """Le tableau comme pandas.DataFrame."""
         return self.select()
 
-    def append(self, values: Union[pd.Series, pd.DataFrame] = None):
+    @property
+    def loc(self) -> IndexeurLoc:
+        """Sélection par étiquettes, traduite en SQL."""
+        return self.requête().loc
+
+    @property
+    def iloc(self) -> IndexeurILoc:
+        """Sélection par positions, traduite en SQL."""
+        return self.requête().iloc
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        """Retourne les n premières rangées, sans lire le reste."""
+        return self.requête().head(n)
+
+    # count, max et min gardent le sens de pandas.DataFrame, plutôt que
+    # celui de BaseDeDonnées. Pour les calculer en SQL, voir
+    # BaseDeDonnées.count, max et min, ou agréger.
+
+    def count(self, *args, **kargs) -> pd.Series:
+        """Comme pandas.DataFrame.count, sur le tableau entier."""
+        return self.df.count(*args, **kargs)
+
+    def max(self, *args, **kargs) -> pd.Series:
+        """Comme pandas.DataFrame.max, sur le tableau entier."""
+        return self.df.max(*args, **kargs)
+
+    def min(self, *args, **kargs) -> pd.Series:
+        """Comme pandas.DataFrame.min, sur le tableau entier."""
+        return self.df.min(*args, **kargs)
+
+    def prochain_index(self) -> int:
+        """
+        Retourne l'index suivant le plus grand index du tableau.
+
+        À titre indicatif seulement: une autre connexion peut utiliser cet
+        index avant nous. Pour ajouter une rangée, voir append.
+        """
+        dernier = self.db.max(self.table, 'index')
+        return 0 if dernier is None else int(dernier) + 1
+
+    def vider_tampons(self) -> int:
+        """Écrit les rangées en attente d'être ajoutées au tableau."""
+        return self.db.vider_tampons(self.table)
+
+    def append(self,
+               values: Union[pd.Series, pd.DataFrame] = None,
+               tampon: bool = False):
         """
         Ajoute des valeurs au tableau.
 
         :param values: Valeurs à ajouter, defaults to None
         :type values: Union[pd.Series, pd.DataFrame], optional
-        :return: None
-        :rtype: NoneType
+        :param tampon: Mettre les valeurs en attente dans le tampon d'ajouts
+            du tableau, pour les écrire avec d'autres. Une seule rangée
+            reçoit alors son index à l'écriture. Voir BaseDeDonnées.tampon,
+            defaults to False
+        :type tampon: bool, optional
+        :return: Pour une seule rangée écrite immédiatement, son index,
+            attribué par la base de données. Sinon, None.
+        :rtype: Any
 
         """
-        if values is None:
-            cols, idx = self.columns, [max(self.index, default=-1) + 1]
-            values = pd.DataFrame(None, columns=cols, index=[idx])
-        elif isinstance(values, pd.Series):
-            cols, idx = self.columns, [max(self.index, default=-1) + 1]
-            values = pd.DataFrame([values], index=[idx])
+        if tampon and not isinstance(values, pd.DataFrame):
+            # Une seule rangée: pas besoin de DataFrame
+            valeurs = {} if values is None else values.to_dict()
+            self.db.tampon(self.table).ajouter_rangée(valeurs)
+            return
+
+        if values is None or isinstance(values, pd.Series):
+            # Une seule rangée, dont l'index est attribué par la base
+            valeurs = {} if values is None else values.to_dict()
+            return self.db.insert_one(self.table, valeurs)
+
+        if tampon:
+            self.db.tampon(self.table).ajouter(values)
+        else:
+            self.db.append(self.table, values)
+
 
-        self.db.append(self.table, values)
+# On transmet d'avance tous les attributs publics de BaseDeDonnées
+for nom in dir(BaseDeDonnées):
+    if not nom.startswith('_') and not hasattr(BaseTableau, nom):
+        setattr(BaseTableau, nom, transmettre(BaseDeDonnées, nom))
+del nom
@@ -39,7 +39,7 @@ try:
         adresse = f'{protocole}:///{fichier_bd}'
 
         # Exemple de l'objet BaseDeDonnées
-        base = BaseDeDonnées(adresse, md)
+        base = BaseDeDonnées(adresse, md, config=config)
         base.réinitialiser()
 
         # Exemple de l'objet BaseTableau
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""Cache des résultats de requêtes, invalidé par les écritures."""
+
+# Bibliothèque standard
+import threading
+
+from collections import OrderedDict
+from configparser import ConfigParser
+from typing import Optional
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+import pandas as pd
+
+
+def forme(requête: sqla.sql.ClauseElement) -> tuple[str, str]:
+    """
+    Retourne une clé décrivant une requête et ses paramètres.
+
+    :param requête: Requête SQLAlchemy.
+    :type requête: sqlalchemy.sql.ClauseElement
+    :return: Le texte de la requête et ses paramètres.
+    :rtype: tuple[str, str]
+
+    """
+    compilée = requête.compile()
+    return str(compilée), repr(sorted(compilée.params.items()))
+
+
+def taille_df(df: pd.DataFrame) -> int:
+    """Retourne l'espace mémoire estimé d'un DataFrame, en octets."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class CacheRequêtes:
+    """
+    Cache LRU de résultats de requêtes, par tableau.
+
+    Chaque tableau a un numéro de version, incrémenté à chaque écriture.
+    Les résultats gardés pour une version précédente ne sont plus utilisés.
+
+    Seules les écritures passant par la même instance de BaseDeDonnées
+    invalident le cache: les modifications faites par d'autres programmes
+    ne sont pas détectées.
+    """
+
+    def __init__(self, taille_max: int = 64 * 2**20):
+        """
+        Crée un cache vide.
+
+        :param taille_max: Espace mémoire maximal occupé par les résultats,
+            en octets, defaults to 64 * 2**20
+        :type taille_max: int, optional
+        :return: None
+        :rtype: NoneType
+
+        """
+        self.taille_max = taille_max
+        self.taille = 0
+
+        self._entrées: OrderedDict[tuple, tuple[pd.DataFrame, int]] = \
+            OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._verrou = threading.RLock()
+
+        self.succès = 0
+        self.échecs = 0
+        self.évictions = 0
+
+    @classmethod
+    def depuis_config(cls,
+                      config: ConfigParser,
+                      section: str = 'cache') -> Optional['CacheRequêtes']:
+        """
+        Crée un cache selon une section d'un fichier de configuration.
+
+        La taille est donnée en mégaoctets. Retourne None si le cache
+        n'est pas activé.
+
+        :param config: Configuration à lire.
+        :type config: ConfigParser
+        :param section: Section contenant les paramètres, defaults to 'cache'
+        :type section: str, optional
+        :return: Un cache, ou None.
+        :rtype: Optional[CacheRequêtes]
+
+        """
+        if not config.getboolean(section, 'actif', fallback=False):
+            return None
+
+        taille = config.getfloat(section, 'taille', fallback=64)
+        return cls(int(taille * 2**20))
+
+    def version(self, table: str) -> int:
+        """Retourne la version courante d'un tableau."""
+        return self._versions.get(table, 0)
+
+    def obtenir(self, table: str, clé: tuple) -> Optional[pd.DataFrame]:
+        """
+        Retourne une copie du résultat gardé, ou None.
+
+        :param table: Tableau interrogé.
+        :type table: str
+        :param clé: Forme de la requête.
+        :type clé: tuple
+        :return: Le résultat, s'il est en cache.
+        :rtype: Optional[pd.DataFrame]
+
+        """
+        with self._verrou:
+            clé = (table, self.version(table), clé)
+            entrée = self._entrées.get(clé)
+
+            if entrée is None:
+                self.échecs += 1
+                return None
+
+            self._entrées.move_to_end(clé)
+            self.succès += 1
+            return entrée[0].copy()
+
+    def garder(self,
+               table: str,
+               clé: tuple,
+               df: pd.DataFrame,
+               version: int = None):
+        """
+        Garde une copie d'un résultat, en évinçant les plus anciens au besoin.
+
+        Le résultat est gardé sous la version du tableau au début de la
+        lecture. Si le tableau a été modifié pendant la lecture, le résultat
+        n'est pas gardé: il pourrait ne pas refléter la modification.
+
+        :param table: Tableau interrogé.
+        :type table: str
+        :param clé: Forme de la requête.
+        :type clé: tuple
+        :param df: Résultat de la requête.
+        :type df: pd.DataFrame
+        :param version: Version du tableau au début de la lecture. Par
+            défaut, la version courante, defaults to None
+        :type version: int, optional
+        :return: None
+        :rtype: NoneType
+
+        """
+        taille = taille_df(df)
+        if taille > self.taille_max:
+            return
+
+        with self._verrou:
+            if version is None:
+                version = self.version(table)
+            elif version != self.version(table):
+                return
+
+            clé = (table, version, clé)
+            if clé in self._entrées:
+                self.taille -= self._entrées.pop(clé)[1]
+
+            self._entrées[clé] = (df.copy(), taille)
+            self.taille += taille
+
+            while self.taille > self.taille_max:
+                _, (_, t) = self._entrées.popitem(last=False)
+                self.taille -= t
+                self.évictions += 1
+
+    def invalider(self, table: str = None):
+        """
+        Incrémente la version d'un tableau et retire ses résultats.
+
+        :param table: Tableau modifié. Si None, tous les tableaux sont
+            invalidés, defaults to None
+        :type table: str, optional
+        :return: None
+        :rtype: NoneType
+
+        """
+        with self._verrou:
+            if table is None:
+                tables = {c[0] for c in self._entrées} | set(self._versions)
+            else:
+                tables = {table}
+
+            for t in tables:
+                self._versions[t] = self.version(t) + 1
+
+            for clé in [c for c in self._entrées if c[0] in tables]:
+                self.taille -= self._entrées.pop(clé)[1]
+
+    def statistiques(self) -> dict[str, float]:
+        """
+        Retourne les statistiques d'utilisation du cache.
+
+        :return: Succès, échecs, taux de succès, évictions, nombre
+            d'entrées et taille en octets.
+        :rtype: dict[str, float]
+
+        """
+        with self._verrou:
+            total = self.succès + self.échecs
+            return {'succès': self.succès,
+                    'échecs': self.échecs,
+                    'taux': self.succès / total if total else 0.,
+                    'évictions': self.évictions,
+                    'entrées': len(self._entrées),
+                    'taille': self.taille}
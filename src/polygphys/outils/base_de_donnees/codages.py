@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+"""
+Types de colonnes encodés, pour remplacer sqlalchemy.PickleType.
+
+Les valeurs sont enregistrées dans un format lisible par la base de données:
+les chemins en texte, les valeurs structurées en JSON compact et les durées
+en nombre entier de microsecondes. Les colonnes enregistrées avec
+sqlalchemy.PickleType ou sqlalchemy.Interval se convertissent avec
+migrer_pickle et migrer_intervalle.
+
+Chaque type s'encode valeur par valeur, comme tout TypeDecorator, mais aussi
+par colonne entière avec encoder et décoder. BaseDeDonnées utilise ces
+dernières pour lire et écrire des DataFrame.
+"""
+
+# Bibliothèque standard
+import json
+import pathlib
+import pickle
+import datetime
+
+from typing import Any, Callable, Mapping
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+import pandas as pd
+
+from sqlalchemy.types import TypeDecorator
+
+# Imports relatifs
+from .ecriture import enregistrements, TAILLE_LOT
+
+# Valeur marquant une cellule qui n'a pas pu être dépicklée
+_DÉJÀ_CONVERTIE = object()
+
+# Origine des dates utilisées par sqlalchemy.Interval
+_ÉPOQUE = datetime.datetime(1970, 1, 1)
+
+
+class Codec(TypeDecorator):
+    """Type de colonne encodé, par valeur ou par colonne."""
+
+    cache_ok = True
+
+    def encoder_valeur(self, valeur: Any) -> Any:
+        """Encode une valeur non nulle."""
+        raise NotImplementedError
+
+    def décoder_valeur(self, valeur: Any) -> Any:
+        """Décode une valeur non nulle."""
+        raise NotImplementedError
+
+    def encoder(self, série: pd.Series) -> pd.Series:
+        """Encode une colonne. Les valeurs nulles restent nulles."""
+        return série.map(self.encoder_valeur, na_action='ignore')
+
+    def décoder(self, série: pd.Series) -> pd.Series:
+        """Décode une colonne. Les valeurs nulles restent nulles."""
+        return série.map(self.décoder_valeur, na_action='ignore')
+
+    def process_bind_param(self, value: Any, dialect) -> Any:
+        """Encode une valeur passée à la base de données."""
+        return None if value is None else self.encoder_valeur(value)
+
+    def process_result_value(self, value: Any, dialect) -> Any:
+        """Décode une valeur retournée par la base de données."""
+        return None if value is None else self.décoder_valeur(value)
+
+
+class Chemin(Codec):
+    """Chemin de fichier, enregistré comme texte."""
+
+    impl = sqla.UnicodeText
+    cache_ok = True
+
+    @property
+    def python_type(self) -> type:
+        """Type Python des valeurs."""
+        return pathlib.Path
+
+    def encoder_valeur(self, valeur: Any) -> str:
+        """Encode un chemin."""
+        return str(valeur)
+
+    def décoder_valeur(self, valeur: str) -> pathlib.Path:
+        """Décode un chemin."""
+        return pathlib.Path(valeur)
+
+    def encoder(self, série: pd.Series) -> pd.Series:
+        """Encode une colonne de chemins."""
+        return série.astype(str).where(série.notna(), None)
+
+
+class JSONCompact(Codec):
+    """Valeur structurée, enregistrée en JSON sans espaces superflus."""
+
+    impl = sqla.UnicodeText
+    cache_ok = True
+
+    @property
+    def python_type(self) -> type:
+        """Type Python des valeurs."""
+        return object
+
+    def encoder_valeur(self, valeur: Any) -> str:
+        """Encode une valeur en JSON."""
+        return json.dumps(valeur,
+                          ensure_ascii=False,
+                          separators=(',', ':'),
+                          default=str)
+
+    def décoder_valeur(self, valeur: str) -> Any:
+        """Décode une valeur JSON."""
+        return json.loads(valeur)
+
+
+class Durée(Codec):
+    """Différence de temps, enregistrée en microsecondes."""
+
+    impl = sqla.BigInteger
+    cache_ok = True
+
+    @property
+    def python_type(self) -> type:
+        """Type Python des valeurs."""
+        return datetime.timedelta
+
+    def encoder_valeur(self, valeur: Any) -> int:
+        """Encode une durée."""
+        return int(pd.Timedelta(valeur) // pd.Timedelta(1, 'us'))
+
+    def décoder_valeur(self, valeur: int) -> datetime.timedelta:
+        """Décode une durée."""
+        return datetime.timedelta(microseconds=valeur)
+
+    def encoder(self, série: pd.Series) -> pd.Series:
+        """Encode une colonne de durées."""
+        durées = pd.to_timedelta(série)
+        microsecondes = durées.to_numpy().view('i8') // 1000
+        microsecondes = pd.Series(microsecondes.astype(object),
+                                  index=série.index)
+        return microsecondes.where(durées.notna(), None)
+
+    def décoder(self, série: pd.Series) -> pd.Series:
+        """Décode une colonne de durées."""
+        return pd.to_timedelta(série.astype('Int64'), unit='us')
+
+
+def codecs(table: sqla.Table) -> dict[str, Codec]:
+    """
+    Retourne les colonnes encodées d'un tableau.
+
+    :param table: Tableau.
+    :type table: sqlalchemy.Table
+    :return: Types encodés, par nom de colonne.
+    :rtype: dict[str, Codec]
+
+    """
+    return {c.name: c.type for c in table.columns if isinstance(c.type, Codec)}
+
+
+def table_brute(table: sqla.Table) -> sqla.Table:
+    """
+    Retourne une copie du tableau où les colonnes encodées ont leur type brut.
+
+    Écrire des valeurs déjà encodées par colonne dans ce tableau évite
+    d'encoder chaque valeur séparément. La copie n'a pas de contraintes
+    externes et n'appartient pas au schéma du tableau.
+
+    :param table: Tableau.
+    :type table: sqlalchemy.Table
+    :return: Le tableau lui-même s'il n'a pas de colonne encodée, sinon
+        une copie.
+    :rtype: sqlalchemy.Table
+
+    """
+    encodées = codecs(table)
+    if not encodées:
+        return table
+
+    colonnes = []
+    for c in table.columns:
+        défaut = c.default.arg if c.default is not None else None
+        if c.name in encodées:
+            type_ = encodées[c.name].impl
+            if c.default is not None and c.default.is_scalar:
+                défaut = encodées[c.name].process_bind_param(défaut, None)
+        else:
+            type_ = c.type
+
+        colonnes.append(sqla.Column(c.name,
+                                    type_,
+                                    primary_key=c.primary_key,
+                                    autoincrement=c.autoincrement,
+                                    nullable=c.nullable,
+                                    default=défaut))
+
+    return sqla.Table(table.name, sqla.MetaData(), *colonnes)
+
+
+def encoder(encodées: dict[str, Codec], df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Encode les colonnes d'un DataFrame, une colonne à la fois.
+
+    :param encodées: Types encodés, par nom de colonne.
+    :type encodées: dict[str, Codec]
+    :param df: Valeurs à encoder.
+    :type df: pd.DataFrame
+    :return: Valeurs encodées.
+    :rtype: pd.DataFrame
+
+    """
+    colonnes = {c: t.encoder(df[c]) for c, t in encodées.items()
+                if c in df.columns}
+    return df.assign(**colonnes) if colonnes else df
+
+
+def encoder_rangée(encodées: dict[str, Codec],
+                   rangée: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Encode les valeurs d'une seule rangée.
+
+    :param encodées: Types encodés, par nom de colonne.
+    :type encodées: dict[str, Codec]
+    :param rangée: Valeurs à encoder, par colonne.
+    :type rangée: Mapping[str, Any]
+    :return: Valeurs encodées.
+    :rtype: dict[str, Any]
+
+    """
+    return {c: encodées[c].process_bind_param(v, None)
+            if c in encodées else v
+            for c, v in rangée.items()}
+
+
+def décoder(encodées: dict[str, Codec], df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Décode les colonnes d'un DataFrame, une colonne à la fois.
+
+    :param encodées: Types encodés, par nom de colonne.
+    :type encodées: dict[str, Codec]
+    :param df: Valeurs brutes lues de la base de données.
+    :type df: pd.DataFrame
+    :return: Valeurs décodées.
+    :rtype: pd.DataFrame
+
+    """
+    colonnes = {c: t.décoder(df[c]) for c, t in encodées.items()
+                if c in df.columns}
+    return df.assign(**colonnes) if colonnes else df
+
+
+def brute(colonne: sqla.Column) -> sqla.sql.ColumnElement:
+    """
+    Retourne une colonne à sélectionner sans décodage.
+
+    :param colonne: Colonne d'un tableau.
+    :type colonne: sqlalchemy.Column
+    :return: La colonne, ou la colonne avec son type brut si elle est
+        encodée.
+    :rtype: sqlalchemy.sql.ColumnElement
+
+    """
+    if isinstance(colonne.type, Codec):
+        return sqla.type_coerce(colonne,
+                                colonne.type.impl).label(colonne.name)
+    return colonne
+
+
+def _migrer(con: sqla.engine.Connection,
+            table: sqla.Table,
+            colonne: str,
+            lire: Callable[[Any], Any],
+            taille: int,
+            cible: str = None) -> int:
+    """Réécrit par lots les valeurs que lire sait convertir."""
+    codec = table.columns[colonne].type
+    clé = table.columns['index']
+    # Valeurs telles que retournées par le pilote, sans traitement
+    blob = sqla.type_coerce(table.columns[colonne], sqla.types.NullType())
+    brut = table_brute(table).columns[colonne]
+
+    if isinstance(codec, Codec):
+        encoder_série = codec.encoder
+    else:
+        def encoder_série(série: pd.Series) -> pd.Series:
+            return série
+
+    if cible is None:
+        cible, destination = colonne, table
+    else:
+        # Toutes les valeurs sont copiées, converties ou non
+        destination = sqla.table(table.name,
+                                 sqla.column('index'),
+                                 sqla.column(cible))
+
+    requête = destination.update()
+    requête = requête.where(destination.c['index'] == sqla.bindparam('pk'))
+    requête = requête.values({cible: sqla.bindparam('valeur',
+                                                    type_=brut.type)})
+
+    total, dernier = 0, None
+    while True:
+        sélection = sqla.select(clé, blob).where(blob.is_not(None))
+        if dernier is not None:
+            sélection = sélection.where(clé > dernier)
+        sélection = sélection.order_by(clé).limit(taille)
+
+        rangées = con.execute(sélection).all()
+        if not rangées:
+            break
+
+        dernier = rangées[-1][0]
+        lot = pd.DataFrame(rangées, columns=['pk', 'valeur'])
+        valeurs = lot['valeur'].map(lire)
+        à_convertir = valeurs.map(lambda v: v is not _DÉJÀ_CONVERTIE)
+        à_convertir = à_convertir.astype(bool)
+
+        if destination is table:
+            lot = lot.loc[à_convertir]
+            if lot.empty:
+                continue
+            lot = lot.assign(valeur=encoder_série(valeurs[lot.index]))
+        else:
+            convertis = encoder_série(valeurs[à_convertir])
+            lot = lot.assign(valeur=lot['valeur'].astype(object)
+                             .where(~à_convertir, convertis))
+        con.execute(requête, enregistrements(lot, index=False))
+        total += lot.shape[0]
+
+    return total
+
+
+def _dépickler(valeur: Any) -> Any:
+    try:
+        return pickle.loads(valeur)
+    except Exception:
+        return _DÉJÀ_CONVERTIE
+
+
+def _lire_intervalle(valeur: Any) -> Any:
+    # sqlalchemy.Interval enregistre une date après l'époque, sauf pour
+    # les bases de données qui ont un type d'intervalle natif
+    if isinstance(valeur, int):
+        return _DÉJÀ_CONVERTIE
+    if isinstance(valeur, datetime.timedelta):
+        return valeur
+    if isinstance(valeur, str):
+        valeur = datetime.datetime.fromisoformat(valeur)
+    return valeur - _ÉPOQUE
+
+
+def migrer_pickle(con: sqla.engine.Connection,
+                  table: sqla.Table,
+                  colonne: str,
+                  taille: int = TAILLE_LOT,
+                  cible: str = None) -> int:
+    """
+    Convertit une colonne de valeurs picklées vers son nouveau type.
+
+    Les rangées sont lues et réécrites par lots, en ordre d'index. La
+    colonne doit déjà être déclarée avec son nouveau type dans table,
+    un Codec ou un type sans encodage comme sqlalchemy.UnicodeText. SQLite
+    accepte n'importe quelle valeur dans une colonne BLOB; pour les
+    autres bases de données, les valeurs doivent être écrites dans une
+    autre colonne, du nouveau type brut (voir cible), ou la colonne
+    d'abord convertie avec ALTER TABLE. gestion.synchroniser le fait
+    pour les colonnes relevées par à_migrer.
+
+    Les valeurs qui ne peuvent pas être dépicklées sont considérées déjà
+    converties et laissées telles quelles, de sorte qu'une migration
+    interrompue peut être reprise.
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param table: Tableau à modifier.
+    :type table: sqlalchemy.Table
+    :param colonne: Colonne à convertir.
+    :type colonne: str
+    :param taille: Nombre de rangées par lot, defaults to TAILLE_LOT
+    :type taille: int, optional
+    :param cible: Colonne où écrire les valeurs, du nouveau type brut.
+        Toutes les valeurs y sont alors copiées, converties ou non.
+        Par défaut, la colonne est convertie sur place, defaults to None
+    :type cible: str, optional
+    :return: Nombre de valeurs écrites.
+    :rtype: int
+
+    """
+    return _migrer(con, table, colonne, _dépickler, taille, cible)
+
+
+def migrer_intervalle(con: sqla.engine.Connection,
+                      table: sqla.Table,
+                      colonne: str,
+                      taille: int = TAILLE_LOT,
+                      cible: str = None) -> int:
+    """
+    Convertit une colonne sqlalchemy.Interval vers Durée.
+
+    Comme pour migrer_pickle, les rangées sont réécrites par lots et la
+    migration peut être reprise: les valeurs déjà en microsecondes sont
+    laissées telles quelles. SQLite garde les entiers dans une colonne
+    DATETIME; pour les autres bases de données, les valeurs doivent être
+    écrites dans une autre colonne, de type entier (voir cible).
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param table: Tableau à modifier.
+    :type table: sqlalchemy.Table
+    :param colonne: Colonne à convertir, déclarée Durée dans table.
+    :type colonne: str
+    :param taille: Nombre de rangées par lot, defaults to TAILLE_LOT
+    :type taille: int, optional
+    :param cible: Colonne où écrire les valeurs, voir migrer_pickle,
+        defaults to None
+    :type cible: str, optional
+    :return: Nombre de valeurs écrites.
+    :rtype: int
+
+    """
+    return _migrer(con, table, colonne, _lire_intervalle, taille, cible)
+
+
+def à_migrer(con: sqla.engine.Connection,
+             table: sqla.Table) -> dict[str, Callable]:
+    """
+    Relève les colonnes encore à convertir vers leur nouveau type.
+
+    Une colonne est à convertir si elle contient encore des valeurs
+    picklées ou des intervalles sqlalchemy.Interval. Seules les colonnes
+    dont le type dans la base de données ne correspond pas à celui du
+    schéma sont lues: une colonne BLOB déclarée autrement qu'en binaire,
+    ou une colonne de date déclarée Durée.
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param table: Tableau existant dans la base de données.
+    :type table: sqlalchemy.Table
+    :return: Fonction de migration à utiliser, par colonne.
+    :rtype: dict[str, Callable]
+
+    """
+    réfléchies = {c['name']: c['type']
+                  for c in sqla.inspect(con).get_columns(table.name)}
+    colonnes = {}
+
+    for c in table.columns:
+        if c.name not in réfléchies:
+            continue
+
+        type_ = c.type.impl if isinstance(c.type, Codec) else c.type
+        réfléchi = réfléchies[c.name]
+
+        if isinstance(réfléchi, sqla.types._Binary)\
+                and not isinstance(type_, sqla.types._Binary):
+            def ancienne(v):
+                return isinstance(v, (bytes, memoryview))
+            fonction = migrer_pickle
+        elif isinstance(c.type, Durée)\
+                and isinstance(réfléchi, (sqla.DateTime, sqla.Interval)):
+            def ancienne(v):
+                return not isinstance(v, int)
+            fonction = migrer_intervalle
+        else:
+            continue
+
+        blob = sqla.type_coerce(c, sqla.types.NullType())
+        valeurs = con.execute(sqla.select(blob).where(blob.is_not(None)))
+        if any(ancienne(v) for v in valeurs.scalars()):
+            colonnes[c.name] = fonction
+
+    return colonnes
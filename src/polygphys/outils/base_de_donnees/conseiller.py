@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""Suggestions d'index selon les requêtes mesurées par un Profileur."""
+
+# Bibliothèque standard
+import re
+import math
+
+from typing import Union
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+import pandas as pd
+
+# Imports relatifs
+from .profilage import Profileur
+
+# Identifiant SQL, entre guillemets ou non
+_IDENTIFIANT = r'(?:"[^"]+"|`[^`]+`|\[[^\]]+\]|\w+)'
+# Comparaison d'une colonne qualifiée par son tableau
+_PRÉDICAT = re.compile(rf'({_IDENTIFIANT})\.({_IDENTIFIANT})\s*'
+                       r'(=|<>|!=|<=|>=|<|>|\bIN\b|\bLIKE\b|\bBETWEEN\b)',
+                       re.IGNORECASE)
+# Colonne à droite d'une égalité, comme dans JOIN ... ON a.x = b.y
+_JOINTURE = re.compile(rf'=\s*({_IDENTIFIANT})\.({_IDENTIFIANT})')
+# Opérateurs pouvant utiliser un index pour trouver une valeur exacte
+_ÉGALITÉS = {'=', 'IN'}
+
+
+def _nom(identifiant: str) -> str:
+    return identifiant.strip('"`[]')
+
+
+def colonnes_filtrées(requête: str) -> dict[str, tuple[str]]:
+    """
+    Retourne les colonnes utilisées pour filtrer les rangées d'une requête.
+
+    Les colonnes comparées à une valeur exacte viennent d'abord, suivies
+    d'au plus une colonne comparée à un intervalle: c'est l'ordre dans
+    lequel un index composé peut servir.
+
+    :param requête: Texte ou forme d'une requête SQL.
+    :type requête: str
+    :return: Colonnes, par tableau.
+    :rtype: dict[str, tuple[str]]
+
+    """
+    # Seule la partie après FROM filtre des rangées
+    début = re.search(r'\bFROM\b', requête, re.IGNORECASE)
+    if début is not None:
+        requête = requête[début.end():]
+
+    égalités: dict[str, list[str]] = {}
+    intervalles: dict[str, list[str]] = {}
+
+    for table, colonne, opérateur in _PRÉDICAT.findall(requête):
+        groupe = égalités if opérateur.upper() in _ÉGALITÉS else intervalles
+        colonnes = groupe.setdefault(_nom(table), [])
+        if _nom(colonne) not in colonnes:
+            colonnes.append(_nom(colonne))
+
+    for table, colonne in _JOINTURE.findall(requête):
+        colonnes = égalités.setdefault(_nom(table), [])
+        if _nom(colonne) not in colonnes:
+            colonnes.append(_nom(colonne))
+
+    résultat = {}
+    for table in égalités.keys() | intervalles.keys():
+        colonnes = égalités.get(table, [])
+        colonnes += [c for c in intervalles.get(table, [])
+                     if c not in colonnes][:1]
+        résultat[table] = tuple(colonnes)
+
+    return résultat
+
+
+def couvert(table: sqla.Table, colonnes: tuple[str]) -> bool:
+    """
+    Vérifie si un index existant commence par ces colonnes.
+
+    :param table: Tableau.
+    :type table: sqlalchemy.Table
+    :param colonnes: Colonnes filtrées.
+    :type colonnes: tuple[str]
+    :return: Vrai si un index ou la clé primaire peut servir.
+    :rtype: bool
+
+    """
+    existants = [tuple(c.name for c in i.columns) for i in table.indexes]
+    existants.append(tuple(c.name for c in table.primary_key.columns))
+
+    return any(e[:len(colonnes)] == colonnes for e in existants)
+
+
+def gain(temps: float, rangées: int = None) -> float:
+    """
+    Estime le temps épargné en remplaçant un balayage par un index.
+
+    Un balayage lit n rangées, un index environ log2(n).
+
+    :param temps: Temps passé dans les requêtes, en secondes.
+    :type temps: float
+    :param rangées: Nombre de rangées du tableau, si connu,
+        defaults to None
+    :type rangées: int, optional
+    :return: Temps épargné estimé, en secondes.
+    :rtype: float
+
+    """
+    if rangées is None:
+        return temps
+
+    return temps * (1 - math.log2(rangées + 1) / (rangées + 1))
+
+
+def commande(table: sqla.Table,
+             colonnes: tuple[str],
+             dialecte: sqla.engine.Dialect = None) -> str:
+    """
+    Retourne la commande de création d'un index, pour un dialecte SQL.
+
+    Les identifiants sont mis entre guillemets au besoin selon le
+    dialecte, par exemple avec des accents graves pour MySQL.
+
+    :param table: Tableau.
+    :type table: sqlalchemy.Table
+    :param colonnes: Colonnes de l'index.
+    :type colonnes: tuple[str]
+    :param dialecte: Dialecte SQL, celui par défaut de SQLAlchemy si
+        absent, defaults to None
+    :type dialecte: sqlalchemy.engine.Dialect, optional
+    :return: Commande CREATE INDEX.
+    :rtype: str
+
+    """
+    # Copie, pour ne pas ajouter l'index au schéma
+    copie = table.to_metadata(sqla.MetaData())
+    index = sqla.Index('_'.join(('ix', table.name) + colonnes),
+                       *(copie.columns[c] for c in colonnes))
+
+    return str(sqla.schema.CreateIndex(index).compile(dialect=dialecte))
+
+
+def conseiller(registres: Union[Profileur, pd.DataFrame],
+               metadata: sqla.MetaData,
+               db=None) -> pd.DataFrame:
+    """
+    Suggère des index d'après les requêtes mesurées.
+
+    Pour chaque combinaison de colonnes filtrées sans index qui commence
+    par elles, le temps passé dans les requêtes correspondantes est
+    additionné. Si une base de données est fournie, la taille des
+    tableaux sert à estimer le gain.
+
+    :param registres: Profileur ou DataFrame retourné par
+        Profileur.registres.
+    :type registres: Union[Profileur, pd.DataFrame]
+    :param metadata: Schéma de la base de données.
+    :type metadata: sqlalchemy.MetaData
+    :param db: Base de données, pour compter les rangées, defaults to None
+    :type db: BaseDeDonnées, optional
+    :return: Une suggestion par rangée, en ordre décroissant de gain:
+        tableau, colonnes, nombre de requêtes, temps, rangées, gain et
+        commande de création de l'index, dans le dialecte de db.
+    :rtype: pd.DataFrame
+
+    """
+    if isinstance(registres, Profileur):
+        registres = registres.registres()
+
+    formes = registres.groupby('forme')['durée'].agg(['count', 'sum'])
+    candidats: dict[tuple[str, tuple[str]], list] = {}
+
+    for forme, (nombre, temps) in formes.iterrows():
+        for table, colonnes in colonnes_filtrées(forme).items():
+            if table not in metadata.tables or not colonnes:
+                continue
+            if couvert(metadata.tables[table], colonnes):
+                continue
+
+            total = candidats.setdefault((table, colonnes), [0, 0.])
+            total[0] += nombre
+            total[1] += temps
+
+    dialecte = db.create_engine().dialect if db is not None else None
+    suggestions = []
+    for (table, colonnes), (nombre, temps) in candidats.items():
+        rangées = db.count(table) if db is not None else None
+        suggestions.append({'tableau': table,
+                            'colonnes': colonnes,
+                            'requêtes': int(nombre),
+                            'temps': temps,
+                            'rangées': rangées,
+                            'gain': gain(temps, rangées),
+                            'commande': commande(metadata.tables[table],
+                                                 colonnes,
+                                                 dialecte)})
+
+    suggestions = pd.DataFrame(suggestions,
+                               columns=['tableau',
+                                        'colonnes',
+                                        'requêtes',
+                                        'temps',
+                                        'rangées',
+                                        'gain',
+                                        'commande'])
+
+    return suggestions.sort_values('gain', ascending=False,
+                                   ignore_index=True)
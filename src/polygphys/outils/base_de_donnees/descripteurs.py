@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Descriptions de tableaux, construites une seule fois à partir du schéma."""
+
+# Bibliothèque standard
+from types import MappingProxyType
+from typing import Any
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+import pandas as pd
+
+# Imports relatifs
+from .dtypes import get_type, type_lecture
+from .codages import codecs, table_brute
+
+
+class DescripteurTableau:
+    """
+    Description immuable d'un tableau.
+
+    Contient ce que les accesseurs de schéma de BaseDeDonnées recalculaient
+    à chaque appel: noms et types des colonnes, types à la lecture,
+    valeurs par défaut, références externes, colonnes encodées et requête
+    d'insertion. Les objets pandas retournés sont partagés entre les appels
+    et ne doivent pas être modifiés.
+    """
+
+    __slots__ = ('table',
+                 'nombre',
+                 'colonnes',
+                 'dtypes',
+                 'types_pandas',
+                 'types_python',
+                 'lecture',
+                 'défauts',
+                 'références',
+                 'codecs',
+                 'brute',
+                 'insertion')
+
+    def __init__(self, table: sqla.Table):
+        """
+        Décrit un tableau.
+
+        :param table: Tableau décrit.
+        :type table: sqlalchemy.Table
+        :return: None
+        :rtype: NoneType
+
+        """
+        types_pandas, types_python, défauts, références = {}, {}, {}, {}
+        lecture = {}
+
+        for c in table.columns:
+            types_pandas[c.name] = get_type('sqlalchemy', c.type, 'pandas')
+            types_python[c.name] = get_type('sqlalchemy', c.type, 'python')
+
+            if (t := type_lecture(c)) is not None and c.name != 'index':
+                lecture[c.name] = t
+
+            if c.default is not None and c.default.is_scalar:
+                défauts[c.name] = c.default.arg
+
+            for fk in c.foreign_keys:
+                références[c.name] = tuple(fk.target_fullname.rsplit('.', 1))
+
+        colonnes = pd.Index([c for c in types_pandas if c != 'index'])
+        dtypes = pd.Series([types_pandas[c] for c in colonnes],
+                           index=colonnes,
+                           dtype=object)
+
+        définir = super().__setattr__
+        définir('table', table)
+        définir('nombre', len(table.columns))
+        définir('colonnes', colonnes)
+        définir('dtypes', dtypes)
+        définir('types_pandas', MappingProxyType(types_pandas))
+        définir('types_python', MappingProxyType(types_python))
+        définir('lecture', MappingProxyType(lecture))
+        définir('défauts', MappingProxyType(défauts))
+        définir('références', MappingProxyType(références))
+        définir('codecs', MappingProxyType(codecs(table)))
+        définir('brute', table_brute(table))
+        définir('insertion', self.brute.insert())
+
+    def __setattr__(self, nom: str, valeur: Any):
+        """Empêche la modification d'une description."""
+        raise AttributeError(f'{type(self).__name__} est immuable.')
+
+    def __delattr__(self, nom: str):
+        """Empêche la modification d'une description."""
+        raise AttributeError(f'{type(self).__name__} est immuable.')
+
+    def __repr__(self) -> str:
+        """Représentation du descripteur."""
+        return f'<{type(self).__name__} {self.table.name!r}>'
+
+    def à_jour(self, table: sqla.Table) -> bool:
+        """
+        Vérifie que la description correspond encore au tableau.
+
+        Un tableau remplacé dans les métadonnées, ou auquel des colonnes
+        ont été ajoutées, doit être décrit à nouveau.
+
+        :param table: Tableau actuel.
+        :type table: sqlalchemy.Table
+        :return: Vrai si la description est valide.
+        :rtype: bool
+
+        """
+        return table is self.table and len(table.columns) == self.nombre
+
+
+class DescripteursTableaux:
+    """Descriptions des tableaux d'un schéma, créées au besoin."""
+
+    def __init__(self, metadata: sqla.MetaData):
+        """
+        Crée un registre vide de descriptions.
+
+        :param metadata: Schéma décrit.
+        :type metadata: sqlalchemy.MetaData
+        :return: None
+        :rtype: NoneType
+
+        """
+        self.metadata = metadata
+        self._descripteurs: dict[str, DescripteurTableau] = {}
+
+    def __getitem__(self, nom: str) -> DescripteurTableau:
+        """Retourne la description d'un tableau, à jour."""
+        table = self.metadata.tables[nom]
+        descripteur = self._descripteurs.get(nom)
+
+        if descripteur is None or not descripteur.à_jour(table):
+            descripteur = self._descripteurs[nom] = DescripteurTableau(table)
+
+        return descripteur
+
+    def invalider(self, nom: str = None):
+        """
+        Oublie la description d'un tableau dont le schéma a changé.
+
+        :param nom: Tableau modifié. Si None, toutes les descriptions sont
+            oubliées, defaults to None
+        :type nom: str, optional
+        :return: None
+        :rtype: NoneType
+
+        """
+        if nom is None:
+            self._descripteurs.clear()
+        else:
+            self._descripteurs.pop(nom, None)
@@ -4,14 +4,17 @@
 # Bibliothèque standard
 import pathlib
 import datetime
-import logging
 
 import tkinter as tk
 
-from typing import Union, Any
+from typing import Union, Any, Callable, Mapping, Optional
 
 # Bibliothèque PIPy
 import sqlalchemy as sqla
+import pandas as pd
+
+# Imports relatifs
+from .codages import Codec, Chemin, Durée, JSONCompact
 
 # Correspondances de types entre différents modules standards.
 # Pour tkinter, voir la section «variables» de
@@ -21,11 +24,19 @@ import sqlalchemy as sqla
 # Pour SQLAlchemy voir
 # https://docs.sqlalchemy.org/en/14/core/type_basics.html
 TYPES: tuple[dict[str, Union[str, type]]] = (
-    {  # Type générique
+    {  # Chaîne de caractères
+        # Avant le type générique, pour que str corresponde à du texte
+        'config': 'str',
+        'python': str,
+        'pandas': 'string',
+        'sqlalchemy': sqla.UnicodeText(),
+        'tk': tk.StringVar
+    },
+    {  # Type générique, enregistré en JSON
         'config': None,
         'python': str,
         'pandas': 'object',
-        'sqlalchemy': sqla.PickleType(),
+        'sqlalchemy': JSONCompact(),
         'tk': tk.StringVar
     },
     {  # Dates
@@ -53,14 +64,7 @@ TYPES: tuple[dict[str, Union[str, type]]] = (
         'config': 'datetime.timedelta',
         'python': datetime.timedelta,
         'pandas': 'period[ns]',
-        'sqlalchemy': sqla.Interval(),
-        'tk': tk.StringVar
-    },
-    {  # Chaîne de caractères
-        'config': 'str',
-        'python': str,
-        'pandas': 'string',
-        'sqlalchemy': sqla.UnicodeText(),
+        'sqlalchemy': Durée(),
         'tk': tk.StringVar
     },
     {  # Nombres entiers
@@ -88,16 +92,72 @@ TYPES: tuple[dict[str, Union[str, type]]] = (
         'config': 'pathlib.Path',
         'python': pathlib.Path,
         'pandas': 'object',
-        'sqlalchemy': sqla.PickleType(),
+        'sqlalchemy': Chemin(),
         'tk': tk.StringVar
     }
 )
 
 
+# Formats de description de types
+FORMATS: tuple[str] = ('config', 'python', 'pandas', 'sqlalchemy', 'tk')
+
+
+def clé_type(de: str, t: Union[Any, type, str]) -> Any:
+    """
+    Retourne la clé de recherche d'un type dans un format.
+
+    Les types SQLAlchemy sont identifiés par leur classe, les types pandas
+    par leur nom.
+
+    :param de: Format du type.
+    :type de: str
+    :param t: Type ou description de type.
+    :type t: Union[Any, type, str]
+    :return: Clé de recherche.
+    :rtype: Any
+
+    """
+    if de == 'sqlalchemy':
+        return t if isinstance(t, type) else type(t)
+    elif de == 'pandas' and not isinstance(t, str):
+        return str(t)
+    else:
+        return t
+
+
+def compiler_registre() -> dict[tuple[str, str], dict]:
+    """
+    Construit les tables de correspondance pour chaque paire de formats.
+
+    Pour une même clé, la première entrée de TYPES a priorité.
+
+    :return: Tables de correspondance, par paire (de, à).
+    :rtype: dict[tuple[str, str], dict]
+
+    """
+    registre = {}
+    for de in FORMATS:
+        for à in FORMATS:
+            table = registre[de, à] = {}
+            for s in TYPES:
+                table.setdefault(clé_type(de, s[de]), s[à])
+
+    return registre
+
+
+_REGISTRE: dict[tuple[str, str], dict] = compiler_registre()
+_GÉNÉRIQUE: dict[str, Union[str, type]] = next(x for x in TYPES
+                                               if x['config'] is None)
+
+
 def get_type(de: str, t: Union[Any, type, str], à: str) -> Union[type, str]:
     """
     Retourne un type ou description de type dans le bon format.
 
+    Un type SQLAlchemy absent du registre est cherché selon ses classes
+    parentes, puis selon le type qu'il décore, le cas échéant. Le résultat
+    est gardé pour les prochains appels.
+
     :param de: Format de départ.
     :type de: str
     :param t: Type ou description de type dans le format de départ.
@@ -108,15 +168,160 @@ def get_type(de: str, t: Union[Any, type, str], à: str) -> Union[type, str]:
     :rtype: Union[type, str]
 
     """
+    table = _REGISTRE[de, à]
+    clé = clé_type(de, t)
+
+    try:
+        return table[clé]
+    except KeyError:
+        pass
+    except TypeError:  # Type non hachable
+        return _GÉNÉRIQUE[à]
+
+    if de == 'sqlalchemy':
+        for parent in clé.__mro__[1:]:
+            if parent in table:
+                table[clé] = table[parent]
+                return table[clé]
+
+        # Variantes et types décorés
+        impl = getattr(t, 'impl', None)
+        if impl is not None and not isinstance(t, type):
+            return get_type(de, impl, à)
+
+    return _GÉNÉRIQUE[à]
+
+
+def _entiers(série: pd.Series) -> pd.Series:
+    série = pd.to_numeric(série)
+    return série.astype('Int64' if série.hasnans else 'int64')
+
+
+# Conversions vectorisées de colonnes, par type pandas
+CONVERTISSEURS: dict[str, Callable[[pd.Series], pd.Series]] = {
+    'datetime64[D]': pd.to_datetime,
+    'datetime64[ns]': pd.to_datetime,
+    'period[ns]': pd.to_timedelta,
+    'string': lambda série: série.astype('string'),
+    'int64': _entiers,
+    'float64': lambda série: pd.to_numeric(série).astype('float64'),
+    'boolean': lambda série: série.astype('boolean')
+}
+
+
+def convertisseur(de: str,
+                  t: Union[Any, type, str]) -> Callable[[pd.Series],
+                                                        pd.Series]:
+    """
+    Retourne une fonction convertissant une colonne entière vers un type.
+
+    :param de: Format de départ.
+    :type de: str
+    :param t: Type ou description de type dans le format de départ.
+    :type t: Union[Any, type, str]
+    :return: Fonction de conversion, l'identité pour les types génériques.
+    :rtype: Callable[[pd.Series], pd.Series]
+
+    """
+    return CONVERTISSEURS.get(get_type(de, t, 'pandas'), lambda x: x)
+
+
+def convertir(série: pd.Series,
+              de: str,
+              t: Union[Any, type, str]) -> pd.Series:
+    """
+    Convertit une colonne vers un type, sans boucle Python par valeur.
+
+    :param série: Colonne à convertir.
+    :type série: pd.Series
+    :param de: Format du type visé.
+    :type de: str
+    :param t: Type visé, dans le format de.
+    :type t: Union[Any, type, str]
+    :return: Colonne convertie.
+    :rtype: pd.Series
+
+    """
+    return convertisseur(de, t)(série)
+
+
+# Types pandas des colonnes lues, par type SQLAlchemy. Contrairement aux
+# types de TYPES, les entiers et booléens acceptent les valeurs manquantes.
+TYPES_LECTURE: dict[type, str] = {sqla.Integer: 'Int64',
+                                  sqla.Boolean: 'boolean',
+                                  sqla.DateTime: 'datetime64[ns]',
+                                  sqla.Date: 'datetime64[ns]',
+                                  sqla.Float: 'float64'}
+
+# Conversions des colonnes lues, par type pandas
+CONVERSIONS_LECTURE: dict[str, Callable[[pd.Series], pd.Series]] = {
+    'Int64': lambda série: série.astype('Int64'),
+    'boolean': lambda série: série.astype('boolean'),
+    'datetime64[ns]': lambda série: pd.to_datetime(série, errors='coerce'),
+    'float64': lambda série: série.astype('float64'),
+    'category': lambda série: série.astype('category')
+}
+
+
+def type_lecture(colonne: sqla.Column) -> Optional[str]:
+    """
+    Retourne le type pandas à donner à une colonne lue.
+
+    Les colonnes déclarées avec catégorie=True (voir column) deviennent des
+    catégories. Les colonnes encodées sont décodées par leur Codec, et n'ont
+    pas de type de lecture.
+
+    :param colonne: Colonne d'un tableau.
+    :type colonne: sqlalchemy.Column
+    :return: Type pandas, ou None pour garder le type lu.
+    :rtype: Optional[str]
+
+    """
+    if colonne.info.get('catégorie', False):
+        return 'category'
+
+    t = colonne.type
+    if isinstance(t, Codec):
+        return None
+
+    # Variantes
+    if isinstance(t, sqla.types.TypeDecorator):
+        t = t.impl
+
+    for parent in type(t).__mro__:
+        if parent in TYPES_LECTURE:
+            return TYPES_LECTURE[parent]
+
+    return None
+
+
+def appliquer_types(df: pd.DataFrame,
+                    types: Mapping[str, str]) -> pd.DataFrame:
+    """
+    Donne aux colonnes lues leur type pandas.
 
-    def comp(x):
-        return x[de] == t
+    Une colonne dont les valeurs ne peuvent pas être converties, ce que
+    permet SQLite, garde son type.
 
-    for s in filter(comp, TYPES):
-        logging.debug('s[à] = %r', s[à])
-        return s[à]
+    :param df: Valeurs lues.
+    :type df: pd.DataFrame
+    :param types: Types pandas, par colonne. Voir type_lecture.
+    :type types: Mapping[str, str]
+    :return: Valeurs converties.
+    :rtype: pd.DataFrame
 
-    return next(filter(lambda x: x['config'] is None, TYPES))[à]
+    """
+    colonnes = {}
+    for c, t in types.items():
+        if c not in df.columns or df[c].dtype == t:
+            continue
+
+        try:
+            colonnes[c] = CONVERSIONS_LECTURE[t](df[c])
+        except (TypeError, ValueError):
+            pass
+
+    return df.assign(**colonnes) if colonnes else df
 
 
 def default(dtype: str) -> Any:
@@ -137,14 +342,36 @@ def default(dtype: str) -> Any:
         return get_type('pandas', dtype, 'python')()
 
 
-def column(name: str, dtype: type = str, *args, **kargs) -> sqla.Column:
+def column(name: str,
+           dtype: type = str,
+           *args,
+           index: bool = False,
+           unique: bool = False,
+           catégorie: bool = False,
+           étiquette: bool = False,
+           **kargs) -> sqla.Column:
     """
     Retourne une description de colonne du bon type et nom.
 
+    Pour un index sur plusieurs colonnes, voir modeles.index.
+
     :param name: Nom de la colonne.
     :type name: str
     :param dtype: Type de la colonne, defaults to str
     :type dtype: type, optional
+    :param index: Créer un index sur la colonne, defaults to False
+    :type index: bool, optional
+    :param unique: Les valeurs de la colonne doivent être uniques. Avec
+        index, l'index créé est unique, defaults to False
+    :type unique: bool, optional
+    :param catégorie: La colonne a peu de valeurs distinctes, répétées
+        souvent. Elle est lue comme une catégorie pandas, ce qui évite de
+        garder une chaîne Python par rangée, defaults to False
+    :type catégorie: bool, optional
+    :param étiquette: La colonne désigne les rangées du tableau là où elles
+        sont référencées, eg dans une grille. Voir
+        references.colonne_étiquette, defaults to False
+    :type étiquette: bool, optional
     :param *args: Arguments supplémentaires transmis au constructeur de colonne.
     :param **kargs: Arguments supplémentaires transmis au constructeur de colonne.
     :return: Description de colonne.
@@ -157,4 +384,10 @@ def column(name: str, dtype: type = str, *args, **kargs) -> sqla.Column:
     if 'default' not in kargs:
         kargs['default'] = def_val
 
-    return sqla.Column(name, dtype, *args, **kargs)
+    if catégorie:
+        kargs['info'] = {**kargs.get('info', {}), 'catégorie': True}
+
+    if étiquette:
+        kargs['info'] = {**kargs.get('info', {}), 'étiquette': True}
+
+    return sqla.Column(name, dtype, *args, index=index, unique=unique, **kargs)
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+"""Écriture en lots dans une base de données."""
+
+# Bibliothèque standard
+from itertools import islice
+from typing import Any, Iterable, Iterator, Mapping
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+import pandas as pd
+import numpy as np
+
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+# Nombre maximal de paramètres liés dans une seule requête, par dialecte.
+# Les versions de SQLite antérieures à 3.32 sont limitées à 999.
+LIMITES_PARAMÈTRES: dict[str, int] = {'sqlite': 999,
+                                      'mysql': 65535,
+                                      'mariadb': 65535,
+                                      'postgresql': 32767,
+                                      'mssql': 2100,
+                                      'oracle': 1000}
+
+# Nombre de rangées envoyées par appel à executemany
+TAILLE_LOT: int = 1000
+
+
+def limite_paramètres(dialecte: sqla.engine.Dialect) -> int:
+    """
+    Retourne le nombre maximal de paramètres liés pour un dialecte.
+
+    :param dialecte: Dialecte SQL utilisé.
+    :type dialecte: sqlalchemy.engine.Dialect
+    :return: Nombre de paramètres permis dans une requête.
+    :rtype: int
+
+    """
+    return LIMITES_PARAMÈTRES.get(dialecte.name, 999)
+
+
+def lots(valeurs: Iterable, taille: int) -> Iterator[list]:
+    """
+    Découpe un itérable en listes d'au plus taille éléments.
+
+    :param valeurs: Valeurs à découper.
+    :type valeurs: Iterable
+    :param taille: Taille maximale des lots.
+    :type taille: int
+    :return: Itérateur de lots.
+    :rtype: Iterator[list]
+
+    """
+    valeurs = iter(valeurs)
+    while lot := list(islice(valeurs, taille)):
+        yield lot
+
+
+def enregistrements(valeurs: pd.DataFrame,
+                    index: bool = True) -> list[dict]:
+    """
+    Convertit un DataFrame en liste de dictionnaires pour executemany.
+
+    Les valeurs manquantes deviennent None et les types numpy des types
+    Python natifs.
+
+    :param valeurs: Valeurs à convertir.
+    :type valeurs: pd.DataFrame
+    :param index: Inclure l'index sous la clé 'index', defaults to True
+    :type index: bool, optional
+    :return: Une liste de dictionnaires, un par rangée.
+    :rtype: list[dict]
+
+    """
+    if index:
+        valeurs = valeurs.rename_axis('index').reset_index()
+
+    valeurs = valeurs.astype(object).where(valeurs.notna(), None)
+
+    return valeurs.to_dict('records')
+
+
+def différences(avant: pd.DataFrame, après: pd.DataFrame) -> pd.DataFrame:
+    """
+    Retourne un masque des cellules de après qui diffèrent de avant.
+
+    Deux valeurs manquantes sont considérées égales. Les rangées absentes
+    de avant sont considérées entièrement modifiées.
+
+    :param avant: Valeurs enregistrées.
+    :type avant: pd.DataFrame
+    :param après: Nouvelles valeurs.
+    :type après: pd.DataFrame
+    :return: DataFrame booléen de même forme que après.
+    :rtype: pd.DataFrame
+
+    """
+    avant = avant.reindex(index=après.index, columns=après.columns)
+    égales = (avant == après) | (avant.isna() & après.isna())
+
+    return ~égales.astype(bool)
+
+
+def mettre_à_jour(con: sqla.engine.Connection,
+                  table: sqla.Table,
+                  valeurs: pd.DataFrame,
+                  seulement_différences: bool = False,
+                  taille: int = TAILLE_LOT) -> int:
+    """
+    Met à jour des rangées existantes, identifiées par leur index.
+
+    Seules les colonnes présentes dans valeurs sont touchées. Les mises à
+    jour sont envoyées par lots avec executemany, sous la forme
+    UPDATE table SET ... WHERE index = :pk.
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param table: Tableau à modifier.
+    :type table: sqlalchemy.Table
+    :param valeurs: Nouvelles valeurs, indexées par la colonne index.
+    :type valeurs: pd.DataFrame
+    :param seulement_différences: Comparer d'abord aux valeurs enregistrées
+        et n'écrire que les cellules modifiées, defaults to False
+    :type seulement_différences: bool, optional
+    :param taille: Nombre de rangées par lot, defaults to TAILLE_LOT
+    :type taille: int, optional
+    :return: Nombre de rangées modifiées.
+    :rtype: int
+
+    """
+    colonnes = [c for c in valeurs.columns
+                if c in table.columns and c != 'index']
+    valeurs = valeurs.loc[:, colonnes]
+
+    if valeurs.empty or not colonnes:
+        return 0
+
+    clé = table.columns['index']
+    taille = min(taille, limite_paramètres(con.dialect))
+    total = 0
+
+    for début in range(0, valeurs.shape[0], taille):
+        lot = valeurs.iloc[début:début + taille]
+
+        if seulement_différences:
+            requête = sqla.select(clé, *(table.columns[c] for c in colonnes))
+            requête = requête.where(clé.in_(lot.index.tolist()))
+            avant = pd.DataFrame(con.execute(requête).all(),
+                                 columns=['index'] + colonnes)
+            masque = différences(avant.set_index('index'), lot)
+        else:
+            masque = pd.DataFrame(True, index=lot.index, columns=colonnes)
+
+        # Les rangées modifiant les mêmes colonnes partagent une requête
+        rangées = enregistrements(lot, index=False)
+        groupes: dict[tuple[str], list[dict]] = {}
+        for pk, rangée, modifiées in zip(lot.index,
+                                         rangées,
+                                         masque.itertuples(index=False)):
+            cols = tuple(c for c, m in zip(colonnes, modifiées) if m)
+            if cols:
+                paramètres = {f'p{i}': rangée[c] for i, c in enumerate(cols)}
+                paramètres['pk'] = pk.item() if hasattr(pk, 'item') else pk
+                groupes.setdefault(cols, []).append(paramètres)
+
+        for cols, paramètres in groupes.items():
+            requête = table.update().where(clé == sqla.bindparam('pk'))
+            requête = requête.values({table.columns[c]: sqla.bindparam(f'p{i}')
+                                      for i, c in enumerate(cols)})
+            total += con.execute(requête, paramètres).rowcount
+
+    return total
+
+
+def requête_upsert(dialecte: sqla.engine.Dialect,
+                   table: sqla.Table,
+                   colonnes: list[str]):
+    """
+    Retourne une requête d'insertion avec mise à jour en cas de conflit.
+
+    Utilise INSERT ... ON CONFLICT DO UPDATE pour SQLite et PostgreSQL,
+    et INSERT ... ON DUPLICATE KEY UPDATE pour MySQL et MariaDB.
+
+    :param dialecte: Dialecte SQL utilisé.
+    :type dialecte: sqlalchemy.engine.Dialect
+    :param table: Tableau à modifier.
+    :type table: sqlalchemy.Table
+    :param colonnes: Colonnes à mettre à jour en cas de conflit.
+    :type colonnes: list[str]
+    :return: La requête, ou None si le dialecte n'est pas supporté.
+    :rtype: sqlalchemy.sql.Insert
+
+    """
+    if dialecte.name == 'sqlite' \
+            and dialecte.dbapi.sqlite_version_info >= (3, 24):
+        insert = sqlite.insert
+    elif dialecte.name == 'postgresql':
+        insert = postgresql.insert
+    elif dialecte.name in ('mysql', 'mariadb'):
+        requête = mysql.insert(table)
+        nouvelles = {c: requête.inserted[c] for c in colonnes}
+        if not nouvelles:
+            # Aucune colonne à modifier, on réécrit l'index tel quel
+            nouvelles = {'index': requête.inserted['index']}
+        return requête.on_duplicate_key_update(nouvelles)
+    else:
+        return None
+
+    requête = insert(table)
+    if colonnes:
+        nouvelles = {c: requête.excluded[c] for c in colonnes}
+        return requête.on_conflict_do_update(index_elements=['index'],
+                                             set_=nouvelles)
+    else:
+        return requête.on_conflict_do_nothing(index_elements=['index'])
+
+
+def upsert(con: sqla.engine.Connection,
+           table: sqla.Table,
+           valeurs: pd.DataFrame,
+           taille: int = TAILLE_LOT):
+    """
+    Insère ou met à jour des rangées selon la préexistence de leur index.
+
+    Les rangées sont envoyées par lots dans la transaction de con. Si le
+    dialecte ne supporte pas d'insertion avec mise à jour en cas de conflit,
+    les index existants sont cherchés lot par lot, puis les rangées sont
+    mises à jour ou insérées.
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param table: Tableau à modifier.
+    :type table: sqlalchemy.Table
+    :param valeurs: Valeurs à écrire, indexées par la colonne index.
+    :type valeurs: pd.DataFrame
+    :param taille: Nombre de rangées par lot, defaults to TAILLE_LOT
+    :type taille: int, optional
+    :return: None
+    :rtype: NoneType
+
+    """
+    colonnes = [c for c in valeurs.columns
+                if c in table.columns and c != 'index']
+    valeurs = valeurs.loc[:, colonnes]
+    requête = requête_upsert(con.dialect, table, colonnes)
+
+    if requête is not None:
+        for lot in lots(enregistrements(valeurs), taille):
+            con.execute(requête, lot)
+        return
+
+    clé = table.columns['index']
+    taille = min(taille, limite_paramètres(con.dialect))
+    for début in range(0, valeurs.shape[0], taille):
+        lot = valeurs.iloc[début:début + taille]
+
+        requête = sqla.select(clé).where(clé.in_(lot.index.tolist()))
+        existe = lot.index.isin(con.execute(requête).scalars().all())
+
+        if existe.any():
+            mettre_à_jour(con, table, lot.loc[existe, :], taille=taille)
+        if not existe.all():
+            con.execute(table.insert(), enregistrements(lot.loc[~existe, :]))
+
+
+def effacer(con: sqla.engine.Connection,
+            table: sqla.Table,
+            index: Iterable,
+            colonne: str = 'index') -> int:
+    """
+    Efface les rangées dont la colonne a une valeur dans index.
+
+    Une requête DELETE ... WHERE colonne IN (...) est envoyée par lot,
+    la taille des lots respectant la limite de paramètres du dialecte.
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param table: Tableau à modifier.
+    :type table: sqlalchemy.Table
+    :param index: Valeurs identifiant les rangées à effacer.
+    :type index: Iterable
+    :param colonne: Colonne de sélection, defaults to 'index'
+    :type colonne: str, optional
+    :return: Nombre de rangées effacées.
+    :rtype: int
+
+    """
+    clé = table.columns[colonne]
+    total = 0
+
+    valeurs = (i.item() if hasattr(i, 'item') else i for i in index)
+    for lot in lots(valeurs, limite_paramètres(con.dialect)):
+        total += con.execute(table.delete().where(clé.in_(lot))).rowcount
+
+    return total
+
+
+def insérer_en_bloc(con: sqla.engine.Connection,
+                    table: sqla.Table,
+                    valeurs: pd.DataFrame,
+                    index: bool = True,
+                    taille: int = TAILLE_LOT) -> int:
+    """
+    Insère des rangées en bloc, selon la meilleure stratégie du dialecte.
+
+    - MySQL et MariaDB: INSERT avec plusieurs rangées dans VALUES, en lots
+      respectant la limite de paramètres liés;
+    - autres dialectes, dont SQLite: executemany par lots, dans la
+      transaction de con. SQLAlchemy 2 regroupe alors les rangées
+      automatiquement (insertmanyvalues) quand le pilote le permet.
+
+    Seules les colonnes présentes dans le tableau sont écrites.
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param table: Tableau à modifier.
+    :type table: sqlalchemy.Table
+    :param valeurs: Rangées à insérer.
+    :type valeurs: pd.DataFrame
+    :param index: Écrire l'index de valeurs dans la colonne index. Sinon,
+        la base de données attribue les index, defaults to True
+    :type index: bool, optional
+    :param taille: Nombre de rangées par lot pour executemany,
+        defaults to TAILLE_LOT
+    :type taille: int, optional
+    :return: Nombre de rangées insérées.
+    :rtype: int
+
+    """
+    colonnes = [c for c in valeurs.columns
+                if c in table.columns and c != 'index']
+    rangées = enregistrements(valeurs.loc[:, colonnes], index=index)
+
+    if not rangées:
+        return 0
+
+    if con.dialect.name in ('mysql', 'mariadb'):
+        taille = max(limite_paramètres(con.dialect) // len(rangées[0]), 1)
+        for lot in lots(rangées, taille):
+            con.execute(table.insert().values(lot))
+    else:
+        for lot in lots(rangées, taille):
+            con.execute(table.insert(), lot)
+
+    return len(rangées)
+
+
+def valeur_native(valeur: Any) -> Any:
+    """
+    Convertit une valeur à passer au pilote.
+
+    Les valeurs manquantes deviennent None et les types numpy des types
+    Python natifs, comme dans enregistrements.
+
+    :param valeur: Valeur à convertir.
+    :type valeur: Any
+    :return: Valeur convertie.
+    :rtype: Any
+
+    """
+    if pd.api.types.is_scalar(valeur) and pd.isna(valeur):
+        return None
+    elif isinstance(valeur, np.generic):
+        return valeur.item()
+
+    return valeur
+
+
+def index_automatique(con: sqla.engine.Connection, table: sqla.Table) -> bool:
+    """
+    Vérifie si la base de données attribue elle-même la colonne index.
+
+    Le tableau tel qu'il existe dans la base de données est inspecté, plutôt
+    que sa description: les tableaux créés avant que col_index soit
+    autoincrémenté ont une colonne index BIGINT, que SQLite n'attribue pas.
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param table: Tableau à vérifier.
+    :type table: sqlalchemy.Table
+    :return: Vrai si un index omis est attribué par la base de données.
+    :rtype: bool
+
+    """
+    clé = list(table.primary_key.columns)
+    if len(clé) != 1:
+        return False
+
+    colonnes = sqla.inspect(con).get_columns(table.name)
+    colonne = next((c for c in colonnes if c['name'] == clé[0].name), None)
+    if colonne is None:
+        return False
+
+    if con.dialect.name == 'sqlite':
+        # Seule une colonne INTEGER PRIMARY KEY est un alias de rowid
+        return str(colonne['type']).upper() == 'INTEGER'
+
+    return colonne.get('autoincrement') is True \
+        or colonne.get('identity') is not None \
+        or 'nextval' in str(colonne.get('default') or '')
+
+
+def index_suivant(con: sqla.engine.Connection, table: sqla.Table) -> int:
+    """
+    Retourne l'index suivant le plus grand index d'un tableau.
+
+    À utiliser dans la transaction de l'insertion, pour les tableaux dont
+    l'index n'est pas attribué par la base de données.
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param table: Tableau à modifier.
+    :type table: sqlalchemy.Table
+    :return: Prochain index libre, 0 si le tableau est vide.
+    :rtype: int
+
+    """
+    dernier = con.execute(sqla.select(sqla.func.max(table.c['index']))
+                          ).scalar()
+    return 0 if dernier is None else int(dernier) + 1
+
+
+def insérer_un(con: sqla.engine.Connection,
+               insertion: sqla.sql.Insert,
+               valeurs: Mapping[str, Any],
+               automatique: bool = True) -> Any:
+    """
+    Insère une rangée et retourne la clé primaire attribuée.
+
+    La même requête insertion est réutilisée d'un appel à l'autre; les
+    valeurs sont passées comme paramètres, de sorte que SQLAlchemy ne
+    compile la requête qu'une fois par ensemble de colonnes. La clé est
+    obtenue par RETURNING si le dialecte le permet, sinon par lastrowid.
+
+    Seules les colonnes présentes dans le tableau sont écrites. Si la clé
+    primaire n'est pas donnée, la base de données l'attribue, ou, sans
+    automatique, elle suit le plus grand index (voir index_suivant).
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param insertion: Requête INSERT sans valeurs, eg table.insert().
+    :type insertion: sqlalchemy.sql.Insert
+    :param valeurs: Valeurs de la rangée, par colonne.
+    :type valeurs: Mapping[str, Any]
+    :param automatique: La base de données attribue la colonne index. Voir
+        index_automatique, defaults to True
+    :type automatique: bool, optional
+    :return: Clé primaire de la rangée insérée.
+    :rtype: Any
+
+    """
+    colonnes = insertion.table.columns
+    rangée = {c: valeur_native(v) for c, v in valeurs.items()
+              if c in colonnes}
+
+    if not automatique and rangée.get('index') is None:
+        rangée['index'] = index_suivant(con, insertion.table)
+
+    return con.execute(insertion, rangée).inserted_primary_key[0]
@@ -2,13 +2,287 @@
 """Migration et gestion particulière de bases de données."""
 
 # Bibliothèque standard
+import hashlib
+import datetime
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Callable
 
 # Bibliothèque PIPy
+import sqlalchemy as sqla
+
 from sqlalchemy import MetaData
 
-# Improts relatifs
-from ..database import BaseDeDonnées
+import pandas as pd
+
+# Imports relatifs
+from . import BaseDeDonnées
+from .codages import Codec, encoder, à_migrer
+from .ecriture import upsert
+from .importation import TAILLE_MORCEAU
+
+# Tableau de suivi des schémas appliqués à une base de données.
+# Il ne fait pas partie des schémas des programmes: chaque empreinte
+# appliquée y est notée, de sorte que plusieurs programmes peuvent
+# partager une même base de données.
+_SUIVI = MetaData()
+SCHÉMAS = sqla.Table('_polygphys_schemas',
+                     _SUIVI,
+                     sqla.Column('empreinte', sqla.String(64),
+                                 primary_key=True),
+                     sqla.Column('appliqué', sqla.DateTime()))
+
+# Progression des migrations de données, notée dans la base de données
+# de destination pour pouvoir reprendre une migration interrompue.
+MIGRATIONS = sqla.Table('_polygphys_migrations',
+                        _SUIVI,
+                        sqla.Column('tableau', sqla.String(255),
+                                    primary_key=True),
+                        sqla.Column('dernier', sqla.BigInteger()),
+                        sqla.Column('rangées', sqla.BigInteger()),
+                        sqla.Column('terminé', sqla.Boolean()))
+
+
+def empreinte(schema: MetaData) -> str:
+    """
+    Retourne une empreinte du schéma.
+
+    L'empreinte dépend des tableaux, de leurs colonnes (nom, type,
+    contraintes, références) et de leurs index, mais pas de l'ordre dans
+    lequel ils ont été définis.
+
+    :param schema: Schéma.
+    :type schema: MetaData
+    :return: Empreinte SHA-256, en hexadécimal.
+    :rtype: str
+
+    """
+    description = []
+    for table in sorted(schema.tables.values(), key=lambda t: t.name):
+        colonnes = [(c.name,
+                     repr(c.type),
+                     c.nullable,
+                     c.primary_key,
+                     sorted(fk.target_fullname for fk in c.foreign_keys))
+                    for c in table.columns]
+        index = sorted((str(i.name), [c.name for c in i.columns], i.unique)
+                       for i in table.indexes)
+        description.append((table.name, colonnes, index))
+
+    return hashlib.sha256(repr(description).encode('utf-8')).hexdigest()
+
+
+def à_jour(db: BaseDeDonnées, signature: str = None) -> bool:
+    """
+    Vérifie si le schéma de db a déjà été appliqué, en une seule requête.
+
+    :param db: Base de données.
+    :type db: BaseDeDonnées
+    :param signature: Empreinte du schéma, calculée au besoin,
+        defaults to None
+    :type signature: str, optional
+    :return: Vrai si l'empreinte est notée dans la base de données.
+    :rtype: bool
+
+    """
+    if signature is None:
+        signature = empreinte(db.metadata)
+
+    requête = sqla.select(SCHÉMAS.c.empreinte)
+    requête = requête.where(SCHÉMAS.c.empreinte == signature)
+
+    try:
+        with db.create_engine().connect() as con:
+            return con.execute(requête).first() is not None
+    except sqla.exc.DBAPIError:
+        # Le tableau de suivi n'existe pas encore
+        return False
+
+
+def convertir(con: sqla.engine.Connection,
+              colonne: sqla.Column,
+              migrer: Callable,
+              en_place: bool = None) -> int:
+    """
+    Convertit une colonne relevée par codages.à_migrer.
+
+    SQLite accepte n'importe quelle valeur dans une colonne, qui est donc
+    convertie sur place. Pour les autres bases de données, les valeurs
+    sont écrites dans une nouvelle colonne du nouveau type, qui remplace
+    ensuite l'ancienne.
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param colonne: Colonne du schéma, avec son nouveau type.
+    :type colonne: sqlalchemy.Column
+    :param migrer: codages.migrer_pickle ou codages.migrer_intervalle.
+    :type migrer: Callable
+    :param en_place: Convertir sur place. Par défaut, seulement avec
+        SQLite, defaults to None
+    :type en_place: bool, optional
+    :return: Nombre de valeurs écrites.
+    :rtype: int
+
+    """
+    table = colonne.table
+
+    if en_place is None:
+        en_place = con.dialect.name == 'sqlite'
+
+    if en_place:
+        return migrer(con, table, colonne.name)
+
+    préparateur = con.dialect.identifier_preparer
+    nom_table = préparateur.format_table(table)
+    nom = préparateur.quote(colonne.name)
+    temporaire = f'{colonne.name}__converti'
+
+    # La colonne temporaire existe déjà si une conversion a été interrompue
+    existantes = {c['name'] for c in sqla.inspect(con).get_columns(table.name)}
+    if temporaire not in existantes:
+        type_ = colonne.type.impl if isinstance(colonne.type, Codec) \
+            else colonne.type
+        copie = sqla.Table(table.name,
+                           MetaData(),
+                           sqla.Column(temporaire, type_))
+        définition = sqla.schema.CreateColumn(copie.c[temporaire]).compile(
+            dialect=con.dialect)
+        con.execute(sqla.DDL(f'ALTER TABLE {nom_table} '
+                             f'ADD COLUMN {définition}'))
+
+    n = migrer(con, table, colonne.name, cible=temporaire)
+
+    con.execute(sqla.DDL(f'ALTER TABLE {nom_table} DROP COLUMN {nom}'))
+    con.execute(sqla.DDL(f'ALTER TABLE {nom_table} RENAME COLUMN '
+                         f'{préparateur.quote(temporaire)} TO {nom}'))
+
+    return n
+
+
+@dataclass
+class Migration:
+    """Changements à appliquer à une base de données."""
+
+    tableaux: list[sqla.Table] = field(default_factory=list)
+    colonnes: list[sqla.Column] = field(default_factory=list)
+    index: list[sqla.Index] = field(default_factory=list)
+    # Colonnes picklées ou Interval, avec leur fonction de migration
+    conversions: list[tuple[sqla.Column, Callable]] = field(
+        default_factory=list)
+
+    def __bool__(self) -> bool:
+        """Vrai s'il y a des changements à appliquer."""
+        return bool(self.tableaux
+                    or self.colonnes
+                    or self.index
+                    or self.conversions)
+
+    def appliquer(self, con: sqla.engine.Connection):
+        """
+        Applique les changements, dans la transaction de con.
+
+        :param con: Connexion active.
+        :type con: sqlalchemy.engine.Connection
+        :return: None
+        :rtype: NoneType
+
+        """
+        préparateur = con.dialect.identifier_preparer
+
+        for table in self.tableaux:
+            table.create(con)
+
+        for colonne in self.colonnes:
+            définition = sqla.schema.CreateColumn(colonne).compile(
+                dialect=con.dialect)
+            con.execute(sqla.DDL(f'ALTER TABLE '
+                                 f'{préparateur.format_table(colonne.table)} '
+                                 f'ADD COLUMN {définition}'))
+
+        for index in self.index:
+            index.create(con)
+
+        for colonne, migrer in self.conversions:
+            convertir(con, colonne, migrer)
+
+
+def comparer(con: sqla.engine.Connection, schema: MetaData) -> Migration:
+    """
+    Compare le schéma à la base de données.
+
+    Les ajouts sont relevés: tableaux, colonnes et index absents de la
+    base de données. Les colonnes qui contiennent encore des valeurs
+    picklées ou des intervalles sqlalchemy.Interval sont relevées pour
+    être converties (voir codages.à_migrer). Les autres colonnes retirées
+    ou dont le type a changé ne sont pas touchées.
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param schema: Schéma visé.
+    :type schema: MetaData
+    :return: Changements à appliquer.
+    :rtype: Migration
+
+    """
+    inspecteur = sqla.inspect(con)
+    existants = set(inspecteur.get_table_names())
+    migration = Migration()
+
+    for table in schema.sorted_tables:
+        if table.name not in existants:
+            # Les index sont créés avec le tableau
+            migration.tableaux.append(table)
+            continue
+
+        colonnes = {c['name'] for c in inspecteur.get_columns(table.name)}
+        migration.colonnes.extend(c for c in table.columns
+                                  if c.name not in colonnes)
+
+        index = {i['name'] for i in inspecteur.get_indexes(table.name)}
+        migration.index.extend(i for i in table.indexes
+                               if i.name not in index)
+
+        migration.conversions.extend((table.columns[c], f)
+                                     for c, f in à_migrer(con, table).items())
+
+    return migration
+
+
+def synchroniser(db: BaseDeDonnées) -> Migration:
+    """
+    Applique le schéma de db à la base de données, au besoin.
+
+    Si l'empreinte du schéma est déjà notée, seule cette vérification est
+    faite. Sinon, les ajouts sont calculés par réflexion, puis appliqués
+    et l'empreinte notée dans une seule transaction.
+
+    Les colonnes qui contiennent encore des valeurs picklées ou des
+    intervalles sqlalchemy.Interval sont converties dans la même
+    transaction, voir convertir.
+
+    :param db: Base de données.
+    :type db: BaseDeDonnées
+    :return: Changements appliqués, vides si le schéma était à jour.
+    :rtype: Migration
+
+    """
+    signature = empreinte(db.metadata)
+
+    if à_jour(db, signature):
+        return Migration()
+
+    with db.begin() as con:
+        _SUIVI.create_all(con)
+
+        migration = comparer(con, db.metadata)
+        migration.appliquer(con)
+
+        con.execute(SCHÉMAS.insert(),
+                    {'empreinte': signature,
+                     'appliqué': datetime.datetime.now()})
+
+    return migration
 
 
 def reset(adresse: str, schema: MetaData):
@@ -17,18 +291,272 @@ def reset(adresse: str, schema: MetaData):
     db.réinitialiser()
 
 
-def init(adresse: str, schema: MetaData):
-    """Initialiser une base de données."""
+def init(adresse: str, schema: MetaData) -> BaseDeDonnées:
+    """
+    Initialiser une base de données.
+
+    :param adresse: Adresse de la base de données.
+    :type adresse: str
+    :param schema: Schéma de la base de données.
+    :type schema: MetaData
+    :return: Base de données à jour.
+    :rtype: BaseDeDonnées
+
+    """
     db = BaseDeDonnées(adresse, schema)
+    db.initialiser()
 
-    for t in schema.tables:
-        if t not in db.tables:
-            pass
+    return db
 
 
-def migrer(a: BaseDeDonnées,
+def niveaux(schema: MetaData, tableaux: list[str]) -> list[list[str]]:
+    """
+    Regroupe des tableaux selon leurs références externes.
+
+    Chaque tableau ne dépend que de tableaux des niveaux précédents: les
+    tableaux d'un même niveau peuvent être copiés en parallèle.
+
+    :param schema: Schéma des tableaux.
+    :type schema: MetaData
+    :param tableaux: Noms des tableaux à regrouper.
+    :type tableaux: list[str]
+    :return: Noms des tableaux, par niveau.
+    :rtype: list[list[str]]
+
+    """
+    niveau: dict[str, int] = {}
+
+    for table in schema.sorted_tables:
+        dépendances = {fk.column.table.name for fk in table.foreign_keys}
+        dépendances.discard(table.name)
+        niveau[table.name] = max((niveau[d] + 1 for d in dépendances),
+                                 default=0)
+
+    groupes: dict[int, list[str]] = {}
+    for nom in tableaux:
+        groupes.setdefault(niveau[nom], []).append(nom)
+
+    return [groupes[n] for n in sorted(groupes)]
+
+
+def transformer(morceau: pd.DataFrame,
+                tableau: str,
+                clé: dict[str, str],
+                conv: dict[str, Callable]) -> pd.DataFrame:
+    """
+    Renomme et convertit les colonnes d'un morceau.
+
+    Les clés de clé et conv sont des noms de colonnes, ou des noms de
+    la forme tableau.colonne pour ne viser qu'un tableau. Les fonctions
+    de conv reçoivent une colonne entière (pd.Series), identifiée par son
+    nom dans la destination.
+
+    :param morceau: Rangées lues de la source.
+    :type morceau: pd.DataFrame
+    :param tableau: Nom du tableau.
+    :type tableau: str
+    :param clé: Noms des colonnes de destination, par colonne de source.
+    :type clé: dict[str, str]
+    :param conv: Fonctions de conversion, par colonne de destination.
+    :type conv: dict[str, Callable]
+    :return: Rangées à écrire dans la destination.
+    :rtype: pd.DataFrame
+
+    """
+    noms = {c: clé.get(f'{tableau}.{c}', clé.get(c, c))
+            for c in morceau.columns}
+    morceau = morceau.rename(columns=noms)
+
+    colonnes = {}
+    for c in morceau.columns:
+        f = conv.get(f'{tableau}.{c}', conv.get(c))
+        if f is not None:
+            colonnes[c] = f(morceau[c])
+
+    return morceau.assign(**colonnes) if colonnes else morceau
+
+
+def copier(a: BaseDeDonnées,
            b: BaseDeDonnées,
+           tableau: str,
            clé: dict[str, str],
-           conv: dict[str, Callable]):
-    """Migrer d'une structure à une autre."""
-    pass
+           conv: dict[str, Callable],
+           taille: int = TAILLE_MORCEAU,
+           progression: Callable[[str, int], None] = None) -> int:
+    """
+    Copie un tableau de a vers b, par morceaux, en ordre d'index.
+
+    Chaque morceau est écrit dans la même transaction que la progression,
+    de sorte qu'une copie interrompue reprend après le dernier morceau
+    écrit. Les rangées sont insérées ou mises à jour selon leur index:
+    recopier un morceau n'a pas d'effet.
+
+    :param a: Base de données source.
+    :type a: BaseDeDonnées
+    :param b: Base de données de destination.
+    :type b: BaseDeDonnées
+    :param tableau: Nom du tableau.
+    :type tableau: str
+    :param clé: Noms des colonnes de destination, par colonne de source.
+    :type clé: dict[str, str]
+    :param conv: Fonctions de conversion, par colonne de destination.
+    :type conv: dict[str, Callable]
+    :param taille: Nombre de rangées par morceau,
+        defaults to TAILLE_MORCEAU
+    :type taille: int, optional
+    :param progression: Fonction appelée après chaque morceau avec le nom
+        du tableau et le nombre de rangées copiées, defaults to None
+    :type progression: Callable[[str, int], None], optional
+    :return: Nombre de rangées copiées, incluant celles copiées lors d'une
+        exécution précédente.
+    :rtype: int
+
+    """
+    suivi = MIGRATIONS.c
+    with b.begin() as con:
+        état = con.execute(sqla.select(suivi.dernier,
+                                       suivi.rangées,
+                                       suivi.terminé)
+                           .where(suivi.tableau == tableau)).first()
+
+    if état is None:
+        dernier, total, terminé = None, 0, False
+        with b.begin() as con:
+            con.execute(MIGRATIONS.insert(), {'tableau': tableau,
+                                              'dernier': None,
+                                              'rangées': 0,
+                                              'terminé': False})
+    else:
+        dernier, total, terminé = état
+
+    if terminé:
+        return total
+
+    index = a.table(tableau).columns['index']
+    descripteur = b.descripteur(tableau)
+    progrès = MIGRATIONS.update().where(suivi.tableau == tableau)
+
+    while True:
+        requête = a.requête_select(tableau)
+        if dernier is not None:
+            requête = requête.where(index > dernier)
+        requête = requête.order_by(index).limit(taille)
+
+        morceau = a.lire(tableau, requête)
+        fini = morceau.shape[0] < taille
+
+        if not morceau.empty:
+            dernier = morceau.index[-1]
+            dernier = dernier.item() if hasattr(dernier, 'item') else dernier
+            total += morceau.shape[0]
+
+            morceau = transformer(morceau, tableau, clé, conv)
+            with b.begin() as con:
+                upsert(con,
+                       descripteur.brute,
+                       encoder(descripteur.codecs, morceau))
+                con.execute(progrès.values(dernier=dernier,
+                                           rangées=total,
+                                           terminé=fini))
+        elif fini:
+            with b.begin() as con:
+                con.execute(progrès.values(terminé=True))
+
+        if progression is not None:
+            progression(tableau, total)
+
+        if fini:
+            break
+
+    b.modifié(tableau)
+
+    return total
+
+
+def migrer(a: BaseDeDonnées,
+           b: BaseDeDonnées,
+           clé: dict[str, str] = None,
+           conv: dict[str, Callable] = None,
+           taille: int = TAILLE_MORCEAU,
+           travailleurs: int = 4,
+           progression: Callable[[str, int], None] = None,
+           reprendre: bool = True) -> dict[str, int]:
+    """
+    Migrer d'une structure à une autre.
+
+    Les tableaux de b aussi présents dans a sont copiés en ordre de
+    références externes: un tableau n'est copié qu'une fois ceux auxquels
+    il fait référence copiés. Les tableaux indépendants les uns des autres
+    sont copiés en parallèle, sauf vers SQLite, qui ne permet qu'une
+    écriture à la fois. Seul un morceau par tableau est en mémoire à la
+    fois.
+
+    La progression n'est gardée que pour reprendre une migration
+    interrompue: elle est effacée une fois tous les tableaux copiés, de
+    sorte qu'une migration ultérieure recopie tout.
+
+    :param a: Base de données source.
+    :type a: BaseDeDonnées
+    :param b: Base de données de destination. Son schéma est appliqué
+        avant la copie.
+    :type b: BaseDeDonnées
+    :param clé: Noms des colonnes de destination, par colonne de source.
+        Les noms de la forme tableau.colonne ne visent qu'un tableau,
+        defaults to None
+    :type clé: dict[str, str], optional
+    :param conv: Fonctions de conversion par colonne de destination,
+        appliquées à des colonnes entières. Les noms de la forme
+        tableau.colonne ne visent qu'un tableau, defaults to None
+    :type conv: dict[str, Callable], optional
+    :param taille: Nombre de rangées par morceau,
+        defaults to TAILLE_MORCEAU
+    :type taille: int, optional
+    :param travailleurs: Nombre de tableaux copiés en parallèle,
+        defaults to 4
+    :type travailleurs: int, optional
+    :param progression: Fonction appelée après chaque morceau avec le nom
+        du tableau et le nombre de rangées copiées, defaults to None
+    :type progression: Callable[[str, int], None], optional
+    :param reprendre: Reprendre une migration interrompue. Sinon, tous les
+        tableaux sont recopiés depuis le début, defaults to True
+    :type reprendre: bool, optional
+    :return: Nombre de rangées copiées, par tableau.
+    :rtype: dict[str, int]
+
+    """
+    if clé is None:
+        clé = {}
+    if conv is None:
+        conv = {}
+
+    b.initialiser()
+    with b.begin() as con:
+        _SUIVI.create_all(con)
+        if not reprendre:
+            con.execute(MIGRATIONS.delete())
+
+    if b.create_engine().dialect.name == 'sqlite':
+        travailleurs = 1
+
+    tableaux = [t for t in b.tables if t in a.tables]
+    copiés = {}
+
+    with ThreadPoolExecutor(travailleurs) as groupe:
+        for niveau in niveaux(b.metadata, tableaux):
+            futurs = {t: groupe.submit(copier,
+                                       a,
+                                       b,
+                                       t,
+                                       clé,
+                                       conv,
+                                       taille,
+                                       progression)
+                      for t in niveau}
+            copiés.update((t, f.result()) for t, f in futurs.items())
+
+    # Migration terminée, il n'y a plus rien à reprendre
+    with b.begin() as con:
+        con.execute(MIGRATIONS.delete()
+                    .where(MIGRATIONS.c.tableau.in_(tableaux)))
+
+    return copiés
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""Importation de fichiers par morceaux dans une base de données."""
+
+# Bibliothèque standard
+import pathlib
+import queue
+import time
+
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Iterator, Union
+
+# Bibliothèque PIPy
+import pandas as pd
+import openpyxl
+
+# Imports relatifs
+from .dtypes import convertir as convertir_colonne
+
+# Nombre de rangées par morceau
+TAILLE_MORCEAU: int = 10000
+
+
+def lire_csv(chemin: pathlib.Path,
+             taille: int = TAILLE_MORCEAU,
+             **kargs) -> Iterator[pd.DataFrame]:
+    """Lit un fichier CSV par morceaux."""
+    with pd.read_csv(chemin, chunksize=taille, **kargs) as lecteur:
+        yield from lecteur
+
+
+def lire_table(chemin: pathlib.Path,
+               taille: int = TAILLE_MORCEAU) -> Iterator[pd.DataFrame]:
+    """Lit un fichier texte délimité par des tabulations, par morceaux."""
+    yield from lire_csv(chemin, taille, sep='\t')
+
+
+def lire_xlsx(chemin: pathlib.Path,
+              taille: int = TAILLE_MORCEAU) -> Iterator[pd.DataFrame]:
+    """
+    Lit la première feuille d'un classeur Excel par morceaux.
+
+    Le classeur est ouvert en lecture seule, de sorte que les rangées
+    sont lues au fur et à mesure plutôt que toutes chargées d'un coup.
+    Comme avec pandas.read_csv, l'index des morceaux continue celui du
+    morceau précédent.
+    """
+    classeur = openpyxl.load_workbook(chemin, read_only=True, data_only=True)
+
+    def morceau_df(morceau: list[tuple], début: int) -> pd.DataFrame:
+        index = pd.RangeIndex(début, début + len(morceau))
+        return pd.DataFrame(morceau, columns=entêtes, index=index)
+
+    try:
+        rangées = classeur.worksheets[0].iter_rows(values_only=True)
+        entêtes = next(rangées, None)
+        if entêtes is None:
+            return
+
+        morceau, début = [], 0
+        for rangée in rangées:
+            morceau.append(rangée)
+            if len(morceau) == taille:
+                yield morceau_df(morceau, début)
+                morceau, début = [], début + taille
+
+        if morceau:
+            yield morceau_df(morceau, début)
+    finally:
+        classeur.close()
+
+
+# Lecteurs par morceaux, selon l'extension
+LECTEURS: dict[str, Callable] = {'.csv': lire_csv,
+                                 '.txt': lire_table,
+                                 '.xlsx': lire_xlsx}
+
+
+def lire_morceaux(chemin: pathlib.Path,
+                  type_fichier: Union[str, Callable] = None,
+                  taille: int = TAILLE_MORCEAU) -> Iterator[pd.DataFrame]:
+    """
+    Lit un fichier par morceaux, indexés par la colonne index s'il y en a.
+
+    Les formats sans lecteur par morceaux sont lus d'un coup avec
+    une fonction de lecture pandas, puis découpés.
+
+    :param chemin: Fichier à lire.
+    :type chemin: pathlib.Path
+    :param type_fichier: Extension désignant un lecteur par morceaux, ou
+        fonction de lecture pandas. Par défaut, l'extension du fichier,
+        defaults to None
+    :type type_fichier: Union[str, Callable], optional
+    :param taille: Nombre de rangées par morceau, defaults to TAILLE_MORCEAU
+    :type taille: int, optional
+    :return: Itérateur de DataFrame.
+    :rtype: Iterator[pd.DataFrame]
+
+    """
+    chemin = pathlib.Path(chemin)
+
+    if type_fichier is None:
+        type_fichier = chemin.suffix
+
+    if isinstance(type_fichier, str):
+        morceaux = LECTEURS[type_fichier](chemin, taille)
+    else:
+        df = type_fichier(chemin)
+        morceaux = (df.iloc[i:i + taille] for i in range(0, len(df), taille))
+
+    for morceau in morceaux:
+        if 'index' in morceau.columns:
+            morceau = morceau.set_index('index')
+        yield morceau
+
+
+def convertir(morceau: pd.DataFrame, dtypes: pd.Series) -> pd.DataFrame:
+    """
+    Convertit les colonnes d'un morceau vers les types du tableau.
+
+    Les colonnes absentes du tableau sont retirées.
+
+    :param morceau: Données lues.
+    :type morceau: pd.DataFrame
+    :param dtypes: Types pandas des colonnes du tableau.
+    :type dtypes: pd.Series
+    :return: Données converties.
+    :rtype: pd.DataFrame
+
+    """
+    morceau = morceau.loc[:, [c for c in morceau.columns if c in dtypes]]
+    colonnes = {c: convertir_colonne(v, 'pandas', dtypes[c])
+                for c, v in morceau.items()}
+
+    return morceau.assign(**colonnes)
+
+
+def importer(db,
+             table: str,
+             morceaux: Iterator[pd.DataFrame],
+             travailleurs: int = 2,
+             progression: Callable[[int, float], None] = None) -> int:
+    """
+    Importe des morceaux de données dans un tableau.
+
+    Les morceaux sont convertis en parallèle par un groupe de travailleurs,
+    puis écrits dans l'ordre par un seul fil d'exécution, une transaction
+    par morceau. Le nombre de morceaux en attente est borné, de sorte que
+    la mémoire utilisée ne dépend pas de la taille du fichier.
+
+    Les morceaux indexés par une colonne index mettent à jour les rangées
+    existantes de même index. Les autres sont ajoutés et reçoivent leur
+    index de la base de données, sans toucher aux rangées existantes.
+
+    :param db: Base de données.
+    :type db: BaseDeDonnées
+    :param table: Tableau dans lequel importer les données.
+    :type table: str
+    :param morceaux: Données à importer.
+    :type morceaux: Iterator[pd.DataFrame]
+    :param travailleurs: Nombre de fils de conversion, defaults to 2
+    :type travailleurs: int, optional
+    :param progression: Fonction appelée après chaque morceau avec le nombre
+        de rangées importées et le débit en rangées par seconde,
+        defaults to None
+    :type progression: Callable[[int, float], None], optional
+    :return: Nombre de rangées importées.
+    :rtype: int
+
+    """
+    dtypes = db.dtypes(table)
+    en_attente: queue.Queue = queue.Queue(maxsize=2 * travailleurs)
+    fin = object()
+    début = time.perf_counter()
+
+    def écrire() -> int:
+        total = 0
+        while (futur := en_attente.get()) is not fin:
+            morceau = futur.result()
+            if morceau.index.name == 'index':
+                db.màj(table, morceau)
+            else:
+                db.append(table, morceau, index=False)
+            total += morceau.shape[0]
+
+            if progression is not None:
+                progression(total, total / (time.perf_counter() - début))
+
+        return total
+
+    with ThreadPoolExecutor(travailleurs) as conversion, \
+            ThreadPoolExecutor(1) as écriture:
+        écrivain = écriture.submit(écrire)
+
+        def ajouter(élément):
+            # Si l'écriture échoue, on arrête de lire
+            while not écrivain.done():
+                try:
+                    en_attente.put(élément, timeout=.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        for morceau in morceaux:
+            if not ajouter(conversion.submit(convertir, morceau, dtypes)):
+                break
+
+        ajouter(fin)
+        return écrivain.result()
+
+
+def importer_fichier(db,
+                     table: str,
+                     chemin: pathlib.Path,
+                     type_fichier: Union[str, Callable] = None,
+                     taille: int = TAILLE_MORCEAU,
+                     travailleurs: int = 2,
+                     progression: Callable[[int, float], None] = None,
+                     attendre: bool = True):
+    """
+    Importe un fichier dans un tableau, par morceaux.
+
+    :param db: Base de données.
+    :type db: BaseDeDonnées
+    :param table: Tableau dans lequel importer les données.
+    :type table: str
+    :param chemin: Fichier à importer.
+    :type chemin: pathlib.Path
+    :param type_fichier: Extension désignant un lecteur par morceaux, ou
+        fonction de lecture pandas, defaults to None
+    :type type_fichier: Union[str, Callable], optional
+    :param taille: Nombre de rangées par morceau, defaults to TAILLE_MORCEAU
+    :type taille: int, optional
+    :param travailleurs: Nombre de fils de conversion, defaults to 2
+    :type travailleurs: int, optional
+    :param progression: Fonction appelée après chaque morceau avec le nombre
+        de rangées importées et le débit en rangées par seconde,
+        defaults to None
+    :type progression: Callable[[int, float], None], optional
+    :param attendre: Attendre la fin de l'importation. Sinon, l'importation
+        se fait en arrière-plan et un Future est retourné, defaults to True
+    :type attendre: bool, optional
+    :return: Nombre de rangées importées, ou un Future donnant ce nombre.
+    :rtype: Union[int, concurrent.futures.Future]
+
+    """
+    def f():
+        morceaux = lire_morceaux(chemin, type_fichier, taille)
+        return importer(db, table, morceaux, travailleurs, progression)
+
+    if attendre:
+        return f()
+
+    arrière_plan = ThreadPoolExecutor(1)
+    futur: Future = arrière_plan.submit(f)
+    arrière_plan.shutdown(wait=False)
+
+    return futur
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture de résultats en colonnes, avec pyarrow.
+
+pandas.read_sql garde chaque cellule de tout le résultat comme objet Python
+avant de convertir les colonnes. Ici, les rangées sont lues par lots avec un
+curseur, et chaque lot est converti en colonnes Arrow aussitôt. La conversion
+en DataFrame se fait à la fin, sans copie pour les colonnes numériques sans
+valeurs manquantes.
+
+Les pilotes utilisés (sqlite3, pymysql) ne retournent que des tuples Python:
+chaque lot passe encore par des objets Python avant d'être converti. Le gain
+est donc surtout en mémoire (un seul lot d'objets à la fois, pas de
+DataFrame d'objets), peu en temps.
+
+pyarrow est optionnel: voir disponible.
+"""
+
+# Bibliothèque standard
+from configparser import ConfigParser
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Méthodes de lecture acceptées par BaseDeDonnées
+LECTURES: tuple[str] = ('pandas', 'arrow')
+
+# Nombre de rangées converties à la fois
+TAILLE_LOT_ARROW: int = 65536
+
+
+def disponible() -> bool:
+    """Vérifie si pyarrow est installé."""
+    return pa is not None
+
+
+def vérifier(lecture: str):
+    """
+    Vérifie qu'une méthode de lecture peut être utilisée.
+
+    :param lecture: Méthode de lecture, parmi LECTURES.
+    :type lecture: str
+    :raises ValueError: Si la méthode est inconnue.
+    :raises ImportError: Si pyarrow est demandé mais pas installé.
+    :return: None
+    :rtype: NoneType
+
+    """
+    if lecture not in LECTURES:
+        raise ValueError(f'Méthode de lecture inconnue: {lecture!r}. '
+                         f'Choix: {", ".join(LECTURES)}.')
+    elif lecture == 'arrow' and not disponible():
+        raise ImportError('La lecture arrow nécessite pyarrow.')
+
+
+def lecture_depuis_config(config: ConfigParser,
+                          section: str = 'lecture') -> str:
+    """
+    Lit la méthode de lecture dans une section d'un fichier de configuration.
+
+    :param config: Configuration à lire.
+    :type config: ConfigParser
+    :param section: Section contenant le paramètre, defaults to 'lecture'
+    :type section: str, optional
+    :return: Méthode de lecture, 'pandas' par défaut.
+    :rtype: str
+
+    """
+    lecture = config.get(section, 'méthode', fallback='pandas') or 'pandas'
+    vérifier(lecture)
+
+    return lecture
+
+
+def lire_arrow(con: sqla.engine.Connection,
+               requête: sqla.sql.Select,
+               index_col: str = 'index',
+               taille: int = TAILLE_LOT_ARROW) -> pd.DataFrame:
+    """
+    Exécute une requête et construit le résultat en passant par Arrow.
+
+    Les rangées sont lues en tuples Python par le pilote, puis converties
+    colonne par colonne; seul un lot de rangées Python est en mémoire à la
+    fois. Le type d'une colonne est déduit de ses valeurs; une colonne vide
+    dans un lot prend le type des autres lots. SQLite permet des valeurs de
+    types différents dans une même colonne: le résultat est alors lu avec
+    pandas.read_sql.
+
+    :param con: Connexion active.
+    :type con: sqlalchemy.engine.Connection
+    :param requête: Requête à exécuter.
+    :type requête: sqlalchemy.sql.Select
+    :param index_col: Colonne servant d'index, defaults to 'index'
+    :type index_col: str, optional
+    :param taille: Nombre de rangées par lot, defaults to TAILLE_LOT_ARROW
+    :type taille: int, optional
+    :return: Résultat de la requête.
+    :rtype: pd.DataFrame
+
+    """
+    con = con.execution_options(stream_results=True, max_row_buffer=taille)
+    résultat = con.execute(requête)
+    colonnes = list(résultat.keys())
+
+    tableaux = []
+    try:
+        for lot in résultat.partitions(taille):
+            valeurs = zip(*lot)
+            tableaux.append(pa.table([pa.array(v) for v in valeurs],
+                                     names=colonnes))
+    except pa.ArrowException:
+        # Valeurs de types différents dans une même colonne
+        résultat.close()
+        return pd.read_sql(requête, con, index_col=index_col)
+
+    if not tableaux:
+        return pd.DataFrame(columns=colonnes).set_index(index_col)
+
+    tableau = pa.concat_tables(tableaux, promote_options='default')
+    del tableaux
+
+    df = tableau.to_pandas(split_blocks=True, self_destruct=True)
+    return df.set_index(index_col)
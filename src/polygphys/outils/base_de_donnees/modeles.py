@@ -2,7 +2,8 @@
 """Modèles de base de données."""
 
 # Bibliothèque PIPy
-from sqlalchemy import MetaData, Table, Column, ForeignKey
+from sqlalchemy import MetaData, Table, Column, ForeignKey, Index
+from sqlalchemy import BigInteger, Integer
 
 # Imports relatifs
 from .dtypes import column
@@ -12,11 +13,41 @@ def col_index() -> Column:
     """
     Retourne une colonne d'index.
 
+    L'index est attribué par la base de données quand il n'est pas donné.
+    Avec SQLite, seule une colonne INTEGER PRIMARY KEY est attribuée
+    automatiquement, d'où la variante.
+
     :return: Colonne d'index
     :rtype: Column
 
     """
-    return column('index', int, primary_key=True, autoincrement=True)
+    return Column('index',
+                  BigInteger().with_variant(Integer(), 'sqlite'),
+                  primary_key=True,
+                  autoincrement=True)
+
+
+def index(table: str, *colonnes: str, unique: bool = False) -> Index:
+    """
+    Retourne un index sur une ou plusieurs colonnes d'un tableau.
+
+    L'index est à passer au constructeur du tableau, avec les colonnes.
+    Son nom inclut celui du tableau, parce que les noms d'index doivent
+    être uniques dans toute la base de données pour certains dialectes.
+
+    :param table: Nom du tableau.
+    :type table: str
+    :param *colonnes: Noms des colonnes, dans l'ordre de l'index.
+    :type *colonnes: str
+    :param unique: Les combinaisons de valeurs doivent être uniques,
+        defaults to False
+    :type unique: bool, optional
+    :return: Index
+    :rtype: Index
+
+    """
+    nom = '_'.join(('ux' if unique else 'ix', table) + colonnes)
+    return Index(nom, *colonnes, unique=unique)
 
 
 def personnes(metadata: MetaData) -> Table:
@@ -31,10 +62,10 @@ def personnes(metadata: MetaData) -> Table:
     """
     cols = [col_index(),  # Index
             column('matricule', str),  # Matricule institutionnel
-            column('nom', str),  # Nom
+            column('nom', str, étiquette=True),  # Nom
             column('prénom', str),  # Prénom
             column('courriel', str),  # Courriel institutionnel
-            column('role', str)  # Rôle comme employé
+            column('role', str, catégorie=True)  # Rôle comme employé
             ]
 
     return Table('personnes', metadata, *cols)
@@ -54,7 +85,11 @@ def locaux(metadata: MetaData) -> Table:
     matricule = metadata.tables['personnes'].columns['index']
     cols = [col_index(),  # Index
             column('porte principale', str),  # N  de orte principale du local
-            column('responsable', int, ForeignKey(matricule), default=1),
+            column('responsable',
+                   int,
+                   ForeignKey(matricule),
+                   default=1,
+                   index=True),
             column('description', str),  # Description du local
             column('utilisation', str)  # Résumé de l'utilisation du local
             ]
@@ -76,7 +111,7 @@ def portes(metadata: MetaData) -> Table:
     local = metadata.tables['locaux'].columns['index']
     cols = [col_index(),  # Index
             column('numéro', str),  # N  de porte
-            column('local', int, ForeignKey(local), default=1)
+            column('local', int, ForeignKey(local), default=1, index=True)
             ]
 
     return Table('portes', metadata, *cols)
@@ -99,12 +134,16 @@ def etageres(metadata: MetaData) -> Table:
     matricule = metadata.tables['personnes'].columns['index']
 
     cols = [col_index(),  # Index
-            column('local', int, ForeignKey(local), default=1),
-            column('responsable', int, ForeignKey(matricule), default=1),
+            column('local', int, ForeignKey(local), default=1, index=True),
+            column('responsable',
+                   int,
+                   ForeignKey(matricule),
+                   default=1,
+                   index=True),
             column('numéro', str),  # Numéro d'étagère dans la pièce
             column('tablette', str),  # N  de tablette
             column('sous-division', str),  # Au besoin
-            column('designation', str),  # Nom court
+            column('designation', str, étiquette=True),  # Nom court
             column('description', str)  # Description plus détaillée
             ]
 
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""Registre de moteurs de base de données partagés, par adresse."""
+
+# Bibliothèque standard
+import threading
+
+from dataclasses import dataclass
+from configparser import ConfigParser
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+
+from sqlalchemy.pool import QueuePool, SingletonThreadPool, StaticPool
+
+# Moteurs déjà créés, par adresse.
+# Créer un moteur ouvre un nouveau bassin de connexions: pour une base de
+# données distante, ça implique une nouvelle connexion TCP et une nouvelle
+# authentification. On garde donc un seul moteur par adresse.
+_MOTEURS: dict[str, sqla.engine.Engine] = {}
+_VERROU = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ParamètresPool:
+    """Paramètres du bassin de connexions d'un moteur."""
+
+    # Nombre de connexions gardées ouvertes
+    taille: int = 5
+    # Nombre de connexions supplémentaires permises temporairement
+    débordement: int = 10
+    # Durée de vie maximale d'une connexion, en secondes
+    recyclage: int = 3600
+    # Vérifier qu'une connexion est encore valide avant de l'utiliser
+    vérification: bool = True
+    # Pour SQLite, niveau PRAGMA synchronous (OFF, NORMAL, FULL), inchangé
+    # si vide. NORMAL n'est sans risque qu'avec le journal WAL.
+    synchronisation: str = ''
+    # Pour SQLite, PRAGMA journal_mode, inchangé si vide.
+    # WAL est plus rapide, mais ne fonctionne pas sur un disque réseau.
+    journal: str = ''
+
+    @classmethod
+    def depuis_config(cls,
+                      config: ConfigParser,
+                      section: str = 'pool') -> 'ParamètresPool':
+        """
+        Lit les paramètres dans une section d'un fichier de configuration.
+
+        :param config: Configuration à lire.
+        :type config: ConfigParser
+        :param section: Section contenant les paramètres, defaults to 'pool'
+        :type section: str, optional
+        :return: Paramètres du bassin de connexions.
+        :rtype: ParamètresPool
+
+        """
+        défaut = cls()
+        return cls(config.getint(section, 'taille', fallback=défaut.taille),
+                   config.getint(section,
+                                 'débordement',
+                                 fallback=défaut.débordement),
+                   config.getint(section,
+                                 'recyclage',
+                                 fallback=défaut.recyclage),
+                   config.getboolean(section,
+                                     'vérification',
+                                     fallback=défaut.vérification),
+                   config.get(section,
+                              'synchronisation',
+                              fallback=défaut.synchronisation),
+                   config.get(section, 'journal', fallback=défaut.journal))
+
+
+def arguments_moteur(adresse: str, paramètres: ParamètresPool) -> dict:
+    """
+    Retourne les arguments à passer à sqlalchemy.create_engine.
+
+    SQLite en mémoire utilise une connexion unique partagée, sans quoi
+    chaque connexion verrait une base de données vide différente.
+
+    :param adresse: Adresse de la base de données.
+    :type adresse: str
+    :param paramètres: Paramètres du bassin de connexions.
+    :type paramètres: ParamètresPool
+    :return: Arguments nommés pour sqlalchemy.create_engine.
+    :rtype: dict
+
+    """
+    url = sqla.engine.make_url(str(adresse))
+    kargs = {'future': True}
+
+    if url.get_backend_name() == 'sqlite':
+        kargs['connect_args'] = {'check_same_thread': False}
+
+        if url.database in (None, '', ':memory:'):
+            kargs['poolclass'] = StaticPool
+            return kargs
+
+    kargs.update(poolclass=QueuePool,
+                 pool_size=paramètres.taille,
+                 max_overflow=paramètres.débordement,
+                 pool_recycle=paramètres.recyclage,
+                 pool_pre_ping=paramètres.vérification)
+
+    return kargs
+
+
+def connexion_unique(moteur: sqla.engine.Engine) -> bool:
+    """
+    Vérifie si un moteur n'a qu'une connexion.
+
+    Avec StaticPool, tous les fils d'exécution partagent la même
+    connexion: une transaction ouverte par l'un est vue par les autres.
+    Avec SingletonThreadPool, chaque fil a la sienne, et une base de
+    données en mémoire n'est visible que d'un seul fil.
+
+    :param moteur: Moteur de base de données.
+    :type moteur: sqlalchemy.engine.Engine
+    :return: Vrai si un autre fil d'exécution ne peut pas écrire sans
+        nuire à celui qui utilise la connexion.
+    :rtype: bool
+
+    """
+    return isinstance(moteur.pool, (StaticPool, SingletonThreadPool))
+
+
+def régler_sqlite(moteur: sqla.engine.Engine, paramètres: ParamètresPool):
+    """
+    Règle la journalisation et les transactions des connexions SQLite.
+
+    Ces réglages ne peuvent pas être changés à l'intérieur d'une
+    transaction, on les applique donc à l'ouverture des connexions.
+
+    Le pilote sqlite3 commence et termine lui-même les transactions, ce qui
+    empêche les points de sauvegarde (SAVEPOINT) de fonctionner. On lui
+    retire ce rôle pour que SQLAlchemy commence chaque transaction.
+    Voir la section «Serializable isolation / Savepoints / Transactional
+    DDL» de https://docs.sqlalchemy.org/en/14/dialects/sqlite.html
+
+    :param moteur: Moteur SQLite.
+    :type moteur: sqlalchemy.engine.Engine
+    :param paramètres: Paramètres du bassin de connexions.
+    :type paramètres: ParamètresPool
+    :return: None
+    :rtype: NoneType
+
+    """
+    pragmas = ['PRAGMA temp_store = MEMORY']
+    if paramètres.synchronisation:
+        pragmas.append(f'PRAGMA synchronous = {paramètres.synchronisation}')
+    if paramètres.journal:
+        pragmas.append(f'PRAGMA journal_mode = {paramètres.journal}')
+
+    @sqla.event.listens_for(moteur, 'connect')
+    def connexion(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+        curseur = dbapi_connection.cursor()
+        for pragma in pragmas:
+            curseur.execute(pragma)
+        curseur.close()
+
+    @sqla.event.listens_for(moteur, 'begin')
+    def début(con):
+        # Directement par le pilote, pour ne pas compter comme une requête
+        curseur = con.connection.cursor()
+        curseur.execute('BEGIN')
+        curseur.close()
+
+
+def obtenir_moteur(adresse: str,
+                   paramètres: ParamètresPool = None) -> sqla.engine.Engine:
+    """
+    Retourne le moteur associé à une adresse, en le créant au besoin.
+
+    Les paramètres ne sont utilisés qu'à la création du moteur.
+
+    :param adresse: Adresse de la base de données.
+    :type adresse: str
+    :param paramètres: Paramètres du bassin de connexions, defaults to None
+    :type paramètres: ParamètresPool, optional
+    :return: Moteur de base de données.
+    :rtype: sqlalchemy.engine.Engine
+
+    """
+    adresse = str(adresse)
+
+    with _VERROU:
+        if adresse not in _MOTEURS:
+            if paramètres is None:
+                paramètres = ParamètresPool()
+
+            kargs = arguments_moteur(adresse, paramètres)
+            moteur = sqla.create_engine(adresse, **kargs)
+
+            if moteur.dialect.name == 'sqlite':
+                régler_sqlite(moteur, paramètres)
+
+            _MOTEURS[adresse] = moteur
+
+        return _MOTEURS[adresse]
+
+
+def fermer_moteur(adresse: str):
+    """
+    Ferme les connexions du moteur associé à une adresse.
+
+    Le moteur est retiré du registre, un prochain appel à obtenir_moteur
+    en créera un nouveau.
+
+    :param adresse: Adresse de la base de données.
+    :type adresse: str
+    :return: None
+    :rtype: NoneType
+
+    """
+    with _VERROU:
+        moteur = _MOTEURS.pop(str(adresse), None)
+
+    if moteur is not None:
+        moteur.dispose()
+
+
+def fermer_moteurs():
+    """
+    Ferme tous les moteurs du registre.
+
+    :return: None
+    :rtype: NoneType
+
+    """
+    with _VERROU:
+        adresses = list(_MOTEURS)
+
+    for adresse in adresses:
+        fermer_moteur(adresse)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Pagination par clés (keyset), pour parcourir de grands tableaux.
+
+Au lieu de sauter les n premières rangées avec OFFSET, ce qui oblige la
+base de données à les lire, chaque page commence après les dernières
+valeurs de tri de la page précédente. Avec un index sur les colonnes de
+tri, le coût d'une page ne dépend que de sa taille.
+
+Les dernières valeurs sont transmises dans un jeton de continuation
+opaque, à passer tel quel pour obtenir la page suivante. Les valeurs des
+colonnes encodées (voir codages) y sont gardées encodées.
+"""
+
+# Bibliothèque standard
+import json
+import base64
+import datetime
+
+from typing import Any, Union
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+
+# Imports relatifs
+from .dtypes import get_type
+from .codages import Codec
+from .ecriture import valeur_native
+
+
+def colonnes_tri(order_by: Union[str, list[str]]) -> list[str]:
+    """
+    Retourne les colonnes de tri, terminées par la colonne index.
+
+    L'index rend l'ordre total: deux rangées ayant les mêmes valeurs de
+    tri sont ordonnées par leur index.
+
+    :param order_by: Colonne ou colonnes de tri.
+    :type order_by: Union[str, list[str]]
+    :return: Colonnes de tri.
+    :rtype: list[str]
+
+    """
+    colonnes = [order_by] if isinstance(order_by, str) else list(order_by)
+    if 'index' not in colonnes:
+        colonnes.append('index')
+
+    return colonnes
+
+
+def encoder_valeur(type_: sqla.types.TypeEngine, valeur: Any) -> Any:
+    """Encode une valeur de tri avec le codec de sa colonne, s'il y a lieu."""
+    if valeur is not None and isinstance(type_, Codec):
+        return type_.encoder_valeur(valeur)
+
+    return valeur
+
+
+def _sérialiser(valeur: Any) -> Any:
+    if isinstance(valeur, (datetime.date, datetime.time)):
+        return valeur.isoformat()
+
+    raise TypeError(f'Valeur de tri non sérialisable: {valeur!r}')
+
+
+def encoder_jeton(colonnes: list[str],
+                  valeurs: list[Any],
+                  table: sqla.Table = None) -> str:
+    """
+    Retourne le jeton de continuation après une rangée.
+
+    :param colonnes: Colonnes de tri.
+    :type colonnes: list[str]
+    :param valeurs: Valeurs de tri de la dernière rangée lue.
+    :type valeurs: list[Any]
+    :param table: Tableau paginé. Nécessaire si des colonnes de tri sont
+        encodées, defaults to None
+    :type table: sqlalchemy.Table, optional
+    :return: Jeton de continuation.
+    :rtype: str
+
+    """
+    valeurs = [valeur_native(v) for v in valeurs]
+    if table is not None:
+        valeurs = [encoder_valeur(table.columns[c].type, v)
+                   for c, v in zip(colonnes, valeurs)]
+
+    texte = json.dumps([colonnes, valeurs],
+                       ensure_ascii=False,
+                       separators=(',', ':'),
+                       default=_sérialiser)
+
+    return base64.urlsafe_b64encode(texte.encode('utf-8')).decode('ascii')
+
+
+def décoder_jeton(jeton: str,
+                  table: sqla.Table,
+                  colonnes: list[str]) -> list[Any]:
+    """
+    Retourne les valeurs de tri contenues dans un jeton de continuation.
+
+    :param jeton: Jeton retourné avec la page précédente.
+    :type jeton: str
+    :param table: Tableau paginé.
+    :type table: sqlalchemy.Table
+    :param colonnes: Colonnes de tri de la page demandée.
+    :type colonnes: list[str]
+    :raises ValueError: Si le jeton est invalide ou a été obtenu avec
+        d'autres colonnes de tri.
+    :return: Valeurs de tri, dans le type Python des colonnes.
+    :rtype: list[Any]
+
+    """
+    try:
+        texte = base64.urlsafe_b64decode(jeton.encode('ascii'))
+        colonnes_jeton, valeurs = json.loads(texte.decode('utf-8'))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f'Jeton de continuation invalide: {jeton!r}') from e
+
+    if colonnes_jeton != colonnes:
+        raise ValueError(f'Jeton obtenu pour le tri {colonnes_jeton}, '
+                         f'pas {colonnes}.')
+
+    résultat = []
+    for c, v in zip(colonnes, valeurs):
+        type_ = table.columns[c].type
+        if v is None:
+            pass
+        elif isinstance(type_, Codec):
+            # Encodée à nouveau par la colonne, dans condition_suite
+            v = type_.décoder_valeur(v)
+        else:
+            python = get_type('sqlalchemy', type_, 'python')
+            if python is datetime.time:
+                v = datetime.time.fromisoformat(v)
+            elif python is datetime.date:
+                # Les dates sont lues comme datetime64: voir type_lecture
+                v = datetime.datetime.fromisoformat(v).date()
+            elif python is datetime.datetime:
+                v = datetime.datetime.fromisoformat(v)
+        résultat.append(v)
+
+    return résultat
+
+
+def condition_suite(table: sqla.Table,
+                    colonnes: list[str],
+                    valeurs: list[Any],
+                    décroissant: bool = False) -> sqla.sql.ColumnElement:
+    """
+    Retourne le critère des rangées qui suivent les valeurs de tri.
+
+    :param table: Tableau paginé.
+    :type table: sqlalchemy.Table
+    :param colonnes: Colonnes de tri.
+    :type colonnes: list[str]
+    :param valeurs: Valeurs de tri de la dernière rangée lue.
+    :type valeurs: list[Any]
+    :param décroissant: Tri en ordre décroissant, defaults to False
+    :type décroissant: bool, optional
+    :return: Critère, eg (a, index) > (:a, :index).
+    :rtype: sqlalchemy.sql.ColumnElement
+
+    """
+    gauche = [table.columns[c] for c in colonnes]
+    droite = [sqla.literal(v, type_=c.type) for c, v in zip(gauche, valeurs)]
+
+    if len(gauche) == 1:
+        gauche, droite = gauche[0], droite[0]
+    else:
+        gauche, droite = sqla.tuple_(*gauche), sqla.tuple_(*droite)
+
+    return gauche < droite if décroissant else gauche > droite
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""Mesure optionnelle de la durée des requêtes aux bases de données."""
+
+# Bibliothèque standard
+import os
+import re
+import sys
+import time
+import logging
+import datetime
+import threading
+
+from collections import deque
+from configparser import ConfigParser
+from typing import Optional, Union
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+import pandas as pd
+
+# Préfixes des requêtes d'analyse, par dialecte
+EXPLICATIONS: dict[str, str] = {'sqlite': 'EXPLAIN QUERY PLAN ',
+                                'mysql': 'EXPLAIN ',
+                                'mariadb': 'EXPLAIN ',
+                                'postgresql': 'EXPLAIN '}
+
+# Paramètre lié, selon le style du pilote
+_PARAMÈTRE = r'(?:\?|%s|:\w+|%\(\w+\)s|\$\d+)'
+# Listes de paramètres, comme dans IN (?, ?, ?) ou VALUES (?, ?), (?, ?)
+_LISTE = re.compile(rf'\(\s*{_PARAMÈTRE}(?:\s*,\s*{_PARAMÈTRE})*\s*\)'
+                    rf'(?:\s*,\s*\(\s*{_PARAMÈTRE}'
+                    rf'(?:\s*,\s*{_PARAMÈTRE})*\s*\))*')
+_ESPACES = re.compile(r'\s+')
+
+# Paquet dont on cherche les méthodes dans la pile d'appels
+_PAQUET = __name__.rsplit('.', 1)[0]
+
+# Registres créés d'après une configuration, par paramètres.
+# Plusieurs instances de BaseDeDonnées lisant la même configuration
+# partagent ainsi un seul registre, plutôt que de noter chaque requête
+# du moteur commun plusieurs fois.
+_PARTAGÉS: dict[tuple, 'Profileur'] = {}
+_VERROU_PARTAGÉS = threading.Lock()
+
+
+def forme(requête: str) -> str:
+    """
+    Retourne la forme d'une requête SQL.
+
+    Les espaces sont normalisés et les listes de paramètres liés sont
+    remplacées par (...), de sorte que des requêtes qui ne diffèrent que
+    par le nombre de valeurs aient la même forme.
+
+    :param requête: Texte de la requête.
+    :type requête: str
+    :return: Forme de la requête.
+    :rtype: str
+
+    """
+    return _LISTE.sub('(...)', _ESPACES.sub(' ', requête).strip())
+
+
+def journal_fichier(journal: logging.Logger, fichier: str):
+    """
+    Ajoute un fichier aux destinations d'un journal, s'il n'y est pas déjà.
+
+    :param journal: Journal.
+    :type journal: logging.Logger
+    :param fichier: Fichier où noter les messages.
+    :type fichier: str
+    :return: None
+    :rtype: NoneType
+
+    """
+    chemin = os.path.abspath(fichier)
+    for destination in journal.handlers:
+        if isinstance(destination, logging.FileHandler) \
+                and destination.baseFilename == chemin:
+            return
+
+    journal.addHandler(logging.FileHandler(chemin))
+
+
+def appelants(profondeur: int = 2) -> tuple[str, str]:
+    """
+    Retourne les méthodes de polygphys à l'origine d'une requête.
+
+    :param profondeur: Nombre de cadres de pile à ignorer, defaults to 2
+    :type profondeur: int, optional
+    :return: La méthode de base_de_donnees appelée de l'extérieur du module,
+        et la méthode de polygphys qui l'a appelée. Chacune peut être None.
+    :rtype: tuple[str, str]
+
+    """
+    méthode = appelant = None
+    cadre = sys._getframe(profondeur)
+
+    while cadre is not None:
+        module = cadre.f_globals.get('__name__', '')
+        code = cadre.f_code
+        nom = f'{module}.{getattr(code, "co_qualname", code.co_name)}'
+
+        if module.startswith(_PAQUET) and module != __name__:
+            méthode = nom
+        elif module.startswith('polygphys'):
+            appelant = nom
+            break
+
+        cadre = cadre.f_back
+
+    return méthode, appelant
+
+
+class Profileur:
+    """
+    Registre des requêtes exécutées par un moteur.
+
+    Les dernières requêtes sont gardées dans un tampon circulaire borné.
+    Les requêtes plus longues que le seuil sont aussi notées dans un
+    journal, avec leur plan d'exécution si demandé.
+    """
+
+    def __init__(self,
+                 taille: int = 10000,
+                 seuil: float = .1,
+                 journal: Union[logging.Logger, str] = None,
+                 plan: bool = False):
+        """
+        Crée un registre vide.
+
+        :param taille: Nombre maximal de requêtes gardées, defaults to 10000
+        :type taille: int, optional
+        :param seuil: Durée, en secondes, à partir de laquelle une requête est
+            considérée lente, defaults to .1
+        :type seuil: float, optional
+        :param journal: Journal des requêtes lentes, ou fichier où les noter.
+            Par défaut, le journal polygphys.outils.base_de_donnees.lentes,
+            defaults to None
+        :type journal: Union[logging.Logger, str], optional
+        :param plan: Noter le plan d'exécution des requêtes lentes,
+            defaults to False
+        :type plan: bool, optional
+        :return: None
+        :rtype: NoneType
+
+        """
+        self.seuil = seuil
+        self.plan = plan
+
+        if journal is None or isinstance(journal, str):
+            fichier = journal
+            journal = logging.getLogger(f'{_PAQUET}.lentes')
+            if fichier:
+                journal_fichier(journal, fichier)
+        self.journal = journal
+
+        self._registres: deque = deque(maxlen=taille)
+        self._verrou = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def depuis_config(cls,
+                      config: ConfigParser,
+                      section: str = 'profilage') -> Optional['Profileur']:
+        """
+        Crée un registre selon une section d'un fichier de configuration.
+
+        Retourne None si le profilage n'est pas activé. Les appels avec les
+        mêmes paramètres retournent le même registre.
+
+        :param config: Configuration à lire.
+        :type config: ConfigParser
+        :param section: Section contenant les paramètres,
+            defaults to 'profilage'
+        :type section: str, optional
+        :return: Un registre, ou None.
+        :rtype: Optional[Profileur]
+
+        """
+        if not config.getboolean(section, 'actif', fallback=False):
+            return None
+
+        paramètres = (config.getint(section, 'taille', fallback=10000),
+                      config.getfloat(section, 'seuil', fallback=.1),
+                      config.get(section, 'journal', fallback='') or None,
+                      config.getboolean(section, 'plan', fallback=False))
+
+        with _VERROU_PARTAGÉS:
+            if (cls, paramètres) not in _PARTAGÉS:
+                _PARTAGÉS[cls, paramètres] = cls(*paramètres)
+            return _PARTAGÉS[cls, paramètres]
+
+    def attacher(self, moteur: sqla.engine.Engine):
+        """
+        Mesure les requêtes exécutées par un moteur.
+
+        Attacher plusieurs fois le même moteur n'a pas d'effet.
+
+        :param moteur: Moteur de base de données.
+        :type moteur: sqlalchemy.engine.Engine
+        :return: None
+        :rtype: NoneType
+
+        """
+        if not sqla.event.contains(moteur,
+                                   'before_cursor_execute',
+                                   self.avant):
+            sqla.event.listen(moteur, 'before_cursor_execute', self.avant)
+            sqla.event.listen(moteur, 'after_cursor_execute', self.après)
+            sqla.event.listen(moteur, 'handle_error', self.erreur)
+
+    def détacher(self, moteur: sqla.engine.Engine):
+        """
+        Arrête de mesurer les requêtes exécutées par un moteur.
+
+        :param moteur: Moteur de base de données.
+        :type moteur: sqlalchemy.engine.Engine
+        :return: None
+        :rtype: NoneType
+
+        """
+        if sqla.event.contains(moteur, 'before_cursor_execute', self.avant):
+            sqla.event.remove(moteur, 'before_cursor_execute', self.avant)
+            sqla.event.remove(moteur, 'after_cursor_execute', self.après)
+            sqla.event.remove(moteur, 'handle_error', self.erreur)
+
+    def avant(self, conn, cursor, statement, parameters, context,
+              executemany):
+        """Note le début d'une requête."""
+        conn.info.setdefault('profilage', []).append(time.perf_counter())
+        if context is not None:
+            # Voir erreur
+            context._profilage_en_cours = True
+
+    def après(self, conn, cursor, statement, parameters, context,
+              executemany):
+        """Note la fin d'une requête."""
+        durée = time.perf_counter() - conn.info['profilage'].pop()
+        if context is not None:
+            context._profilage_en_cours = False
+        méthode, appelant = appelants()
+        rangées = cursor.rowcount if cursor.rowcount >= 0 else None
+
+        registre = {'moment': datetime.datetime.now(),
+                    'forme': forme(statement),
+                    'durée': durée,
+                    'rangées': rangées,
+                    'plusieurs': executemany,
+                    'méthode': méthode,
+                    'appelant': appelant,
+                    'plan': None}
+
+        if durée >= self.seuil:
+            if self.plan and not executemany:
+                registre['plan'] = self.expliquer(conn, statement, parameters)
+            self.journal.warning('%.3f s, %s (%s): %s%s',
+                                 durée,
+                                 méthode,
+                                 appelant,
+                                 registre['forme'],
+                                 f'\n{registre["plan"]}'
+                                 if registre['plan'] else '')
+
+        with self._verrou:
+            self._registres.append(registre)
+        self._local.dernier = registre
+
+    def erreur(self, contexte):
+        """Oublie le début d'une requête ayant échoué pendant son exécution."""
+        exécution = contexte.execution_context
+        if getattr(exécution, '_profilage_en_cours', False):
+            exécution._profilage_en_cours = False
+            contexte.connection.info['profilage'].pop()
+
+    def expliquer(self,
+                  conn: sqla.engine.Connection,
+                  statement: str,
+                  parameters) -> Optional[str]:
+        """
+        Retourne le plan d'exécution d'une requête.
+
+        Le plan est obtenu avec un curseur séparé, sans passer par
+        SQLAlchemy, pour ne pas déclencher de nouvelle mesure.
+
+        :param conn: Connexion ayant exécuté la requête.
+        :type conn: sqlalchemy.engine.Connection
+        :param statement: Texte de la requête.
+        :type statement: str
+        :param parameters: Paramètres de la requête.
+        :return: Plan d'exécution, une ligne par étape, ou None.
+        :rtype: Optional[str]
+
+        """
+        préfixe = EXPLICATIONS.get(conn.dialect.name)
+        if préfixe is None:
+            return None
+
+        curseur = conn.connection.cursor()
+        try:
+            curseur.execute(préfixe + statement, parameters)
+            return '\n'.join(' '.join(map(str, r)) for r in curseur.fetchall())
+        except Exception:
+            return None
+        finally:
+            curseur.close()
+
+    def compléter(self, rangées: int):
+        """
+        Note le nombre de rangées lues par la dernière requête de ce fil.
+
+        Les pilotes ne donnent habituellement pas le nombre de rangées d'un
+        SELECT avant qu'elles soient toutes lues.
+
+        :param rangées: Nombre de rangées lues.
+        :type rangées: int
+        :return: None
+        :rtype: NoneType
+
+        """
+        registre = getattr(self._local, 'dernier', None)
+        if registre is not None and registre['rangées'] is None:
+            registre['rangées'] = rangées
+
+    def registres(self) -> pd.DataFrame:
+        """
+        Retourne les requêtes gardées, de la plus ancienne à la plus récente.
+
+        :return: Un DataFrame, une rangée par requête.
+        :rtype: pd.DataFrame
+
+        """
+        with self._verrou:
+            registres = list(self._registres)
+
+        return pd.DataFrame(registres,
+                            columns=['moment',
+                                     'forme',
+                                     'durée',
+                                     'rangées',
+                                     'plusieurs',
+                                     'méthode',
+                                     'appelant',
+                                     'plan'])
+
+    def résumé(self, par: Union[str, list[str]] = 'forme') -> pd.DataFrame:
+        """
+        Retourne les statistiques de durée par forme de requête.
+
+        :param par: Colonnes de regroupement, defaults to 'forme'
+        :type par: Union[str, list[str]], optional
+        :return: Nombre de requêtes, durée totale, moyenne, médiane,
+            90e et 99e centiles et maximum, en ordre décroissant de durée
+            totale.
+        :rtype: pd.DataFrame
+
+        """
+        groupes = self.registres().groupby(par, dropna=False)
+        durées = groupes['durée']
+
+        résumé = pd.DataFrame({'nombre': durées.count(),
+                               'total': durées.sum(),
+                               'moyenne': durées.mean(),
+                               'p50': durées.quantile(.5),
+                               'p90': durées.quantile(.9),
+                               'p99': durées.quantile(.99),
+                               'max': durées.max(),
+                               'rangées': groupes['rangées'].sum()})
+
+        return résumé.sort_values('total', ascending=False)
+
+    def vider(self):
+        """Oublie les requêtes gardées."""
+        with self._verrou:
+            self._registres.clear()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Étiquettes des références externes.
+
+Les tableaux enregistrent leurs références externes comme index entiers.
+Pour les afficher, chaque index est remplacé par une étiquette lisible
+prise dans le tableau référencé: sa colonne déclarée avec étiquette=True
+(voir dtypes.column), sinon sa première colonne de texte.
+"""
+
+# Bibliothèque standard
+import threading
+
+from typing import Any, Optional
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+
+
+def colonne_étiquette(table: sqla.Table) -> Optional[sqla.Column]:
+    """
+    Retourne la colonne servant d'étiquette aux rangées d'un tableau.
+
+    :param table: Tableau référencé.
+    :type table: sqlalchemy.Table
+    :return: La colonne déclarée avec étiquette=True, sinon la première
+        colonne de texte, sinon None.
+    :rtype: Optional[sqlalchemy.Column]
+
+    """
+    for c in table.columns:
+        if c.info.get('étiquette', False):
+            return c
+
+    for c in table.columns:
+        if c.name != 'index' and isinstance(c.type, sqla.String):
+            return c
+
+    return None
+
+
+def requête_résolue(table: sqla.Table,
+                    colonnes: list[sqla.sql.ColumnElement]
+                    ) -> sqla.sql.Select:
+    """
+    Construit une requête ajoutant l'étiquette de chaque référence externe.
+
+    Chaque colonne référençant un autre tableau est jointe à ce tableau
+    (LEFT OUTER JOIN, par un alias propre à la colonne), et l'étiquette est
+    ajoutée sous le nom «colonne.étiquette», eg «responsable.nom». Le tout
+    est lu en une seule requête.
+
+    :param table: Tableau interrogé.
+    :type table: sqlalchemy.Table
+    :param colonnes: Colonnes sélectionnées dans table.
+    :type colonnes: list[sqlalchemy.sql.ColumnElement]
+    :return: Requête SELECT.
+    :rtype: sqlalchemy.sql.Select
+
+    """
+    jointure = table
+    étiquettes = []
+
+    for c in table.columns:
+        if c.name not in {col.name for col in colonnes}:
+            continue
+
+        for fk in c.foreign_keys:
+            référencé = fk.column.table
+            étiquette = colonne_étiquette(référencé)
+            if étiquette is None:
+                continue
+
+            alias = référencé.alias(f'{référencé.name}_{c.name}')
+            jointure = jointure.outerjoin(alias,
+                                          c == alias.columns[fk.column.name])
+            étiquettes.append(alias.columns[étiquette.name].label(
+                f'{c.name}.{étiquette.name}'))
+
+    return sqla.select(*colonnes, *étiquettes).select_from(jointure)
+
+
+class CacheÉtiquettes:
+    """
+    Dictionnaires index → étiquette, par tableau référencé.
+
+    Chaque dictionnaire est lu une fois et partagé par tous ceux qui le
+    demandent, eg tous les widgets d'une grille, jusqu'à ce que le tableau
+    soit modifié par la même instance de BaseDeDonnées.
+    """
+
+    def __init__(self, db):
+        """
+        Crée un cache vide.
+
+        :param db: Base de données où lire les étiquettes.
+        :type db: BaseDeDonnées
+        :return: None
+        :rtype: NoneType
+
+        """
+        self.db = db
+        self._étiquettes: dict[str, dict[Any, str]] = {}
+        # Incrémenté à chaque invalidation
+        self._version = 0
+        self._verrou = threading.Lock()
+
+    def __getitem__(self, table: str) -> dict[Any, str]:
+        """
+        Retourne les étiquettes des rangées d'un tableau.
+
+        :param table: Tableau référencé.
+        :type table: str
+        :return: Étiquettes, par index. Le dictionnaire est partagé et ne
+            doit pas être modifié.
+        :rtype: dict[Any, str]
+
+        """
+        étiquettes = self._étiquettes.get(table)
+        if étiquettes is not None:
+            return étiquettes
+
+        version = self._version
+
+        tableau = self.db.table(table)
+        étiquette = colonne_étiquette(tableau)
+        index = tableau.columns['index']
+        valeur = index if étiquette is None else étiquette
+
+        self.db.vider_tampons(table)
+        with self.db.begin() as con:
+            rangées = con.execute(sqla.select(index, valeur)).all()
+
+        étiquettes = {i: '' if v is None else str(v) for i, v in rangées}
+
+        with self._verrou:
+            # Le tableau a pu être modifié pendant la lecture
+            if self._version != version:
+                return étiquettes
+            return self._étiquettes.setdefault(table, étiquettes)
+
+    def invalider(self, table: str = None):
+        """
+        Oublie les étiquettes d'un tableau modifié.
+
+        :param table: Tableau modifié. Si None, toutes les étiquettes sont
+            oubliées, defaults to None
+        :type table: str, optional
+        :return: None
+        :rtype: NoneType
+
+        """
+        with self._verrou:
+            if table is None:
+                self._étiquettes.clear()
+            else:
+                self._étiquettes.pop(table, None)
+            self._version += 1
@@ -0,0 +1,532 @@
+# -*- coding: utf-8 -*-
+"""Requêtes paresseuses, compilées en SQL seulement au besoin."""
+
+# Bibliothèque standard
+from numbers import Integral
+from typing import Any, Callable, Union
+
+# Bibliothèque PIPy
+import sqlalchemy as sqla
+import pandas as pd
+
+# Imports relatifs
+from .dtypes import appliquer_types
+from .codages import Codec
+
+
+def est_scalaire(clé: Any) -> bool:
+    """Vérifie si une clé de sélection désigne un seul élément."""
+    return not isinstance(clé, (slice, list, tuple, pd.Index, pd.Series))
+
+
+class Requête:
+    """
+    Requête paresseuse sur un tableau de base de données.
+
+    La sélection de colonnes, les critères, l'ordre, la limite et le
+    décalage sont gardés et combinés en une seule requête SQL, envoyée
+    seulement quand le résultat est demandé (df, head, loc, iloc).
+    """
+
+    def __init__(self,
+                 db,
+                 table: str,
+                 colonnes: tuple[str] = None,
+                 conditions: tuple = tuple(),
+                 ordre: tuple = tuple(),
+                 limite: int = None,
+                 décalage: int = 0):
+        """
+        Crée une requête sur un tableau.
+
+        :param db: Base de données interrogée.
+        :type db: BaseDeDonnées
+        :param table: Tableau interrogé.
+        :type table: str
+        :param colonnes: Colonnes sélectionnées. None les sélectionne
+            toutes, defaults to None
+        :type colonnes: tuple[str], optional
+        :param conditions: Critères SQLAlchemy, defaults to tuple()
+        :type conditions: tuple, optional
+        :param ordre: Colonnes ou expressions de tri. Par défaut, l'index,
+            defaults to tuple()
+        :type ordre: tuple, optional
+        :param limite: Nombre maximal de rangées, defaults to None
+        :type limite: int, optional
+        :param décalage: Nombre de rangées sautées, defaults to 0
+        :type décalage: int, optional
+        :return: None
+        :rtype: NoneType
+
+        """
+        self.db = db
+        self.table = table
+        self.colonnes = tuple(db.columns(table) if colonnes is None
+                              else colonnes)
+        self.conditions = tuple(conditions)
+        self.ordre = tuple(ordre)
+        self.limite = limite
+        self.décalage = décalage
+
+    def __repr__(self) -> str:
+        """Affiche la requête SQL correspondante."""
+        return f'<{type(self).__name__} {self.compiler()}>'
+
+    def copier(self, **kargs) -> 'Requête':
+        """Retourne une copie de la requête, avec des attributs modifiés."""
+        attributs = {'colonnes': self.colonnes,
+                     'conditions': self.conditions,
+                     'ordre': self.ordre,
+                     'limite': self.limite,
+                     'décalage': self.décalage}
+        attributs.update(kargs)
+        return type(self)(self.db, self.table, **attributs)
+
+    # Construction de la requête
+
+    def select(self, *colonnes: str) -> 'Requête':
+        """Restreint la requête aux colonnes données."""
+        return self.copier(colonnes=colonnes)
+
+    def where(self, *conditions) -> 'Requête':
+        """Ajoute des critères à la requête."""
+        return self.copier(conditions=self.conditions + conditions)
+
+    def order_by(self, *ordre) -> 'Requête':
+        """Trie les résultats selon des colonnes ou expressions."""
+        return self.copier(ordre=ordre)
+
+    def tranche(self, début: int = 0, fin: int = None) -> 'Requête':
+        """
+        Retourne les rangées de positions début à fin (exclue).
+
+        Les positions sont relatives aux résultats de la requête courante,
+        et doivent être positives.
+
+        :param début: Première position, defaults to 0
+        :type début: int, optional
+        :param fin: Position de fin, exclue. None pour aller jusqu'à la
+            fin, defaults to None
+        :type fin: int, optional
+        :return: Nouvelle requête.
+        :rtype: Requête
+
+        """
+        limite = self.limite
+        if fin is not None:
+            n = max(fin - début, 0)
+            limite = n if limite is None else max(min(n, limite - début), 0)
+        elif limite is not None:
+            limite = max(limite - début, 0)
+
+        return self.copier(limite=limite, décalage=self.décalage + début)
+
+    def colonne(self, nom: str) -> sqla.Column:
+        """Retourne une colonne SQLAlchemy du tableau."""
+        return self.db.table(self.table).columns[nom]
+
+    def compiler(self) -> sqla.sql.Select:
+        """
+        Retourne la requête SQLAlchemy correspondante.
+
+        :return: Requête SELECT.
+        :rtype: sqlalchemy.sql.Select
+
+        """
+        requête = self.db.requête_select(self.table,
+                                         self.colonnes,
+                                         self.conditions)
+
+        if self.ordre:
+            ordre = [self.colonne(o) if isinstance(o, str) else o
+                     for o in self.ordre]
+        else:
+            ordre = [self.colonne('index')]
+        requête = requête.order_by(*ordre)
+
+        if self.limite is not None:
+            requête = requête.limit(self.limite)
+        if self.décalage:
+            requête = requête.offset(self.décalage)
+
+        return requête
+
+    # Résultats
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Exécute la requête et retourne le résultat."""
+        if self.limite == 0:
+            return pd.DataFrame(columns=list(self.colonnes),
+                                index=pd.Index([], name='index'))
+
+        df = self.db.lire(self.table, self.compiler())
+        return df.loc[:, [c for c in self.colonnes if c in df.columns]]
+
+    def __len__(self) -> int:
+        """Compte les rangées du résultat, sans les lire."""
+        self.db.vider_tampons(self.table)
+        requête = self.compiler().order_by(None).subquery()
+        requête = sqla.select(sqla.func.count()).select_from(requête)
+
+        with self.db.begin() as con:
+            return con.execute(requête).scalar()
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        """Retourne les n premières rangées."""
+        if n < 0:
+            return self.df.head(n)
+
+        return self.tranche(0, n).df
+
+    def tail(self, n: int = 5) -> pd.DataFrame:
+        """Retourne les n dernières rangées."""
+        total = len(self)
+        return self.tranche(max(total - n, 0), total).df
+
+    @property
+    def loc(self) -> 'IndexeurLoc':
+        """Sélection par étiquettes, comme pandas.DataFrame.loc."""
+        return IndexeurLoc(self)
+
+    @property
+    def iloc(self) -> 'IndexeurILoc':
+        """Sélection par positions, comme pandas.DataFrame.iloc."""
+        return IndexeurILoc(self)
+
+
+class Indexeur:
+    """Base des indexeurs loc et iloc de Requête."""
+
+    # Exception levée quand une rangée unique est introuvable
+    erreur: type = KeyError
+
+    def __init__(self, requête: Requête):
+        """
+        Indexeur d'une requête.
+
+        :param requête: Requête à indexer.
+        :type requête: Requête
+        :return: None
+        :rtype: NoneType
+
+        """
+        self.requête = requête
+
+    def __call__(self,
+                 columns: tuple[str] = None,
+                 where: tuple = tuple(),
+                 errors: str = 'ignore') -> 'Indexeur':
+        """
+        Retourne un indexeur restreint à des colonnes et critères.
+
+        Permet d'utiliser BaseTableau.iloc() comme avant.
+        """
+        requête = self.requête.where(*where)
+        if columns is not None and len(columns):
+            requête = requête.select(*columns)
+
+        return type(self)(requête)
+
+    def __getitem__(self, clé: Any) -> Union[pd.DataFrame, pd.Series, Any]:
+        """
+        Sélectionne des rangées et colonnes.
+
+        Les sélections sont ajoutées à la requête SQL autant que possible.
+        """
+        if isinstance(clé, tuple):
+            rangées, colonnes = clé
+        else:
+            rangées, colonnes = clé, slice(None)
+
+        noms = self.colonnes(colonnes)
+        requête = self.requête.select(*noms) if noms else self.requête
+        df, rangées = self.rangées(requête, rangées)
+
+        if est_scalaire(colonnes):
+            df = df[noms[0]] if noms else df.iloc[:, 0]
+
+        if est_scalaire(rangées):
+            if df.shape[0] != 1:
+                raise self.erreur(rangées)
+            return df.iloc[0]
+
+        return df
+
+    def colonnes(self, clé: Any) -> list[str]:
+        """Retourne les noms de colonnes correspondant à une clé."""
+        raise NotImplementedError
+
+    def rangées(self, requête: Requête, clé: Any) -> tuple[Any, Any]:
+        """Retourne les rangées correspondant à une clé."""
+        raise NotImplementedError
+
+
+class IndexeurILoc(Indexeur):
+    """Sélection par positions, traduite en LIMIT et OFFSET."""
+
+    erreur = IndexError
+
+    def colonnes(self, clé: Any) -> list[str]:
+        """Retourne les noms de colonnes aux positions données."""
+        colonnes = list(self.requête.colonnes)
+
+        if isinstance(clé, slice):
+            return colonnes[clé]
+        elif est_scalaire(clé):
+            return [colonnes[clé]]
+        else:
+            return [colonnes[i] for i in clé]
+
+    def rangées(self, requête: Requête, clé: Any) -> tuple[Any, Any]:
+        """
+        Retourne les rangées aux positions données.
+
+        Les positions négatives nécessitent de compter les rangées d'abord.
+        """
+        if isinstance(clé, Integral) and not isinstance(clé, bool):
+            position = clé + len(requête) if clé < 0 else clé
+            if position < 0:
+                # Un OFFSET négatif serait traité comme 0
+                raise IndexError(clé)
+            return requête.tranche(position, position + 1).df, position
+
+        if isinstance(clé, slice):
+            début, fin, pas = clé.start, clé.stop, clé.step
+            if pas is None or pas > 0:
+                if (début or 0) < 0 or (fin or 0) < 0:
+                    début, fin, _ = clé.indices(len(requête))
+                df = requête.tranche(début or 0, fin).df
+                return df.iloc[::pas], clé
+
+        if isinstance(clé, (list, tuple, pd.Index)) \
+                and all(isinstance(i, Integral) and i >= 0 for i in clé) \
+                and len(clé):
+            début, fin = min(clé), max(clé) + 1
+            df = requête.tranche(début, fin).df
+            return df.iloc[[i - début for i in clé]], clé
+
+        # Autres sélections: on se rabat sur pandas
+        return requête.df.iloc[clé], clé
+
+
+class IndexeurLoc(Indexeur):
+    """Sélection par étiquettes d'index, traduite en WHERE."""
+
+    def colonnes(self, clé: Any) -> list[str]:
+        """Retourne les noms de colonnes correspondant à une clé."""
+        colonnes = list(self.requête.colonnes)
+
+        if isinstance(clé, slice):
+            début = 0 if clé.start is None else colonnes.index(clé.start)
+            fin = None if clé.stop is None else colonnes.index(clé.stop) + 1
+            return colonnes[début:fin:clé.step]
+        elif est_scalaire(clé):
+            return [clé]
+        else:
+            return list(clé)
+
+    def rangées(self, requête: Requête, clé: Any) -> tuple[Any, Any]:
+        """Retourne les rangées dont l'index correspond à une clé."""
+        index = requête.colonne('index')
+
+        if isinstance(clé, slice) and clé.step is None:
+            if clé.start is not None:
+                requête = requête.where(index >= clé.start)
+            if clé.stop is not None:
+                requête = requête.where(index <= clé.stop)
+            return requête.df, clé
+        elif isinstance(clé, pd.Series) and clé.dtype == bool:
+            # Masque booléen: on se rabat sur pandas
+            return requête.df.loc[clé], clé
+        elif isinstance(clé, (list, tuple, pd.Index)):
+            valeurs = [i.item() if hasattr(i, 'item') else i for i in clé]
+            df = requête.where(index.in_(valeurs)).df
+            manquantes = [v for v in valeurs if v not in df.index]
+            if manquantes:
+                raise KeyError(manquantes)
+            return df.loc[valeurs], clé
+        elif est_scalaire(clé):
+            clé = clé.item() if hasattr(clé, 'item') else clé
+            return requête.where(index == clé).df, clé
+
+        return requête.df.loc[clé], clé
+
+
+# Fonctions d'agrégation, selon leur nom dans pandas
+AGRÉGATIONS: dict[str, Callable] = {
+    'sum': sqla.func.sum,
+    'mean': sqla.func.avg,
+    'min': sqla.func.min,
+    'max': sqla.func.max,
+    'count': sqla.func.count,
+    'nunique': lambda c: sqla.func.count(sqla.distinct(c))
+}
+
+# Fonctions qui ne s'appliquent qu'aux colonnes numériques
+NUMÉRIQUES: frozenset[str] = frozenset({'sum', 'mean'})
+
+# Fonctions dont le résultat a le type de la colonne agrégée
+CONSERVENT_TYPE: frozenset[str] = frozenset({'sum', 'min', 'max'})
+
+
+def numérique(colonne: sqla.Column) -> bool:
+    """Vérifie si une colonne contient des nombres, sans encodage."""
+    return isinstance(colonne.type, (sqla.Integer, sqla.Numeric))
+
+
+class Groupement:
+    """
+    Regroupement de rangées, compilé en GROUP BY.
+
+    Seul le résultat agrégé est transféré depuis la base de données.
+    """
+
+    def __init__(self,
+                 db,
+                 table: str,
+                 par: Union[str, list[str]],
+                 conditions: tuple = tuple()):
+        """
+        Regroupe les rangées d'un tableau.
+
+        :param db: Base de données interrogée.
+        :type db: BaseDeDonnées
+        :param table: Tableau interrogé.
+        :type table: str
+        :param par: Colonne ou colonnes de regroupement.
+        :type par: Union[str, list[str]]
+        :param conditions: Critères SQLAlchemy, defaults to tuple()
+        :type conditions: tuple, optional
+        :return: None
+        :rtype: NoneType
+
+        """
+        self.db = db
+        self.table = table
+        self.par = [par] if isinstance(par, str) else list(par)
+        self.conditions = tuple(conditions)
+
+    def colonne(self, nom: str) -> sqla.Column:
+        """Retourne une colonne SQLAlchemy du tableau."""
+        return self.db.table(self.table).columns[nom]
+
+    def brute(self, nom: str) -> sqla.sql.ColumnElement:
+        """Retourne une colonne à lire sans décodage par valeur."""
+        colonne = self.colonne(nom)
+        if isinstance(colonne.type, Codec):
+            return sqla.type_coerce(colonne, colonne.type.impl)
+        return colonne
+
+    def agg(self, fonctions: Union[str, dict] = None,
+            **nommées: tuple[str, str]) -> pd.DataFrame:
+        """
+        Calcule des agrégats par groupe, comme pandas.DataFrame.groupby.
+
+        Les fonctions supportées sont sum, mean, min, max, count et nunique.
+        Comme avec pandas, une fonction donnée pour toutes les colonnes
+        ignore les colonnes non numériques si elle ne s'applique qu'aux
+        nombres (sum et mean); demandée pour une colonne non numérique,
+        elle lève une erreur. Les groupes, minimums, maximums et sommes
+        sont décodés et typés comme par BaseDeDonnées.select.
+
+        Eg:
+            db.groupby('heures', 'Payeur').agg({'Heures': 'sum'})
+            db.groupby('heures', 'Payeur').agg(total=('Heures', 'sum'))
+
+        :param fonctions: Fonction appliquée à toutes les colonnes, ou
+            dictionnaire associant une fonction ou une liste de fonctions
+            à des colonnes, defaults to None
+        :type fonctions: Union[str, dict], optional
+        :param **nommées: Agrégats nommés, sous la forme
+            nom=(colonne, fonction).
+        :raises TypeError: Fonction numérique demandée pour une colonne
+            non numérique.
+        :return: Un DataFrame indexé par les colonnes de regroupement.
+        :rtype: pandas.DataFrame
+
+        """
+        if isinstance(fonctions, str):
+            autres = [c for c in self.db.columns(self.table)
+                      if c not in self.par
+                      and (fonctions not in NUMÉRIQUES
+                           or numérique(self.colonne(c)))]
+            fonctions = {c: fonctions for c in autres}
+
+        agrégats = []
+        plusieurs = False
+        for colonne, f in (fonctions or {}).items():
+            if isinstance(f, str):
+                agrégats.append((colonne, colonne, f))
+            else:
+                plusieurs = True
+                agrégats.extend(((colonne, g), colonne, g) for g in f)
+
+        agrégats.extend((nom, c, f) for nom, (c, f) in nommées.items())
+
+        for _, c, f in agrégats:
+            if f in NUMÉRIQUES and not numérique(self.colonne(c)):
+                raise TypeError(f'{f} ne s\'applique qu\'aux colonnes '
+                                f'numériques, pas à {c}.')
+
+        # Les valeurs sont décodées par colonne, après la requête
+        groupes = [self.brute(c) for c in self.par]
+        expressions = [AGRÉGATIONS[f](self.brute(c))
+                       for _, c, f in agrégats]
+        étiquettes = [f'a{i}' for i in range(len(expressions))]
+
+        requête = sqla.select(*groupes,
+                              *(e.label(n) for e, n in zip(expressions,
+                                                           étiquettes)))
+        requête = requête.select_from(self.db.table(self.table))
+        for clause in self.conditions:
+            requête = requête.where(clause)
+        requête = requête.group_by(*groupes).order_by(*groupes)
+
+        self.db.vider_tampons(self.table)
+        with self.db.begin() as con:
+            rangées = con.execute(requête).all()
+
+        df = pd.DataFrame(rangées, columns=self.par + étiquettes)
+
+        # Colonne d'origine des valeurs à décoder et à typer
+        sources = {c: c for c in self.par}
+        sources.update({é: c for é, (_, c, f) in zip(étiquettes, agrégats)
+                        if f in CONSERVENT_TYPE})
+        descripteur = self.db.descripteur(self.table)
+        df = df.assign(**{n: descripteur.codecs[c].décoder(df[n])
+                          for n, c in sources.items()
+                          if c in descripteur.codecs})
+        df = appliquer_types(df, {n: descripteur.lecture[c]
+                                  for n, c in sources.items()
+                                  if c in descripteur.lecture})
+
+        df = df.set_index(self.par)
+        noms = [nom for nom, _, _ in agrégats]
+        df.columns = pd.MultiIndex.from_tuples(noms) if plusieurs else noms
+
+        return df
+
+    def size(self) -> pd.Series:
+        """Retourne le nombre de rangées par groupe."""
+        return self.agg(size=('index', 'count'))['size']
+
+    def sum(self) -> pd.DataFrame:
+        """Retourne la somme des colonnes par groupe."""
+        return self.agg('sum')
+
+    def mean(self) -> pd.DataFrame:
+        """Retourne la moyenne des colonnes par groupe."""
+        return self.agg('mean')
+
+    def min(self) -> pd.DataFrame:
+        """Retourne le minimum des colonnes par groupe."""
+        return self.agg('min')
+
+    def max(self) -> pd.DataFrame:
+        """Retourne le maximum des colonnes par groupe."""
+        return self.agg('max')
+
+    def count(self) -> pd.DataFrame:
+        """Retourne le nombre de valeurs non nulles par groupe."""
+        return self.agg('count')
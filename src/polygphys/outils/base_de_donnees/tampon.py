@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""Tampon d'ajouts, pour regrouper des écritures d'une rangée à la fois."""
+
+# Bibliothèque standard
+import time
+import atexit
+import logging
+import threading
+import weakref
+
+from typing import Any, Callable, Mapping, Optional
+
+# Bibliothèque PIPy
+import pandas as pd
+
+# Imports relatifs
+from .moteurs import connexion_unique
+
+# Nombre de rangées en attente déclenchant l'écriture
+TAILLE_TAMPON: int = 1000
+# Âge, en secondes, de la plus ancienne rangée déclenchant l'écriture
+ÂGE_TAMPON: float = 5.
+
+# Tampons à vider à la fermeture du programme
+_TAMPONS: weakref.WeakSet = weakref.WeakSet()
+
+_journal = logging.getLogger(__name__)
+
+
+class TamponAjouts:
+    """
+    Rangées en attente d'être ajoutées à un tableau.
+
+    Les rangées sont écrites en une seule transaction quand le tampon
+    atteint sa taille maximale, quand la plus ancienne rangée atteint l'âge
+    maximal, à la fermeture du programme ou sur demande. L'âge est surveillé
+    par une minuterie (threading.Timer), de sorte qu'un tampon inactif est
+    aussi vidé. La minuterie écrit depuis un autre fil d'exécution: elle
+    n'est pas utilisée si le moteur n'a qu'une connexion (base de données
+    SQLite en mémoire), où elle pourrait écrire au milieu d'une
+    transaction du fil principal. L'âge n'est alors vérifié qu'aux ajouts.
+
+    Les rangées ajoutées sans index reçoivent le leur à l'écriture, de la
+    base de données: plusieurs tampons ou programmes peuvent ajouter au même
+    tableau sans conflit. Si l'écriture échoue, les rangées restent en
+    attente.
+
+    BaseDeDonnées vide le tampon d'un tableau avant chaque lecture de ce
+    tableau, de sorte que les rangées en attente sont toujours visibles.
+    """
+
+    def __init__(self,
+                 db,
+                 table: str,
+                 taille: int = TAILLE_TAMPON,
+                 âge: float = ÂGE_TAMPON,
+                 préparer: Callable[[list[dict]], None] = None):
+        """
+        Crée un tampon vide.
+
+        :param db: Base de données où écrire.
+        :type db: BaseDeDonnées
+        :param table: Tableau où ajouter les rangées.
+        :type table: str
+        :param taille: Nombre de rangées déclenchant l'écriture,
+            defaults to TAILLE_TAMPON
+        :type taille: int, optional
+        :param âge: Âge, en secondes, de la plus ancienne rangée déclenchant
+            l'écriture, defaults to ÂGE_TAMPON
+        :type âge: float, optional
+        :param préparer: Fonction appelée avec les rangées d'un lot juste
+            avant leur écriture, qui peut les modifier. Si elle échoue, les
+            rangées restent en attente, defaults to None
+        :type préparer: Callable[[list[dict]], None], optional
+        :return: None
+        :rtype: NoneType
+
+        """
+        self.db = db
+        self.table = table
+        self.taille = taille
+        self.âge = âge
+        self.préparer = préparer
+
+        self._rangées: list[dict] = []
+        self._début: Optional[float] = None
+        self._minuterie: Optional[threading.Timer] = None
+        self._verrou = threading.RLock()
+
+        _TAMPONS.add(self)
+
+    def __len__(self) -> int:
+        """Nombre de rangées en attente."""
+        return len(self._rangées)
+
+    def ajouter(self, values: pd.DataFrame) -> int:
+        """
+        Met des rangées en attente, et les écrit si un seuil est atteint.
+
+        :param values: Rangées à ajouter, indexées.
+        :type values: pd.DataFrame
+        :return: Nombre de rangées écrites, 0 si elles restent en attente.
+        :rtype: int
+
+        """
+        index = values.index.name or 'index'
+        rangées = values.reset_index().rename(columns={index: 'index'})
+
+        return self._ajouter(rangées.to_dict('records'))
+
+    def ajouter_rangée(self,
+                       valeurs: Mapping[str, Any],
+                       index: int = None) -> int:
+        """
+        Met une rangée en attente, sans construire de DataFrame.
+
+        :param valeurs: Valeurs de la rangée, par colonne.
+        :type valeurs: Mapping[str, Any]
+        :param index: Index de la rangée. Si None, il est attribué à
+            l'écriture, defaults to None
+        :type index: int, optional
+        :return: Nombre de rangées écrites, 0 si elles restent en attente.
+        :rtype: int
+
+        """
+        rangée = dict(valeurs)
+        if index is not None:
+            rangée['index'] = index
+
+        return self._ajouter([rangée])
+
+    def _ajouter(self, rangées: list[dict]) -> int:
+        with self._verrou:
+            if self._début is None:
+                self._début = time.monotonic()
+
+            self._rangées.extend(rangées)
+
+            if len(self._rangées) >= self.taille \
+                    or time.monotonic() - self._début >= self.âge:
+                return self.vider()
+
+            if self._minuterie is None \
+                    and not connexion_unique(self.db.create_engine()):
+                délai = self._début + self.âge - time.monotonic()
+                self._minuterie = threading.Timer(délai, self._échéance)
+                self._minuterie.daemon = True
+                self._minuterie.start()
+
+            return 0
+
+    def _échéance(self):
+        # Appelée par la minuterie, dans un autre fil d'exécution
+        try:
+            self.vider()
+        except Exception:
+            _journal.exception('Échec de l\'écriture des rangées en attente '
+                               'pour %s.', self.table)
+
+    def vider(self) -> int:
+        """
+        Écrit les rangées en attente, dans une seule transaction.
+
+        Les rangées ayant un index sont écrites avec celui-ci, les autres
+        reçoivent le leur de la base de données. Si l'écriture échoue, les
+        rangées restent en attente et l'exception est transmise.
+
+        :return: Nombre de rangées écrites.
+        :rtype: int
+
+        """
+        with self._verrou:
+            if self._minuterie is not None:
+                self._minuterie.cancel()
+                self._minuterie = None
+
+            if not self._rangées:
+                return 0
+
+            # Retirées avant l'écriture: BaseDeDonnées.append vide d'abord
+            # le tampon du tableau
+            rangées, self._rangées = self._rangées, []
+            début, self._début = self._début, None
+
+            indexées = [r for r in rangées if 'index' in r]
+            autres = [r for r in rangées if 'index' not in r]
+
+            try:
+                if self.préparer is not None:
+                    self.préparer(rangées)
+
+                with self.db.transaction():
+                    n = 0
+                    if indexées:
+                        n += self.db.append(
+                            self.table,
+                            pd.DataFrame.from_records(indexées,
+                                                      index='index'))
+                    if autres:
+                        n += self.db.append(self.table,
+                                            pd.DataFrame.from_records(autres),
+                                            index=False)
+            except BaseException:
+                self._rangées[:0] = rangées
+                self._début = début
+                raise
+
+            return n
+
+
+@atexit.register
+def vider_tous():
+    """Écrit les rangées en attente de tous les tampons."""
+    for tampon in list(_TAMPONS):
+        try:
+            tampon.vider()
+        except Exception:
+            # Les autres tampons sont quand même vidés
+            _journal.exception('Échec de l\'écriture des rangées en '
+                               'attente pour %s.', tampon.table)
@@ -22,6 +22,13 @@ from configparser import ConfigParser, _UNSET, DEFAULTSECT, _default_dict
 class FichierConfig(ConfigParser):
     """Garde ConfigParser synchronisé avec un fichier."""
 
+    # Valeurs booléennes acceptées par getboolean, aussi en français
+    BOOLEAN_STATES = {**ConfigParser.BOOLEAN_STATES,
+                      'oui': True,
+                      'non': False,
+                      'vrai': True,
+                      'faux': False}
+
     def __init__(self,
                  chemin: Path,
                  defaults: dict = None,
@@ -103,24 +103,41 @@ class Tableau(BaseTableau):
         None.
 
         """
-        self.widgets = self.df.copy()
+        # Une seule lecture du tableau, découpée ensuite cellule par cellule
+        df = self.df
+        self.widgets = df.copy()
 
-        colonnes = filter(lambda x: x != 'index', self.columns)
+        colonnes = filter(lambda x: x != 'index', df.columns)
         colonnes = list(map(self.handler.texte, colonnes))
         self.widgets.columns = colonnes
 
-        index = list(map(self.handler.texte, self.index))
+        index = list(map(self.handler.texte, df.index))
         self.widgets.index = index
 
         I, C = self.widgets.shape
+        dtypes = [self.dtype(c) for c in df.columns]
+
+        # Un dictionnaire d'étiquettes par tableau référencé, partagé par
+        # toutes les cellules de la colonne
+        références = self.descripteur.références
+        étiquettes = {c: self.valeurs_référencées(c)
+                      for c in df.columns if c in références}
 
         for i, c in it.product(range(I), range(C)):
-            df = self.iloc()[[i], [c]]
-            dtype = self.dtype(self.columns[c])
-            _ = self.handler.entrée(df, self.màj, dtype)
+            nom = df.columns[c]
+            if nom in étiquettes:
+                kargs = {'référence': True,
+                         'valeurs_référencées': étiquettes[nom]}
+            else:
+                kargs = {}
+
+            _ = self.handler.entrée(df.iloc[[i], [c]],
+                                    self.màj,
+                                    dtypes[c],
+                                    **kargs)
             self.widgets.iloc[i, c] = _
 
-        self.commandes = list(map(self.build_commandes, self.index))
+        self.commandes = list(map(self.build_commandes, df.index))
 
     @property
     def rowspan(self):
@@ -329,7 +346,7 @@ class Formulaire(BaseTableau):
 
             df = pd.DataFrame(default(dtype),
                               columns=[col],
-                              index=[max(self.index, default=0) + 1])
+                              index=[self.prochain_index()])
 
             _ = self.handler.entrée(df, lambda x: None, dtype)
             self.widgets.loc[0, col] = _
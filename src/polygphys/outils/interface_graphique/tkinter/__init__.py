@@ -33,7 +33,7 @@ def tkHandler(master: tk.Tk, editable: bool = True) -> InterfaceHandler:
                dtype: str = 'object',
                editable: bool = editable,
                référence: bool = False,
-               valeurs_référencées: list[str] = tuple()) -> tk.Entry:
+               valeurs_référencées: dict[int, str] = None) -> tk.Entry:
         conversion = get_type('pandas', dtype, 'python')
         if dtype == 'boolean':
             val = conversion(value.iloc[0, 0])
@@ -55,14 +55,31 @@ def tkHandler(master: tk.Tk, editable: bool = True) -> InterfaceHandler:
 
         variable.trace_add('write', F)
 
-        if not editable:
+        if référence:
+            # Afficher l'étiquette de la rangée référencée plutôt que son index
+            valeurs_référencées = valeurs_référencées or {}
+            indices = {v: i for i, v in valeurs_référencées.items()}
+            affichée = tk.StringVar(master,
+                                    valeurs_référencées.get(val, str(val)))
+
+            def G(x, i, m, v=affichée):
+                if v.get() in indices:
+                    variable.set(indices[v.get()])
+
+            affichée.trace_add('write', G)
+
+        if not editable and référence:
+            widget = ttk.Label(master, textvariable=affichée)
+        elif not editable:
             widget = ttk.Label(master, textvariable=variable)
         elif dtype == 'boolean':
             widget = ttk.Checkbutton(master,
                                      variable=variable)
         elif dtype == 'int64' and référence:
-            widget = ttk.OptionMenu(
-                master, textvariable=variable, **valeurs_référencées)
+            widget = ttk.OptionMenu(master,
+                                    affichée,
+                                    affichée.get(),
+                                    *valeurs_référencées.values())
         elif dtype in ('int64', 'float64'):
             widget = ttk.Spinbox(master, textvariable=variable)
         elif any(i in variable.get() for i in ('\n', '\r', '\t', '  ')):
@@ -614,7 +614,7 @@ class Onglets(ttk.Notebook):
         onglet = OngletConfig(self, config)
         self.add(onglet, text=Path(onglet.chemin).name)
 
-        db = BaseDeDonnées(config.get('bd', 'adresse'), schema)
+        db = BaseDeDonnées(config.get('bd', 'adresse'), schema, config=config)
 
         tables = config.getlist('bd', 'tables')
         logging.debug('tables = %r', tables)
@@ -10,7 +10,7 @@ Journalisation synchrone avec différents modules.
 # Bibliothèque standard
 from pathlib import Path
 from logging import Handler, LogRecord
-from subprocess import run
+from subprocess import run, PIPE
 from dataclasses import dataclass
 
 # Bibliothèque PIPy
@@ -126,6 +126,22 @@ class Repository:
         """
         run(['git', 'commit', '-m', msg] + list(args), cwd=self.path)
 
+    def révision(self) -> str:
+        """
+        Retourne l'identifiant du dernier commit.
+
+        Returns
+        -------
+        str
+            Empreinte SHA-1 de HEAD.
+
+        """
+        résultat = run(['git', 'rev-parse', 'HEAD'],
+                       cwd=self.path,
+                       stdout=PIPE,
+                       text=True)
+        return résultat.stdout.strip()
+
     def pull(self):
         """
         Télécharger les changements lointains.
@@ -224,6 +240,9 @@ class Journal(Handler):
 
         super().__init__(level)
 
+        # Un seul commit git par lot d'entrées, juste avant leur écriture
+        tableau.db.tampon(tableau.table).préparer = self.valider
+
     @property
     def fichier(self):
         """Fichier de base de données (pour SQLite)."""
@@ -239,8 +258,36 @@ class Journal(Handler):
     # Fonctions de logging.Handler
 
     def flush(self):
-        """Ne fais rien."""
-        pass
+        """Écrit les entrées en attente dans la base de données."""
+        self.tableau.vider_tampons()
+
+    def close(self):
+        """Écrit les entrées en attente et ferme le journal."""
+        self.flush()
+        super().close()
+
+    def valider(self, entrées: list[dict]):
+        """
+        Commet les changements pour un lot d'entrées.
+
+        Appelée par le tampon d'ajouts du tableau avant d'écrire les
+        entrées, qui reçoivent toutes l'identifiant de ce commit.
+
+        Parameters
+        ----------
+        entrées : list[dict]
+            Entrées en attente.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.repo.commit('\n'.join(e['msg'] for e in entrées), '-a')
+
+        révision = self.repo.révision()
+        for e in entrées:
+            e['head'] = révision
 
     def emit(self, record: LogRecord):
         """
@@ -258,16 +305,13 @@ class Journal(Handler):
         None.
 
         """
-        msg = record.getMessage()
-
-        self.repo.commit(msg, '-a')
-
-        message = pd.DataFrame({'créé': [record.created],
-                                'niveau': [record.levelno],
-                                'logger': [record.name],
-                                'msg': [msg],
-                                'head': [self.repo.head.commit.hexsha]})
-
-        self.tableau.append(message)
+        message = pd.Series({'créé': record.created,
+                             'niveau': record.levelno,
+                             'logger': record.name,
+                             'msg': record.getMessage()})
+
+        # Les entrées sont écrites et commises par lots, voir valider et
+        # BaseDeDonnées.tampon
+        self.tableau.append(message, tampon=True)
 
 # TODO Modèle de base de données pour journal
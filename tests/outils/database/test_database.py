@@ -23,6 +23,27 @@ def test_dtypes():
     assert column('test', str).name == 'test'
 
 
+def test_dtypes_registre():
+    import datetime
+    from polygphys.outils.base_de_donnees.dtypes import get_type, convertir
+    from sqlalchemy.dialects import sqlite
+    import sqlalchemy as sqla
+    import pandas as pd
+    import numpy as np
+
+    assert get_type('sqlalchemy', sqla.Float(), 'pandas') == 'float64'
+    assert get_type('sqlalchemy', sqla.Boolean, 'python') is bool
+    assert get_type('sqlalchemy', sqlite.DATETIME(), 'pandas') \
+        == 'datetime64[ns]'
+    assert get_type('pandas', np.dtype('int64'), 'python') is int
+    assert get_type('python', list, 'pandas') == 'object'
+
+    série = convertir(pd.Series(['1', None]), 'python', int)
+    assert str(série.dtype) == 'Int64'
+    série = convertir(pd.Series(['2022-01-01']), 'python', datetime.datetime)
+    assert str(série.dtype) == 'datetime64[ns]'
+
+
 def test_modeles():
     from polygphys.outils.database.modeles import col_index
     import sqlalchemy as sqla
@@ -80,3 +101,1400 @@ def test_BaseDeDonnées_append():
     bd.append('test', ajout)
 
     assert bd.loc('test')['test', 1] == 'a'
+
+
+def test_BaseDeDonnées_moteur_partagé():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.moteurs import ParamètresPool
+    import sqlalchemy as sqla
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+
+    bd = BaseDeDonnées(adresse, md, ParamètresPool(taille=2))
+    autre = BaseDeDonnées(adresse, md)
+
+    try:
+        assert bd.create_engine() is bd.create_engine()
+        assert bd.create_engine() is autre.create_engine()
+    finally:
+        bd.fermer()
+
+    assert autre.create_engine() is not None
+    autre.fermer()
+
+
+def test_BaseDeDonnées_update():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int), column('b', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        bd.append('test', pd.DataFrame({'a': [1, 2, 3], 'b': [4, 5, 6]}))
+
+        modifs = pd.DataFrame({'a': [1, 9]}, index=pd.Index([0, 2]))
+        assert bd.update('test', modifs, seulement_différences=True) == 1
+        assert bd.update('test', modifs) == 2
+
+        df = bd.select('test')
+        assert list(df['a']) == [1, 2, 9]
+        assert list(df['b']) == [4, 5, 6]
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_màj():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        bd.append('test', pd.DataFrame({'a': [1, 2]}))
+        bd.màj('test', pd.DataFrame({'a': [7, 8]}, index=pd.Index([1, 2])))
+
+        df = bd.select('test')
+        assert list(df.index) == [0, 1, 2]
+        assert list(df['a']) == [1, 7, 8]
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_append_par_lots():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        n = bd.append('test', pd.DataFrame({'a': range(2500), 'x': 0}))
+        assert n == 2500
+        assert bd.count('test') == 2500
+
+        bd.insert('test', pd.DataFrame({'a': [-1]}, index=[5000]))
+        assert bd.select('test', where=[bd.table('test').c.index == 5000]
+                         ).loc[5000, 'a'] == -1
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_descripteur():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pytest
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('parent', md, col_index())
+    table = sqla.Table('test',
+                       md,
+                       col_index(),
+                       column('a', int),
+                       column('p', int, sqla.ForeignKey('parent.index')))
+
+    bd = BaseDeDonnées(adresse, md)
+
+    descripteur = bd.descripteur('test')
+    assert descripteur is bd.descripteur('test')
+    assert list(bd.columns('test')) == ['a', 'p']
+    assert bd.dtype('test', 'a') == 'int64'
+    assert descripteur.types_python['a'] is int
+    assert descripteur.défauts['a'] == 0
+    assert descripteur.références == {'p': ('parent', 'index')}
+
+    with pytest.raises(AttributeError):
+        descripteur.colonnes = None
+
+    table.append_column(column('b', float))
+    assert list(bd.columns('test')) == ['a', 'p', 'b']
+    assert bd.dtypes('test')['b'] == 'float64'
+
+
+def test_BaseDeDonnées_codages():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+    import pathlib
+    import datetime
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    table = sqla.Table('test',
+                       md,
+                       col_index(),
+                       column('nom', str),
+                       column('chemin', pathlib.Path),
+                       column('durée', datetime.timedelta),
+                       column('données', object))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        bd.append('test', pd.DataFrame({
+            'nom': ['a', None],
+            'chemin': [pathlib.Path('x/y.txt'), None],
+            'durée': [datetime.timedelta(seconds=1.5), None],
+            'données': [{'a': [1, 2]}, None]}))
+
+        df = bd.select('test')
+        assert df.loc[0, 'nom'] == 'a'
+        assert df.loc[0, 'chemin'] == pathlib.Path('x/y.txt')
+        assert df.loc[0, 'durée'] == datetime.timedelta(seconds=1.5)
+        assert df.loc[0, 'données'] == {'a': [1, 2]}
+        assert df.loc[1, ['nom', 'chemin', 'données']].isna().all()
+        assert pd.isna(df.loc[1, 'durée'])
+
+        # Les valeurs sont lisibles par la base de données
+        with bd.begin() as con:
+            brut = con.exec_driver_sql('SELECT chemin, durée, données '
+                                       'FROM test WHERE "index" = 0').one()
+        assert tuple(brut) == ('x/y.txt', 1500000, '{"a":[1,2]}')
+
+        chemin = pathlib.Path('x/y.txt')
+        df = bd.select('test', where=[table.c.chemin == chemin])
+        assert list(df.index) == [0]
+    finally:
+        bd.fermer()
+
+
+def test_migrer_pickle():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.codages import migrer_pickle
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pathlib
+
+    adresse = 'sqlite:///'
+    ancien = sqla.MetaData()
+    sqla.Table('test', ancien, col_index(), sqla.Column('c', sqla.PickleType))
+    md = sqla.MetaData()
+    table = sqla.Table('test', md, col_index(), column('c', pathlib.Path))
+
+    bd = BaseDeDonnées(adresse, md)
+
+    try:
+        with bd.begin() as con:
+            ancien.create_all(con)
+            con.execute(ancien.tables['test'].insert(),
+                        [{'index': i, 'c': pathlib.Path(f'{i}.txt')}
+                         for i in range(25)] + [{'index': 25, 'c': None}])
+
+        with bd.begin() as con:
+            assert migrer_pickle(con, table, 'c', taille=10) == 25
+        with bd.begin() as con:
+            assert migrer_pickle(con, table, 'c', taille=10) == 0
+
+        df = bd.select('test')
+        assert df.loc[7, 'c'] == pathlib.Path('7.txt')
+        assert df.loc[25, 'c'] is None
+    finally:
+        bd.fermer()
+
+
+def test_gestion_synchroniser_conversions(tmp_path):
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.codages import à_migrer
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import datetime
+    import pathlib
+
+    # Base de données écrite avec les anciens types: str et Path picklés,
+    # durées en sqlalchemy.Interval
+    adresse = f'sqlite:///{tmp_path / "ancienne.db"}'
+    ancien = sqla.MetaData()
+    sqla.Table('test',
+               ancien,
+               sqla.Column('index', sqla.BigInteger, primary_key=True),
+               sqla.Column('nom', sqla.PickleType),
+               sqla.Column('chemin', sqla.PickleType),
+               sqla.Column('durée', sqla.Interval))
+    moteur = sqla.create_engine(adresse, future=True)
+    with moteur.begin() as con:
+        ancien.create_all(con)
+        con.execute(ancien.tables['test'].insert(),
+                    [{'index': i,
+                      'nom': f'n{i}',
+                      'chemin': pathlib.Path(f'{i}.txt'),
+                      'durée': datetime.timedelta(seconds=i, microseconds=3)}
+                     for i in range(5)]
+                    + [{'index': 5, 'nom': None, 'chemin': None,
+                        'durée': None}])
+    moteur.dispose()
+
+    md = sqla.MetaData()
+    sqla.Table('test',
+               md,
+               col_index(),
+               column('nom', str),
+               column('chemin', pathlib.Path),
+               column('durée', datetime.timedelta))
+
+    bd = BaseDeDonnées(adresse, md)
+
+    try:
+        # Les colonnes sont converties au démarrage
+        bd.initialiser()
+
+        df = bd.select('test')
+        assert df.loc[3, 'nom'] == 'n3'
+        assert df.loc[3, 'chemin'] == pathlib.Path('3.txt')
+        assert df.loc[3, 'durée'] == datetime.timedelta(seconds=3,
+                                                        microseconds=3)
+        assert df.loc[5].isna().all()
+
+        # Une fois converties, elles ne sont plus relevées
+        with bd.begin() as con:
+            assert à_migrer(con, md.tables['test']) == {}
+    finally:
+        bd.fermer()
+
+
+def test_gestion_convertir_copie():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.codages import (migrer_pickle,
+                                                          migrer_intervalle)
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.gestion import convertir
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import datetime
+    import pathlib
+
+    adresse = 'sqlite:///'
+    ancien = sqla.MetaData()
+    sqla.Table('test',
+               ancien,
+               col_index(),
+               sqla.Column('chemin', sqla.PickleType),
+               sqla.Column('durée', sqla.Interval))
+    md = sqla.MetaData()
+    table = sqla.Table('test',
+                       md,
+                       col_index(),
+                       column('chemin', pathlib.Path),
+                       column('durée', datetime.timedelta))
+
+    bd = BaseDeDonnées(adresse, md)
+
+    try:
+        with bd.begin() as con:
+            ancien.create_all(con)
+            con.execute(ancien.tables['test'].insert(),
+                        [{'index': i,
+                          'chemin': pathlib.Path(f'{i}.txt'),
+                          'durée': datetime.timedelta(minutes=i)}
+                         for i in range(3)])
+
+        # Comme pour les bases de données autres que SQLite: les valeurs
+        # sont copiées dans une colonne du nouveau type
+        with bd.begin() as con:
+            assert convertir(con, table.c.chemin, migrer_pickle, False) == 3
+            assert convertir(con, table.c.durée, migrer_intervalle,
+                             False) == 3
+            types = {c['name']: c['type']
+                     for c in sqla.inspect(con).get_columns('test')}
+
+        assert isinstance(types['chemin'], sqla.Text)
+        assert isinstance(types['durée'], sqla.BigInteger)
+
+        df = bd.select('test')
+        assert df.loc[2, 'chemin'] == pathlib.Path('2.txt')
+        assert df.loc[2, 'durée'] == datetime.timedelta(minutes=2)
+    finally:
+        bd.fermer()
+
+
+def test_gestion_synchroniser():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.gestion import synchroniser
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+
+    try:
+        assert len(synchroniser(bd).tableaux) == 1
+        assert not synchroniser(bd)
+
+        requêtes = []
+        sqla.event.listen(bd.create_engine(),
+                          'before_cursor_execute',
+                          lambda *args: requêtes.append(args[2]))
+        bd.initialiser()
+        assert len(requêtes) == 1
+
+        md2 = sqla.MetaData()
+        sqla.Table('test',
+                   md2,
+                   col_index(),
+                   column('a', int),
+                   column('b', float, index=True))
+        sqla.Table('autre', md2, col_index())
+        bd2 = BaseDeDonnées(adresse, md2)
+
+        migration = synchroniser(bd2)
+        assert [t.name for t in migration.tableaux] == ['autre']
+        assert [c.name for c in migration.colonnes] == ['b']
+        assert len(migration.index) == 1
+
+        bd2.append('test', pd.DataFrame({'a': [1], 'b': [.5]}))
+        assert bd2.select('test').loc[0, 'b'] == .5
+    finally:
+        bd.fermer()
+
+
+def test_gestion_migrer(tmp_path):
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.gestion import migrer
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+    import pytest
+
+    md_a = sqla.MetaData()
+    sqla.Table('parent', md_a, col_index(), column('a', int))
+    sqla.Table('enfant',
+               md_a,
+               col_index(),
+               column('p', int, sqla.ForeignKey('parent.index')))
+    md_b = sqla.MetaData()
+    sqla.Table('parent', md_b, col_index(), column('b', float))
+    sqla.Table('enfant',
+               md_b,
+               col_index(),
+               column('p', int, sqla.ForeignKey('parent.index')))
+
+    a = BaseDeDonnées(f'sqlite:///{tmp_path / "a.db"}', md_a)
+    b = BaseDeDonnées(f'sqlite:///{tmp_path / "b.db"}', md_b)
+    a.réinitialiser()
+
+    try:
+        a.append('parent', pd.DataFrame({'a': range(25)}))
+        a.append('enfant', pd.DataFrame({'p': range(25)}))
+
+        ordre = []
+
+        def interrompre(tableau, n):
+            ordre.append(tableau)
+            if n == 20:
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            migrer(a, b, {'a': 'b'}, {'b': lambda x: x / 2}, 10,
+                   progression=interrompre)
+        assert b.count('parent') == 20
+
+        copiés = migrer(a, b, {'a': 'b'}, {'b': lambda x: x / 2}, 10,
+                        progression=lambda t, n: ordre.append(t))
+        assert copiés == {'parent': 25, 'enfant': 25}
+        assert ordre.index('enfant') > ordre.index('parent')
+        assert list(b.select('parent')['b']) == [i / 2 for i in range(25)]
+        assert b.count('enfant') == 25
+
+        # Une migration terminée ne laisse rien à reprendre
+        a.append('parent', pd.DataFrame({'a': [25]}, index=[25]))
+        copiés = migrer(a, b, {'a': 'b'}, {'b': lambda x: x / 2}, 10)
+        assert copiés['parent'] == 26
+        assert b.count('parent') == 26
+    finally:
+        a.fermer()
+        b.fermer()
+
+
+def test_BaseDeDonnées_profileur(caplog):
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.profilage import Profileur
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    profileur = Profileur(taille=5, seuil=0, plan=True)
+    bd = BaseDeDonnées(adresse, md, profileur=profileur)
+    bd.réinitialiser()
+
+    try:
+        bd.append('test', pd.DataFrame({'a': range(3)}))
+        bd.delete('test', [0, 1])
+        bd.select('test')
+
+        registres = profileur.registres()
+        assert registres.shape[0] == 5
+        dernier = registres.iloc[-1]
+        assert dernier['méthode'].endswith('BaseDeDonnées.select')
+        assert dernier['rangées'] == 1
+        assert 'SCAN' in dernier['plan']
+        assert 'IN (...)' in registres.iloc[-2]['forme']
+        assert 'SELECT' in caplog.text
+
+        résumé = profileur.résumé()
+        assert {'p50', 'p90', 'p99'} <= set(résumé.columns)
+        assert résumé['nombre'].sum() == 5
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_config(tmp_path):
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees import BaseDeDonnéesConfig
+    from polygphys.outils.base_de_donnees.profilage import Profileur
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import logging
+    import pytest
+
+    lentes = tmp_path / 'lentes.log'
+    config = BaseDeDonnéesConfig(tmp_path / 'bd.cfg')
+    config['cache']['actif'] = 'oui'
+    config['profilage']['actif'] = 'oui'
+    config['profilage']['seuil'] = '0'
+    config['profilage']['journal'] = str(lentes)
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md, config=config)
+    autre = BaseDeDonnées(adresse, md, config=config)
+    journal = logging.getLogger('polygphys.outils.base_de_donnees.lentes')
+
+    try:
+        assert bd.cache is not None
+        assert bd.lecture == 'pandas'
+        assert bd.profileur is autre.profileur
+        assert bd.profileur.seuil == 0
+
+        # Un seul fichier de journal, même pour plusieurs registres
+        Profileur(journal=str(lentes))
+        assert sum(getattr(h, 'baseFilename', None) == str(lentes)
+                   for h in journal.handlers) == 1
+
+        bd.réinitialiser()
+        with pytest.raises(sqla.exc.OperationalError):
+            with bd.begin() as con:
+                con.exec_driver_sql('SELECT * FROM absent')
+        with bd.begin() as con:
+            assert not con.info.get('profilage')
+    finally:
+        bd.fermer()
+        for h in list(journal.handlers):
+            if getattr(h, 'baseFilename', None) == str(lentes):
+                journal.removeHandler(h)
+                h.close()
+
+
+def test_BaseDeDonnées_conseils_index():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.profilage import Profileur
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index, index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    table = sqla.Table('test',
+                       md,
+                       col_index(),
+                       column('a', int, index=True),
+                       column('b', int),
+                       column('c', int),
+                       index('test', 'b', 'c', unique=True))
+    assert {i.name for i in table.indexes} == {'ix_test_a', 'ux_test_b_c'}
+
+    bd = BaseDeDonnées(adresse, md, profileur=Profileur())
+    bd.réinitialiser()
+
+    try:
+        bd.append('test', pd.DataFrame({'a': range(100),
+                                        'b': range(100),
+                                        'c': 0}))
+        bd.select('test', where=[table.c.a == 1])
+        bd.select('test', where=[table.c.b == 1, table.c.c > 0])
+        bd.select('test', where=[table.c.c == 1])
+        bd.select('test', where=[table.c.c == 2])
+
+        conseils = bd.conseils_index()
+        assert list(conseils['colonnes']) == [('c',)]
+        assert conseils.loc[0, 'requêtes'] == 2
+        assert conseils.loc[0, 'rangées'] == 100
+        assert conseils.loc[0, 'commande'] \
+            == 'CREATE INDEX ix_test_c ON test (c)'
+    finally:
+        bd.fermer()
+
+    # Les identifiants sont entre guillemets selon le dialecte
+    from polygphys.outils.base_de_donnees.conseiller import commande
+    from sqlalchemy.dialects import mysql, sqlite
+
+    tableau = sqla.Table('Appareils', md, col_index(), column('Local', str))
+    assert commande(tableau, ('Local',), mysql.dialect()) \
+        == 'CREATE INDEX `ix_Appareils_Local` ON `Appareils` (`Local`)'
+    assert commande(tableau, ('Local',), sqlite.dialect()) \
+        == 'CREATE INDEX "ix_Appareils_Local" ON "Appareils" ("Local")'
+    assert not tableau.indexes
+
+
+def test_BaseDeDonnées_transaction():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+    import pytest
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    enregistrements = []
+    sqla.event.listen(bd.create_engine(),
+                      'commit',
+                      lambda con: enregistrements.append(con))
+
+    try:
+        with bd.transaction() as con:
+            for i in range(1000):
+                bd.append('test', pd.DataFrame({'a': [i]}, index=[i]))
+            assert bd.count('test') == 1000
+
+            with pytest.raises(ValueError):
+                with bd.transaction() as imbriquée:
+                    assert imbriquée is con
+                    bd.append('test', pd.DataFrame({'a': [-1]}, index=[-1]))
+                    raise ValueError
+
+        assert len(enregistrements) == 1
+        assert bd.count('test') == 1000
+
+        with pytest.raises(ValueError):
+            with bd.transaction():
+                bd.append('test', pd.DataFrame({'a': [-1]}, index=[-1]))
+                raise ValueError
+        assert bd.count('test') == 1000
+    finally:
+        bd.fermer()
+
+
+def test_BaseTableau_tampon():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées, BaseTableau
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+    import pytest
+    import time
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    t = sqla.Table('test', md, col_index(), column('a', int))
+    sqla.Table('autre', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    écritures = []
+    sqla.event.listen(bd.create_engine(),
+                      'before_cursor_execute',
+                      lambda *args: écritures.append(args[2])
+                      if args[2].startswith('INSERT') else None)
+
+    try:
+        tampon = bd.tampon('test', taille=10, âge=60)
+        tableau = BaseTableau(bd, 'test')
+
+        for i in range(25):
+            tableau.append(pd.Series({'a': i}), tampon=True)
+        assert len(écritures) == 2
+        assert len(tampon) == 5
+
+        # Une lecture écrit d'abord les rangées en attente
+        df = tableau.select()
+        assert len(tampon) == 0
+        assert df.index.is_unique
+        assert list(df['a']) == list(range(25))
+
+        tableau.append(pd.Series({'a': 25}), tampon=True)
+        assert tableau.vider_tampons() == 1
+        assert bd.count('test') == 26
+
+        # Une écriture ratée garde les rangées en attente
+        existant = int(df.index[0])
+        tampon.ajouter(pd.DataFrame({'a': [-1]}, index=[existant]))
+        with pytest.raises(sqla.exc.IntegrityError):
+            tampon.vider()
+        assert len(tampon) == 1
+        bd.execute(t.delete().where(t.c.index == existant))
+        assert tampon.vider() == 1
+
+        # En mémoire, la connexion est partagée: pas de minuterie, qui
+        # écrirait au milieu d'une transaction du fil principal
+        bd.tampon('autre', taille=100, âge=.05)
+        with bd.begin() as con:
+            BaseTableau(bd, 'autre').append(pd.Series({'a': 1}), tampon=True)
+            time.sleep(.3)
+            con.execute(t.insert(), {'index': 1000, 'a': 0})
+        assert len(bd.tampon('autre')) == 1
+        assert bd.count('autre') == 1
+    finally:
+        bd.fermer()
+
+
+def test_BaseTableau_tampon_minuterie(tmp_path):
+    from polygphys.outils.base_de_donnees import BaseDeDonnées, BaseTableau
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+    import time
+
+    adresse = f'sqlite:///{tmp_path / "tampon.db"}'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int), column('b', str))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        lots = []
+
+        def préparer(rangées):
+            lots.append(len(rangées))
+            for r in rangées:
+                r['b'] = f'lot {len(lots)}'
+
+        tampon = bd.tampon('test', taille=100, âge=.05)
+        tampon.préparer = préparer
+
+        # Un tampon inactif est vidé après son âge maximal
+        for i in range(3):
+            BaseTableau(bd, 'test').append(pd.Series({'a': i}), tampon=True)
+        time.sleep(.5)
+        assert len(tampon) == 0
+        assert lots == [3]
+        assert list(bd.select('test')['b']) == ['lot 1'] * 3
+    finally:
+        bd.fermer()
+
+
+def test_BaseTableau_tampons_partagés(tmp_path):
+    from polygphys.outils.base_de_donnees import BaseDeDonnées, BaseTableau
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = f'sqlite:///{tmp_path / "tampons.db"}'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    a = BaseDeDonnées(adresse, md)
+    a.réinitialiser()
+    b = BaseDeDonnées(adresse, md)
+
+    try:
+        # Deux tampons sur le même tableau n'attribuent pas les mêmes index
+        for i in range(10):
+            BaseTableau(a, 'test').append(pd.Series({'a': i}), tampon=True)
+            BaseTableau(b, 'test').append(pd.Series({'a': i}), tampon=True)
+        assert a.vider_tampons() == 10
+        assert b.vider_tampons() == 10
+        assert a.count('test') == 20
+    finally:
+        a.fermer()
+        b.fermer()
+
+
+def test_BaseDeDonnées_insert_one():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées, BaseTableau
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+    import numpy as np
+    import pathlib
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test',
+               md,
+               col_index(),
+               column('a', int),
+               column('chemin', pathlib.Path))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        i = bd.insert_one('test', {'a': np.int64(3),
+                                   'chemin': pathlib.Path('x/y'),
+                                   'inconnue': 0})
+        j = bd.insert_one('test', {'a': 4})
+        assert j == i + 1
+
+        k = BaseTableau(bd, 'test').append(pd.Series({'a': 5}))
+        assert k == j + 1
+
+        df = bd.select('test')
+        assert list(df.index) == [i, j, k]
+        assert list(df['a']) == [3, 4, 5]
+        assert df.loc[i, 'chemin'] == pathlib.Path('x/y')
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_insert_one_ancien_index(tmp_path):
+    from polygphys.outils.base_de_donnees import BaseDeDonnées, BaseTableau
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    # Tableau créé avant que col_index soit autoincrémenté
+    adresse = f'sqlite:///{tmp_path / "ancien.db"}'
+    moteur = sqla.create_engine(adresse)
+    with moteur.begin() as con:
+        con.exec_driver_sql('CREATE TABLE test ('
+                            '"index" BIGINT NOT NULL PRIMARY KEY, '
+                            'a BIGINT)')
+    moteur.dispose()
+
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+
+    try:
+        assert not bd.index_automatique('test')
+
+        tab = BaseTableau(bd, 'test')
+        assert tab.append(pd.Series({'a': 7})) == 0
+        assert tab.append(pd.Series({'a': 8})) == 1
+        assert bd.insert_one('test', {'a': 9}) == 2
+        assert list(bd.select('test')['a']) == [7, 8, 9]
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_types_lecture():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import datetime
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test',
+               md,
+               col_index(),
+               column('a', int),
+               column('b', bool),
+               column('c', datetime.datetime),
+               column('d', str, catégorie=True),
+               column('e', str))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        bd.insert_one('test', {'a': 1,
+                               'b': True,
+                               'c': datetime.datetime(2022, 1, 1),
+                               'd': 'x',
+                               'e': 'y'})
+        bd.insert_one('test', {'a': None, 'b': None, 'c': None, 'd': 'x'})
+
+        df = bd.select('test')
+        assert dict(df.dtypes.astype(str)) == {'a': 'Int64',
+                                               'b': 'boolean',
+                                               'c': 'datetime64[ns]',
+                                               'd': 'category',
+                                               'e': 'object'}
+        assert df['a'].isna().iloc[1]
+        assert list(df['d'].cat.categories) == ['x']
+
+        morceau = next(bd.select_iter('test', chunksize=1))
+        assert str(morceau['a'].dtype) == 'Int64'
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_lecture_arrow():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+    import pytest
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test',
+               md,
+               col_index(),
+               column('a', int),
+               column('b', float),
+               column('c', str))
+
+    with pytest.raises(ValueError):
+        BaseDeDonnées(adresse, md, lecture='inconnue')
+
+    pytest.importorskip('pyarrow')
+
+    bd = BaseDeDonnées(adresse, md, lecture='arrow')
+    bd.réinitialiser()
+
+    try:
+        bd.append('test', pd.DataFrame({'a': [1, None, 3],
+                                        'b': [.5, 1., None],
+                                        'c': ['x', None, 'z']}))
+
+        attendu = bd.select('test', lecture='pandas')
+        pd.testing.assert_frame_equal(bd.select('test'), attendu)
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_select_page():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+    import datetime
+    import pytest
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test',
+               md,
+               col_index(),
+               column('a', int, index=True),
+               column('b', datetime.datetime))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        début = datetime.datetime(2022, 1, 1)
+        bd.append('test', pd.DataFrame({
+            'a': [i % 7 for i in range(250)],
+            'b': [début + datetime.timedelta(days=i % 11)
+                  for i in range(250)]}))
+
+        pages, jeton = [], None
+        while True:
+            page, jeton = bd.select_page('test', after=jeton, limit=100)
+            pages.append(page)
+            if jeton is None:
+                break
+        assert [p.shape[0] for p in pages] == [100, 100, 50]
+        assert list(pd.concat(pages).index) == list(range(250))
+
+        for tri in ('a', ['b', 'a']):
+            vues, jeton = [], None
+            while True:
+                page, jeton = bd.select_page('test',
+                                             columns=('b',),
+                                             order_by=tri,
+                                             after=jeton,
+                                             limit=30,
+                                             décroissant=True)
+                assert list(page.columns) == ['b']
+                vues.extend(page.index)
+                if jeton is None:
+                    break
+            assert sorted(vues) == list(range(250))
+
+        with pytest.raises(ValueError):
+            bd.select_page('test', order_by='b', after=jeton or 'x')
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_select_page_types():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    from pathlib import Path
+    import sqlalchemy as sqla
+    import pandas as pd
+    import datetime
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test',
+               md,
+               col_index(),
+               column('d', datetime.date),
+               column('p', Path),
+               column('t', datetime.timedelta))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        début = datetime.date(2022, 1, 1)
+        bd.append('test', pd.DataFrame({
+            'd': [début + datetime.timedelta(days=i % 4) for i in range(25)],
+            'p': [Path(f'dossier/{i % 6}') for i in range(25)],
+            't': [datetime.timedelta(seconds=i % 5) for i in range(25)]}))
+
+        # Dates lues comme datetime64, chemins et durées encodés
+        for tri in ('d', 'p', 't'):
+            vues, jeton = [], None
+            while True:
+                page, jeton = bd.select_page('test',
+                                             order_by=tri,
+                                             after=jeton,
+                                             limit=10)
+                vues.extend(page.index)
+                if jeton is None:
+                    break
+            assert sorted(vues) == list(range(25))
+            assert len(vues) == 25
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_select_résolu():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    personnes = sqla.Table('personnes',
+                           md,
+                           col_index(),
+                           column('matricule', str),
+                           column('nom', str, étiquette=True))
+    sqla.Table('appareils',
+               md,
+               col_index(),
+               column('responsable', int,
+                      sqla.ForeignKey(personnes.columns['index'])),
+               column('réparateur', int,
+                      sqla.ForeignKey(personnes.columns['index'])),
+               column('description', str))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        bd.append('personnes', pd.DataFrame({'matricule': ['1', '2'],
+                                             'nom': ['Alice', 'Bob']},
+                                            index=[1, 2]))
+        bd.append('appareils', pd.DataFrame({'responsable': [1, 2, 1],
+                                             'réparateur': [2, 2, None],
+                                             'description': list('xyz')}))
+
+        requêtes = []
+        sqla.event.listen(bd.create_engine(),
+                          'before_cursor_execute',
+                          lambda *args: requêtes.append(args[2]))
+        df = bd.select_résolu('appareils')
+        assert len(requêtes) == 1
+        assert list(df['responsable.nom']) == ['Alice', 'Bob', 'Alice']
+        assert list(df['réparateur.nom'].fillna('')) == ['Bob', 'Bob', '']
+
+        df = bd.select_résolu('appareils', ('description',))
+        assert list(df.columns) == ['description']
+
+        étiquettes = bd.valeurs_référencées('appareils', 'responsable')
+        assert étiquettes == {1: 'Alice', 2: 'Bob'}
+        assert bd.valeurs_référencées('appareils', 'réparateur') is étiquettes
+
+        bd.update('personnes', pd.DataFrame({'nom': ['Carole']}, index=[2]))
+        assert bd.select_résolu('appareils').loc[1, 'responsable.nom'] \
+            == 'Carole'
+        assert bd.valeurs_référencées('appareils', 'responsable')[2] \
+            == 'Carole'
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_delete():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        bd.append('test', pd.DataFrame({'a': range(2000)}))
+
+        assert bd.delete('test', 3) == 1
+        assert bd.delete('test', pd.Index(range(1000, 2000))) == 1000
+        assert bd.delete('test', bd.select('test').iloc[:10]) == 10
+        assert len(bd.index('test')) == 989
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_select_iter():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        bd.append('test', pd.DataFrame({'a': range(25)}))
+
+        morceaux = list(bd.select_iter('test', chunksize=10))
+        assert [m.shape[0] for m in morceaux] == [10, 10, 5]
+        assert pd.concat(morceaux).equals(bd.select('test'))
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_cache():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.cache import CacheRequêtes
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md, cache=CacheRequêtes())
+    bd.réinitialiser()
+
+    try:
+        bd.append('test', pd.DataFrame({'a': [1, 2]}))
+        bd.select('test')
+        bd.select('test').loc[0, 'a'] = 10
+        assert bd.select('test').loc[0, 'a'] == 1
+
+        stats = bd.cache.statistiques()
+        assert (stats['succès'], stats['échecs']) == (2, 1)
+
+        bd.update('test', pd.DataFrame({'a': [5]}, index=[0]))
+        assert bd.select('test').loc[0, 'a'] == 5
+        assert bd.cache.statistiques()['échecs'] == 2
+
+        # Un résultat lu avant une écriture n'est pas gardé
+        cache = CacheRequêtes()
+        version = cache.version('test')
+        cache.invalider('test')
+        cache.garder('test', 'clé', pd.DataFrame({'a': [1]}), version)
+        assert cache.obtenir('test', 'clé') is None
+    finally:
+        bd.fermer()
+
+
+def test_BaseTableau_attributs():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées, BaseTableau
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        tab = BaseTableau(bd, 'test')
+        tab.append(pd.DataFrame({'a': [1, 2]}))
+
+        assert tab.table == 'test'
+        assert tab.tables is bd.tables
+        assert list(tab.columns) == ['a']
+        assert list(tab.index) == [0, 1]
+        assert tab.dtype('a') == 'int64'
+        assert tab.select().equals(bd.select('test'))
+        assert tab.shape == (2, 1)
+    finally:
+        bd.fermer()
+
+
+def test_BaseTableau_iloc():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées, BaseTableau
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+    import pytest
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int), column('b', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        bd.append('test', pd.DataFrame({'a': range(100), 'b': 0}))
+        tab = BaseTableau(bd, 'test')
+        df = bd.select('test')
+
+        assert 'LIMIT' in str(tab.requête().tranche(0, 50).compiler())
+        assert tab.iloc[0:50].equals(df.iloc[0:50])
+        assert tab.iloc[-5:].equals(df.iloc[-5:])
+        assert tab.iloc()[[3], [1]].equals(df.iloc[[3], [1]])
+        assert tab.iloc[7, 0] == df.iloc[7, 0]
+        assert tab.iloc[-1, 0] == df.iloc[-1, 0]
+        for position in (-101, 100):
+            with pytest.raises(IndexError):
+                tab.iloc[position]
+        assert tab.loc[10:20, 'a'].equals(df.loc[10:20, 'a'])
+        assert tab.loc[[4, 2]].equals(df.loc[[4, 2]])
+        assert tab.head(3).equals(df.head(3))
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_groupby_types():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+    import datetime
+    import pathlib
+    import pytest
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test',
+               md,
+               col_index(),
+               column('g', str),
+               column('x', float),
+               column('t', str),
+               column('d', datetime.timedelta),
+               column('p', pathlib.Path))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        bd.append('test', pd.DataFrame({
+            'g': ['a', 'a', 'b'],
+            'x': [1., 2., 3.],
+            't': ['u', 'v', 'w'],
+            'd': [datetime.timedelta(seconds=i) for i in (1, 5, 2)],
+            'p': [pathlib.Path(f'{i}.txt') for i in (1, 5, 2)]}))
+
+        # Les colonnes non numériques sont ignorées, comme avec pandas
+        somme = bd.groupby('test', 'g').sum()
+        assert list(somme.columns) == ['x']
+        assert list(somme['x']) == [3., 3.]
+
+        with pytest.raises(TypeError):
+            bd.groupby('test', 'g').agg({'t': 'sum'})
+
+        # Les résultats sont décodés
+        maximum = bd.groupby('test', 'g').max()
+        assert list(maximum.index) == ['a', 'b']
+        assert maximum.loc['a', 'd'] == datetime.timedelta(seconds=5)
+        assert maximum.loc['a', 'p'] == pathlib.Path('5.txt')
+        assert maximum.loc['b', 't'] == 'w'
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_agrégats():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées, BaseTableau
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    t = sqla.Table('test', md, col_index(), column('g', int), column('x', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        assert bd.count('test') == 0
+        assert bd.max('test', 'index') is None
+        assert not bd.exists('test')
+
+        df = pd.DataFrame({'g': [1, 1, 2, 2, 2], 'x': [1, 2, 3, 4, 5]})
+        bd.append('test', df)
+
+        assert bd.count('test', where=(t.columns['g'] == 2,)) == 3
+        assert bd.max('test', 'x') == 5
+        assert bd.min('test', 'x') == 1
+        assert bd.exists('test', where=(t.columns['x'] > 4,))
+
+        attendu = df.groupby('g').agg({'x': ['sum', 'max']})
+        obtenu = bd.groupby('test', 'g').agg({'x': ['sum', 'max']})
+        assert obtenu.values.tolist() == attendu.values.tolist()
+        assert list(bd.groupby('test', 'g').size()) == [2, 3]
+        assert bd.groupby('test', 'g').agg(n=('x', 'count'))['n'][2] == 3
+
+        # BaseTableau garde le sens de pandas.DataFrame
+        tab = BaseTableau(bd, 'test')
+        assert tab.count().equals(tab.df.count())
+        assert tab.max()['x'] == 5
+        assert tab.min()['g'] == 1
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_read_file():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    from pathlib import Path
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    fichier = Path('test_read_file.csv')
+    pd.DataFrame({'a': range(25), 'autre': 0},
+                 index=pd.Index(range(25), name='index')).to_csv(fichier)
+
+    try:
+        progrès = []
+        n = bd.read_file('test', fichier, taille=10,
+                         progression=lambda n, débit: progrès.append(n))
+
+        assert n == 25
+        assert progrès == [10, 20, 25]
+        assert list(bd.select('test')['a']) == list(range(25))
+    finally:
+        fichier.unlink()
+        bd.fermer()
+
+
+def test_BaseDeDonnées_read_file_sans_index(tmp_path):
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    fichier = tmp_path / 'sans_index.csv'
+    pd.DataFrame({'a': [7, 8]}).to_csv(fichier, index=False)
+
+    try:
+        bd.append('test', pd.DataFrame({'a': [100, 101, 102]}))
+
+        # Les rangées existantes ne sont pas écrasées
+        assert bd.read_file('test', fichier) == 2
+        df = bd.select('test')
+        assert df.index.is_unique
+        assert sorted(df['a']) == [7, 8, 100, 101, 102]
+    finally:
+        bd.fermer()
+
+
+def test_BaseDeDonnées_read_file_xlsx():
+    from polygphys.outils.base_de_donnees import BaseDeDonnées
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    from pathlib import Path
+    import sqlalchemy as sqla
+    import pandas as pd
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('test', md, col_index(), column('a', int))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    fichier = Path('test_read_file.xlsx')
+    pd.DataFrame({'a': range(25)}).to_excel(fichier, index=False)
+
+    try:
+        # Sans colonne index: les morceaux se suivent et les rangées
+        # reçoivent leur index de la base de données
+        assert bd.read_file('test', fichier, taille=10) == 25
+        df = bd.select('test')
+        assert df.index.is_unique
+        assert list(df['a']) == list(range(25))
+    finally:
+        fichier.unlink()
+        bd.fermer()
@@ -43,3 +43,59 @@ def test_Journal():
         Journal(logging.DEBUG, dossier, tableau)
     finally:
         dossier.unlink()
+
+
+def test_Journal_lots(tmp_path, monkeypatch):
+    from polygphys.outils.journal import Journal
+    from polygphys.outils.base_de_donnees import BaseDeDonnées, BaseTableau
+    from polygphys.outils.base_de_donnees.dtypes import column
+    from polygphys.outils.base_de_donnees.modeles import col_index
+    from subprocess import run, PIPE
+    import sqlalchemy as sqla
+    import logging
+
+    for variable in ('AUTHOR', 'COMMITTER'):
+        monkeypatch.setenv(f'GIT_{variable}_NAME', 'essai')
+        monkeypatch.setenv(f'GIT_{variable}_EMAIL', 'essai@example.com')
+
+    run(['git', 'init', '-q'], cwd=tmp_path, check=True)
+    (tmp_path / 'fichier.txt').write_text('0')
+    run(['git', 'add', 'fichier.txt'], cwd=tmp_path, check=True)
+    run(['git', 'commit', '-q', '-m', 'départ'], cwd=tmp_path, check=True)
+
+    adresse = 'sqlite:///'
+    md = sqla.MetaData()
+    sqla.Table('journal',
+               md,
+               col_index(),
+               column('créé', float),
+               column('niveau', int),
+               column('logger', str),
+               column('msg', str),
+               column('head', str))
+
+    bd = BaseDeDonnées(adresse, md)
+    bd.réinitialiser()
+
+    try:
+        journal = Journal(logging.DEBUG, tmp_path, BaseTableau(bd, 'journal'))
+        logger = logging.getLogger('test_Journal_lots')
+        logger.addHandler(journal)
+        logger.setLevel(logging.DEBUG)
+
+        for i in range(3):
+            (tmp_path / 'fichier.txt').write_text(str(i + 1))
+            logger.info('entrée %s', i)
+        journal.flush()
+        logger.removeHandler(journal)
+
+        # Un seul commit pour les trois entrées
+        commits = run(['git', 'rev-list', '--count', 'HEAD'],
+                      cwd=tmp_path, stdout=PIPE, text=True, check=True)
+        assert commits.stdout.strip() == '2'
+
+        df = bd.select('journal')
+        assert list(df['msg']) == ['entrée 0', 'entrée 1', 'entrée 2']
+        assert set(df['head']) == {journal.repo.révision()}
+    finally:
+        bd.fermer()